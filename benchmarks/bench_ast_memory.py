@@ -0,0 +1,89 @@
+"""
+Memory used per AST node on large patterns.
+
+Compares the current slotted, interned nodes with the previous layout (plain
+dataclasses with a per-instance ``__dict__``, list children and one object per
+leaf occurrence), rebuilt here from the parsed tree.
+
+Run with: python benchmarks/bench_ast_memory.py
+"""
+import sys
+import os
+import tracemalloc
+from dataclasses import dataclass, fields
+from typing import List, Optional
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core import parser as p
+
+@dataclass
+class OldLeaf:
+    value: str
+
+@dataclass
+class OldSequence:
+    elements: List[object]
+
+@dataclass
+class OldAlternation:
+    options: List[object]
+
+@dataclass
+class OldQuantifier:
+    child: object
+    quant: str
+
+@dataclass
+class OldGroup:
+    group_type: str
+    children: List[object]
+    name: Optional[str] = None
+    flags: Optional[str] = None
+    condition: Optional[str] = None
+
+def to_old(node):
+    if isinstance(node, p.Sequence):
+        return OldSequence([to_old(e) for e in node.elements])
+    if isinstance(node, p.Alternation):
+        return OldAlternation([to_old(o) for o in node.options])
+    if isinstance(node, p.Quantifier):
+        return OldQuantifier(to_old(node.child), node.quant)
+    if isinstance(node, p.Group):
+        return OldGroup(node.group_type, [to_old(c) for c in node.children], node.name, node.flags, node.condition)
+    return OldLeaf(node.value)
+
+def count_nodes(node) -> int:
+    total = 1
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if isinstance(value, p.RegexAST):
+            total += count_nodes(value)
+        elif isinstance(value, tuple):
+            total += sum(count_nodes(v) for v in value)
+    return total
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+PATTERNS = {
+    'word list (20k words)': '|'.join(f'word{i}' for i in range(20000)),
+    'log line x2000': r'(\d{4}-\d{2}-\d{2}) (INFO|WARN|ERROR) [a-z_]+: .*' * 2000,
+    'char classes x5000': r'[A-Z]{2}\d{6}[a-z]?' * 5000,
+}
+
+def main():
+    print(f"{'pattern':<24}{'nodes':>10}{'before B/node':>16}{'after B/node':>15}{'ratio':>8}")
+    for name, pattern in PATTERNS.items():
+        ast = p.RegexParser().parse(pattern)
+        nodes = count_nodes(ast)
+        _, new_bytes = measure(lambda: p.RegexParser().parse(pattern))
+        _, old_bytes = measure(lambda: to_old(ast))
+        print(f"{name:<24}{nodes:>10}{old_bytes / nodes:>16.1f}{new_bytes / nodes:>15.1f}{old_bytes / max(new_bytes, 1):>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+The bit-parallel Glushkov matcher against re.fullmatch and the Thompson NFA,
+on short inputs for patterns of growing size: nanoseconds per string for a
+full match, and for locating where a string fails (what test_many records for
+every rejected string).
+
+Run with: python benchmarks/bench_bitparallel.py [strings]
+"""
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+
+PATTERNS = [
+    r'[A-Z]{2}\d{4}',
+    r'\d{4}-\d{2}-\d{2}',
+    r'[A-Z]{3}-\d{3}-[a-z]{2}(-v\d)?',
+    r'(ab|cd)*e',
+    r'[a-z]+(-[a-z]+)*@[a-z]+\.(com|org)',
+    r'\d{3}-\d{3}-\d{4}( x\d{1,5})?|\(\d{3}\) \d{3}-\d{4}',
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
+]
+
+def make_inputs(pattern, count, seed=0):
+    # Examples, half of them with one character replaced
+    rng = random.Random(seed)
+    inputs = []
+    for example in compile_pattern(pattern).examples(count):
+        if example and rng.random() < 0.5:
+            at = rng.randrange(len(example))
+            example = example[:at] + '#' + example[at + 1:]
+        inputs.append(example)
+    return inputs
+
+def per_string(fn, inputs):
+    start = time.perf_counter()
+    for s in inputs:
+        fn(s)
+    return (time.perf_counter() - start) / len(inputs) * 1e9
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{count} strings per pattern, nanoseconds per string")
+    print(f"{'pattern':<66}{'positions':>10}{'re':>7}{'bits':>7}{'fail@ bits':>12}{'fail@ nfa':>11}")
+    for pattern in PATTERNS:
+        compiled = compile_pattern(pattern)
+        matcher = compiled.bit_matcher
+        automaton = compiled.automaton
+        inputs = make_inputs(pattern, count)
+        plain = per_string(compiled.regex.fullmatch, inputs)
+        bits = per_string(matcher.fullmatch, inputs)
+        offset_bits = per_string(matcher.failure_offset, inputs)
+        offset_nfa = per_string(automaton.prefix_match, inputs)
+        print(f"{pattern:<66}{matcher.position_count:>10}{plain:>7.0f}{bits:>7.0f}{offset_bits:>12.0f}"
+              f"{offset_nfa:>11.0f}")
+
+if __name__ == '__main__':
+    main()
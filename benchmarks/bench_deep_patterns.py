@@ -0,0 +1,39 @@
+"""
+Scaling of parse, explain and generate on deeply nested and very long patterns.
+
+Times should grow linearly: the "us/unit" columns stay roughly flat as the
+nesting depth or pattern length doubles.
+
+Run with: python benchmarks/bench_deep_patterns.py
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.parser import RegexParser
+from rexplain.core.explainer import explain
+from rexplain.core.generator import ExampleGenerator
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run(label, units, pattern):
+    ast, t_parse = timed(lambda: RegexParser().parse(pattern, coalesce_literals=True))
+    _, t_explain = timed(lambda: explain(ast))
+    _, t_generate = timed(lambda: ExampleGenerator()._generate_from_ast(ast))
+    print(f"{label:<10}{units:>10}{len(pattern):>10}"
+          f"{t_parse * 1e6 / units:>12.2f}{t_explain * 1e6 / units:>12.2f}{t_generate * 1e6 / units:>12.2f}")
+
+def main():
+    print(f"{'shape':<10}{'units':>10}{'chars':>10}{'parse us/u':>12}{'expl. us/u':>12}{'gen us/u':>12}")
+    for depth in (1250, 2500, 5000, 10000):
+        run('nesting', depth, '(?:x\\d' * depth + 'a+' + ')' * depth)
+    chunk = r'[a-z]\d+(foo|bar)?x'
+    for chars in (125000, 250000, 500000, 1000000):
+        run('length', chars, chunk * (chars // len(chunk)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Matching with the minimized DFA against re.fullmatch, on short and long inputs,
+and on inputs that make re backtrack catastrophically. With NumPy installed,
+also times match_many, which advances equal-length strings in lockstep.
+
+Run with: python benchmarks/bench_dfa.py
+"""
+import sys
+import os
+import random
+import re
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.dfa import np
+
+PATTERNS = [r'[A-Z]{2}\d{4}-[a-z]{3,8}', r'(\w+\.)*\w+@\w+\.com', r'[a-f0-9]+(-[a-f0-9]+)*']
+
+def make_inputs(pattern, length, count, seed=0):
+    # Examples stretched to the wanted length, half of them corrupted at the end
+    rng = random.Random(seed)
+    inputs = []
+    for example in compile_pattern(pattern).examples(count):
+        if len(example) < length:
+            example = (example * (length // max(len(example), 1) + 1))[:length]
+        inputs.append(example if rng.random() < 0.5 else example[:-1] + '#')
+    return inputs
+
+def seconds(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    for length, count in ((12, 20000), (10000, 50)):
+        print(f"inputs of about {length} characters, {count} per pattern")
+        print(f"{'pattern':<30}{'states':>8}{'classes':>8}{'re':>10}{'dfa':>10}{'lockstep':>10}")
+        for pattern in PATTERNS:
+            compiled = compile_pattern(pattern)
+            dfa = compiled.dfa
+            inputs = make_inputs(pattern, length, count)
+            fullmatch = compiled.regex.fullmatch
+            plain = seconds(lambda: [fullmatch(s) for s in inputs])
+            table = seconds(lambda: [dfa.fullmatch(s) for s in inputs])
+            lockstep = f"{seconds(lambda: dfa.match_many(inputs)):>9.3f}s" if np is not None else f"{'-':>10}"
+            print(f"{pattern:<30}{dfa.state_count:>8}{dfa.class_count:>8}{plain:>9.3f}s{table:>9.3f}s{lockstep}")
+    print("catastrophic backtracking: (a+)+$ against 'a' * n + '!'")
+    dfa = compile_pattern(r'(a+)+$').dfa
+    regex = re.compile(r'(a+)+$')
+    for n in (16, 20, 22, 10000):
+        text = 'a' * n + '!'
+        plain = f"{seconds(lambda: regex.fullmatch(text)):>9.3f}s" if n < 30 else f"{'(hangs)':>10}"
+        print(f"  n={n:<8}re{plain}   dfa{seconds(lambda: dfa.fullmatch(text)):>9.5f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Examples per second from a pattern's cached generation plan, against
+compiling the AST again for every example, which is about what walking the
+AST per example cost before plans were compiled.
+
+Run with: python benchmarks/bench_generation.py [examples]
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.generator import ExampleGenerator
+
+PATTERNS = [
+    r'[A-Z]{2}\d{4}',
+    r'\d{4}-\d{2}-\d{2}',
+    r'[a-z]+(-[a-z]+)*@[a-z]+\.(com|org|net)',
+    r'[^,;]{3,8}(,[^,;]{3,8}){2}',
+    r'\D\W\S\w{5}',
+    r'GET /api/v1/(users|items|orders)/\d+\?page=\d{1,3}',
+    r'(([0-9a-f]{2}:){5}[0-9a-f]{2}|[0-9a-f]{4}\.[0-9a-f]{4}\.[0-9a-f]{4})',
+]
+
+def per_second(fn, count):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    generator = ExampleGenerator()
+    print(f"{count} examples per pattern")
+    print(f"{'pattern':<68}{'plan ex/s':>12}{'uncached':>12}{'speedup':>9}")
+    for pattern in PATTERNS:
+        compiled = compile_pattern(pattern)
+        compiled.examples(1)  # build the plan
+        ast = compiled.ast
+        planned = per_second(lambda: compiled.examples(count), count)
+        walked = per_second(lambda: [generator._generate_from_ast(ast) for _ in range(count)], count)
+        print(f"{pattern:<68}{planned:>12.0f}{walked:>12.0f}{planned / walked:>8.1f}x")
+
+if __name__ == '__main__':
+    main()
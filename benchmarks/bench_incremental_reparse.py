@@ -0,0 +1,32 @@
+"""
+Keystroke latency: a full parse versus RegexParser.reparse after typing one
+character inside a group in the middle of patterns of growing size.
+
+Run with: python benchmarks/bench_incremental_reparse.py
+"""
+import sys
+import os
+import timeit
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.parser import RegexParser, TextEdit
+
+def main():
+    parser = RegexParser()
+    chunk = r'(?P<k>[a-z_]+)=(?:"[^"]*"|\d+(?:\.\d+)?);'
+    print(f"{'groups':>8}{'chars':>10}{'parse us':>12}{'reparse us':>12}{'speedup':>9}")
+    for n in (100, 1000, 10000):
+        pattern = chunk * n
+        old = parser.parse(pattern)
+        # Type 'x' inside the first group of the middle chunk
+        at = len(chunk) * (n // 2) + len('(?P<k>[a-z_]')
+        new = pattern[:at] + 'x' + pattern[at:]
+        edit = TextEdit(at, at, 'x')
+        assert parser.reparse(old, edit, new) == parser.parse(new)
+        number = max(1, 2000 // n)
+        t_parse = timeit.timeit(lambda: parser.parse(new), number=number) / number
+        t_reparse = timeit.timeit(lambda: parser.reparse(old, edit, new), number=number * 10) / (number * 10)
+        print(f"{n * 3:>8}{len(pattern):>10}{t_parse * 1e6:>12.1f}{t_reparse * 1e6:>12.1f}{t_parse / t_reparse:>8.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Cost of sampling from huge top-level alternations (word1|word2|...|wordN),
+parsed eagerly versus with lazily parsed branches.
+
+Run with: python benchmarks/bench_lazy_alternation.py
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.parser import RegexParser
+from rexplain.core.generator import ExampleGenerator
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    gen = ExampleGenerator()
+    print(f"{'words':>8}{'chars':>10}{'eager parse ms':>16}{'lazy scan ms':>14}{'10 samples ms':>15}{'parsed':>8}")
+    for words in (5000, 20000, 50000):
+        pattern = '|'.join(f'word{i}[0-9]{{2}}' for i in range(words))
+        _, t_eager = timed(lambda: RegexParser().parse(pattern, coalesce_literals=True))
+        ast, t_lazy = timed(lambda: RegexParser().parse(pattern, coalesce_literals=True, lazy_alternation=True))
+        _, t_sample = timed(lambda: [gen._generate_from_ast(ast) for _ in range(10)])
+        print(f"{words:>8}{len(pattern):>10}{t_eager * 1e3:>16.1f}{t_lazy * 1e3:>14.2f}"
+              f"{t_sample * 1e3:>15.3f}{ast.options.parsed_count:>8}")
+
+if __name__ == '__main__':
+    main()
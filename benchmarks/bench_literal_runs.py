@@ -0,0 +1,44 @@
+"""
+Node count and generation/explanation time on literal-heavy patterns, with and
+without literal coalescing.
+
+Run with: python benchmarks/bench_literal_runs.py
+"""
+import sys
+import os
+import timeit
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.parser import RegexParser, RegexAST
+from rexplain.core.generator import ExampleGenerator
+from rexplain.core.explainer import explain
+
+def count_nodes(node) -> int:
+    total = 1
+    for name in node.__slots__:
+        value = getattr(node, name)
+        if isinstance(value, RegexAST):
+            total += count_nodes(value)
+        elif isinstance(value, tuple):
+            total += sum(count_nodes(v) for v in value)
+    return total
+
+PATTERNS = {
+    'REST route': r'GET /api/v1/customers/\d+/orders/\d+/items',
+    'log prefix': r'\[(INFO|WARN|ERROR)\] connection to database server failed after retrying',
+}
+
+def main():
+    gen = ExampleGenerator()
+    parser = RegexParser()
+    print(f"{'pattern':<12}{'mode':<10}{'nodes':>7}{'generate us':>13}{'explain us':>12}")
+    for name, pattern in PATTERNS.items():
+        for mode, coalesce in (('per-char', False), ('runs', True)):
+            ast = parser.parse(pattern, coalesce_literals=coalesce)
+            n = 2000
+            gen_us = timeit.timeit(lambda: gen._generate_from_ast(ast), number=n) / n * 1e6
+            exp_us = timeit.timeit(lambda: explain(ast, group_literals=coalesce), number=n) / n * 1e6
+            print(f"{name:<12}{mode:<10}{count_nodes(ast):>7}{gen_us:>13.1f}{exp_us:>12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Scaling of the tester's "longest matching prefix" diagnostic for regular
+patterns: the old loop, which ran fullmatch on every slice of the string, versus
+the one-pass NFA. Patterns the NFA does not support still take the longest-first
+fullmatch loop, quadratic in the worst case.
+
+Run with: python benchmarks/bench_longest_prefix.py
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.tester import longest_matching_prefix
+
+def sliced_loop(prog, text):
+    # The diagnostic RegexTester used before the automaton
+    longest = 0
+    for i in range(1, len(text) + 1):
+        if prog.fullmatch(text[:i]):
+            longest = i
+    return longest
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    cases = [
+        (r'[a-z]+\d', lambda n: 'a' * n + '1!'),
+        (r'(?:ab|a)*c', lambda n: 'ab' * (n // 2) + 'x'),
+        (r'\w+@\w+\.com', lambda n: 'user' * (n // 4) + '@'),
+    ]
+    print(f"{'pattern':<16}{'chars':>8}{'before ms':>12}{'after ms':>12}{'speedup':>9}")
+    for pattern, make in cases:
+        compiled = compile_pattern(pattern)
+        assert compiled.automaton is not None
+        for n in (1000, 4000, 16000, 32000):
+            text = make(n)
+            before, t_before = timed(sliced_loop, compiled.regex, text)
+            after, t_after = timed(longest_matching_prefix, compiled, text)
+            assert before == after
+            print(f"{pattern:<16}{len(text):>8}{t_before * 1e3:>12.1f}{t_after * 1e3:>12.2f}{t_before / t_after:>8.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Classifying log lines against rule sets of 10 to 10,000 patterns: build time
+and memory of a PatternSet, lines per second with it, and lines per second
+calling re.search for every rule.
+
+Run with: python benchmarks/bench_patternset.py [lines]
+"""
+import sys
+import os
+import random
+import re
+import time
+import tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.patternset import PatternSet
+
+TEMPLATES = [
+    r'ERROR \w+ {word}: .*timeout',
+    r'{word}=\d+ took \d+ms',
+    r'GET /api/{word}/\d+ (200|404)',
+    r'user (\w+) logged in from {word}',
+    r'(?i)warn.*{word}',  # no literal under IGNORECASE: tried on every line
+]
+
+def make_words(count, rng):
+    return [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(5, 9))) + str(i)
+            for i in range(count)]
+
+def make_rules(count, words, rng):
+    return [rng.choice(TEMPLATES[:-1] if rng.random() < 0.98 else TEMPLATES[-1:]).format(word=words[i])
+            for i in range(count)]
+
+def make_lines(count, words, rng):
+    lines = []
+    for _ in range(count):
+        word = rng.choice(words)
+        lines.append(rng.choice([
+            f"{rng.randrange(10 ** 9)} ERROR db {word}: read timeout after 30s",
+            f"{rng.randrange(10 ** 9)} INFO {word}={rng.randrange(1000)} took {rng.randrange(500)}ms",
+            f"{rng.randrange(10 ** 9)} GET /api/{word}/{rng.randrange(10 ** 5)} 200",
+            f"{rng.randrange(10 ** 9)} INFO cache miss for key {word}",
+        ]))
+    return lines
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(0)
+    words = make_words(10000, rng)
+    rules = make_rules(10000, words, rng)
+    lines = make_lines(count, words, rng)
+    print(f"{count} log lines")
+    print(f"{'rules':>7}{'build':>10}{'memory':>10}{'unindexed':>11}{'set lines/s':>14}{'re lines/s':>13}{'matches':>9}")
+    for size in (10, 100, 1000, 10000):
+        subset = rules[:size]
+        start = time.perf_counter()
+        patterns = PatternSet(subset)
+        build = time.perf_counter() - start
+        # Built again for the memory figure, since tracing slows the build down
+        tracemalloc.start()
+        rebuilt = PatternSet(subset)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del rebuilt
+        start = time.perf_counter()
+        found = sum(len(patterns.search(line)) for line in lines)
+        indexed = count / (time.perf_counter() - start)
+        # Every rule on every line, on a sample when that would take long
+        regexes = [re.compile(rule) for rule in subset]
+        sample = lines[:max(50, min(count, 2000000 // size))]
+        start = time.perf_counter()
+        expected = sum(1 for line in sample for regex in regexes if regex.search(line))
+        naive = len(sample) / (time.perf_counter() - start)
+        assert expected == sum(len(patterns.search(line)) for line in sample)
+        print(f"{size:>7}{build:>9.2f}s{memory / 2 ** 20:>8.1f}MB{len(patterns.unindexed):>11}"
+              f"{indexed:>14.0f}{naive:>13.0f}{found:>9}")
+
+if __name__ == '__main__':
+    main()
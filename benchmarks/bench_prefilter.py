@@ -0,0 +1,66 @@
+"""
+Early rejection by required literals on a synthetic log corpus: for each
+pattern, the fraction of lines rejected without calling re, the time of a
+plain fullmatch loop against checking the literals over the whole corpus and
+calling fullmatch on the survivors, and test_many end to end with and without
+failure diagnostics.
+
+Run with: python benchmarks/bench_prefilter.py [lines]
+"""
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain import test_many
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.literals import literal_candidates
+
+PATTERNS = [
+    r'\d+ ERROR .*timeout.*',
+    r'\d+ \w+ GET /api/users/\d+ .*',
+    r'.* id=\d+ took \d+ms',
+    r'\d+ WARN disk usage above 90%',
+]
+
+LEVELS = ['INFO'] * 16 + ['DEBUG'] * 2 + ['WARN', 'ERROR']
+MESSAGES = [
+    'GET /api/users/{n} 200', 'GET /api/items/{n} 404', 'POST /api/login 302',
+    'cache miss for key user:{n}', 'connection reset by peer', 'upstream timeout after {n}s',
+    'GC pause {n}ms', 'disk usage above 90%', 'id={n} took {n}ms',
+]
+
+def make_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        f"{rng.randrange(10 ** 9)} {rng.choice(LEVELS)} "
+        + rng.choice(MESSAGES).replace('{n}', str(rng.randrange(1000)))
+        for _ in range(count)
+    ]
+
+def seconds(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    lines = make_corpus(count)
+    print(f"{count} log lines")
+    print(f"{'pattern':<34}{'rejected':>9}{'fullmatch':>11}{'prefilter':>11}{'speedup':>9}"
+          f"{'test_many':>11}{'no diag':>9}")
+    for pattern in PATTERNS:
+        compiled = compile_pattern(pattern)
+        literals = compiled.literals
+        rejected = sum(1 for line in lines if literals.rejects(line)) / count
+        fullmatch = compiled.regex.fullmatch
+        plain = seconds(lambda: [fullmatch(line) for line in lines])
+        filtered = seconds(lambda: [fullmatch(lines[row]) for row in literal_candidates(literals, lines)])
+        batch = seconds(lambda: test_many(pattern, lines))
+        quick = seconds(lambda: test_many(pattern, lines, diagnose=False))
+        print(f"{pattern:<34}{rejected:>9.1%}{plain:>10.3f}s{filtered:>10.3f}s{plain / filtered:>8.1f}x"
+              f"{batch:>10.3f}s{quick:>8.3f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Throughput of the tester's stepwise diagnostics on a pattern the automaton
+cannot handle (it ends in a lookahead), so every failure walks the step plan.
+
+Run with: python benchmarks/bench_step_plan.py
+"""
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+
+def main():
+    pattern = r'[A-Z][a-z][a-z]\d\d\s[^\s,;]\w(?=!)'
+    compiled = compile_pattern(pattern)
+    rng = random.Random(0)
+    # Valid prefixes of every length, so failures happen at every step
+    valid = 'Qwe42 xy'
+    strings = [valid[:rng.randint(0, len(valid))] + rng.choice('!?, 7') for _ in range(20000)]
+    compiled.test(strings[0])  # build the plan outside the timing
+    start = time.perf_counter()
+    for s in strings:
+        compiled.test(s)
+    elapsed = time.perf_counter() - start
+    print(f"{len(strings)} strings: {elapsed * 1e3:.1f} ms, {elapsed / len(strings) * 1e6:.2f} us per test")
+
+if __name__ == '__main__':
+    main()
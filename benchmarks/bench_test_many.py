@@ -0,0 +1,48 @@
+"""
+Throughput, in strings per second, of validating a column of values against one
+pattern: a loop over rexplain.test versus test_many, serially and in a process pool.
+
+Run with: python benchmarks/bench_test_many.py [count]
+"""
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain import test, test_many
+
+PATTERN = r'[A-Z]{2}\d{4}-[a-z]{3,8}'
+
+def make_values(count, seed=0):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        value = (''.join(rng.choice('ABCDEFGH') for _ in range(2)) + f'{rng.randrange(10000):04d}-'
+                 + ''.join(rng.choice('abcdefgh') for _ in range(rng.randint(3, 8))))
+        if rng.random() < 0.1:
+            # One value in ten is corrupted somewhere
+            at = rng.randrange(len(value))
+            value = value[:at] + '#' + value[at + 1:]
+        values.append(value)
+    return values
+
+def rate(fn, count):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    values = make_values(count)
+    sample = values[:count // 10]
+    print(f"{count} values, pattern {PATTERN}")
+    print(f"{'test() loop':<28}{rate(lambda: [test(PATTERN, v) for v in sample], len(sample)):>14,.0f} strings/s")
+    print(f"{'test_many':<28}{rate(lambda: test_many(PATTERN, values), count):>14,.0f} strings/s")
+    processes = os.cpu_count() or 1
+    if processes > 1:
+        label = f'test_many, {processes} processes'
+        print(f"{label:<28}{rate(lambda: test_many(PATTERN, values, processes=processes), count):>14,.0f} strings/s")
+
+if __name__ == '__main__':
+    main()
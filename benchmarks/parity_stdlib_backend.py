@@ -0,0 +1,139 @@
+"""
+Parity harness for the two parser backends.
+
+Parses a corpus of curated and randomly generated patterns with the native
+tokenizer/parser and with the stdlib backend (``backend='stdlib'``), then
+reports the throughput of each and every pattern on which they disagree:
+different ASTs, or a pattern only one of them rejects.
+
+Run with: python benchmarks/parity_stdlib_backend.py [--random N] [--seed S] [--show K]
+"""
+import sys
+import os
+import re
+import time
+import random
+import argparse
+from collections import Counter
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.parser import RegexParser
+
+CURATED = [
+    r'^\d{3}-\d{3}-\d{4}$',
+    r'^[\w.+-]+@[\w-]+\.[\w.]+$',
+    r'(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})',
+    r'https?://[^\s/$.?#].[^\s]*',
+    r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$',
+    r'(foo|bar|baz)+?qux',
+    r'cat|dog|bird',
+    r'apple|apricot',
+    r'(?i)hello world',
+    r'(?i:abc)def',
+    r'foo(?=bar)',
+    r'(?<!\$)\b\d+\b',
+    r'(?!un)\w+able',
+    r'\x41é\t\n',
+    r'[^\]\\-]+',
+    r'[.]',
+    r'a{2,}b{,3}c{4}',
+    r'(a)\1',
+    r'.*?end',
+    r'',
+    r'a|',
+    r'\[INFO\] .*',
+]
+
+ATOMS = [
+    'a', 'b', 'xyz', r'\d', r'\w', r'\s', r'\.', '.', '^', '$', '[a-z]', '[^0-9]',
+    '[abc]', r'\b', '(', ')', '(?:', '(?P<g>', '(?=', '(?!', '(?<=x', '|',
+]
+QUANTS = ['', '', '', '*', '+', '?', '*?', '{2}', '{1,3}', '{2,}']
+
+def random_pattern(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 10)):
+        parts.append(rng.choice(ATOMS))
+        if parts[-1] not in ('(', '(?:', '(?P<g>', '(?=', '(?!', '(?<=x', '|', '^', '$', r'\b'):
+            parts.append(rng.choice(QUANTS))
+    return ''.join(parts)
+
+def build_corpus(count: int, seed: int):
+    rng = random.Random(seed)
+    corpus = list(CURATED)
+    seen = set(corpus)
+    while len(corpus) < len(CURATED) + count:
+        pattern = random_pattern(rng)
+        if pattern in seen:
+            continue
+        try:
+            re.compile(pattern)
+        except re.error:
+            continue
+        seen.add(pattern)
+        corpus.append(pattern)
+    return corpus
+
+def parse_all(corpus, backend):
+    parser = RegexParser()
+    results = []
+    start = time.perf_counter()
+    for pattern in corpus:
+        try:
+            results.append(parser.parse(pattern, backend=backend))
+        except ValueError as e:
+            results.append(e)
+    return results, time.perf_counter() - start
+
+def classify(pattern, native, stdlib):
+    # Rough cause of a difference, judged from the pattern text
+    if isinstance(native, Exception):
+        return 'native rejects'
+    if isinstance(stdlib, Exception):
+        return 'stdlib rejects'
+    if '|' in pattern:
+        return 'alternation rewritten by re'
+    if '(?' in pattern and 'GROUP_FLAGS' not in repr(native):
+        return 'redundant group dropped by re'
+    if '{,' in pattern:
+        return 'quantifier spelled differently'
+    if re.search(r'\\x|\\u|\[\.\]|\[\\d\]', pattern):
+        return 'escapes rebuilt'
+    return 'other'
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--random', type=int, default=5000, help='number of random patterns')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--show', type=int, default=3, help='examples to print per difference kind')
+    args = ap.parse_args()
+
+    corpus = build_corpus(args.random, args.seed)
+    chars = sum(len(p) for p in corpus)
+    native, t_native = parse_all(corpus, 'native')
+    stdlib, t_stdlib = parse_all(corpus, 'stdlib')
+    print(f"corpus: {len(corpus)} patterns, {chars} chars")
+    for name, t in (('native', t_native), ('stdlib', t_stdlib)):
+        print(f"{name:<8}{t * 1e3:>9.1f} ms{len(corpus) / t:>12.0f} patterns/s{chars / t / 1e6:>8.2f} MB/s")
+
+    kinds = Counter()
+    examples = {}
+    for pattern, a, b in zip(corpus, native, stdlib):
+        if isinstance(a, Exception) and isinstance(b, Exception):
+            continue
+        if not isinstance(a, Exception) and not isinstance(b, Exception) and a == b:
+            kinds['identical'] += 1
+            continue
+        kind = classify(pattern, a, b)
+        kinds[kind] += 1
+        examples.setdefault(kind, []).append((pattern, a, b))
+    print()
+    for kind, n in kinds.most_common():
+        print(f"{kind:<36}{n:>7}{n / len(corpus):>8.1%}")
+    for kind, items in examples.items():
+        print(f"\n== {kind}")
+        for pattern, a, b in items[:args.show]:
+            print(f"  pattern: {pattern!r}\n  native:  {a!r}\n  stdlib:  {b!r}")
+
+if __name__ == '__main__':
+    main()
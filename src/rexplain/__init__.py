@@ -3,14 +3,40 @@ __version__ = "0.3.1"
 from .core.explainer import RegexExplainer
 from .core.generator import ExampleGenerator
 from .core.tester import RegexTester
+from .core.compiled import CompiledPattern, compile_pattern
+from .core.patternset import PatternSet
 
-def explain(pattern: str, flags: int = 0) -> str:
+def compile(pattern: str, flags: int = 0) -> CompiledPattern:
+    r"""
+    Parse a regex pattern once and return an object that explains, generates and tests.
+
+    The explanation, the compiled ``re.Pattern`` and the generation and matching
+    plans are built on first use and kept. Compiling the same pattern and flags
+    again returns the same object while it is cached.
+
+    Args:
+        pattern (str): The regex pattern.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+
+    Returns:
+        CompiledPattern: Object with ``explain()``, ``examples(n)`` and ``test(s)``.
+
+    Example:
+        >>> p = compile(r"\d{3}")
+        >>> p.test("123").matches
+        True
+    """
+    return compile_pattern(pattern, flags)
+
+def explain(pattern: str, flags: int = 0, group_literals: bool = False) -> str:
     r"""
     Explain what a regex pattern does, line by line.
 
     Args:
         pattern (str): The regex pattern to explain.
         flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+        group_literals (bool, optional): Describe runs of literal characters as a
+            whole instead of one line per character. Defaults to False.
 
     Returns:
         str: A line-by-line explanation of the regex pattern.
@@ -19,10 +45,11 @@ def explain(pattern: str, flags: int = 0) -> str:
         >>> explain(r"^\w+$")
         '^ - asserts position at the start of a line\n\w+ - matches a word character one or more times (greedy)\n$ - asserts position at the end of a line'
     """
-    return RegexExplainer().explain(pattern, flags=flags)
+    return compile_pattern(pattern, flags).explain(group_literals)
 
 
-def examples(pattern: str, count: int = 3, flags: int = 0):
+def examples(pattern: str, count: int = 3, flags: int = 0, seed=None, unique: bool = False,
+             length=None):
     r"""
     Generate example strings that match the regex pattern.
 
@@ -30,6 +57,13 @@ def examples(pattern: str, count: int = 3, flags: int = 0):
         pattern (str): The regex pattern.
         count (int, optional): Number of examples to generate. Defaults to 3.
         flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+        seed (Optional[Union[int, str]], optional): Seed for reproducible
+            examples; None draws from the global ``random`` module. Defaults to None.
+        unique (bool, optional): Return distinct examples. Raises ValueError if
+            the pattern has fewer than ``count``. Defaults to False.
+        length (Union[int, Tuple[int, int], None], optional): Only examples of
+            this length or inclusive ``(min, max)`` length range, each equally
+            likely. Defaults to None.
 
     Returns:
         List[str]: Example strings matching the pattern.
@@ -38,10 +72,42 @@ def examples(pattern: str, count: int = 3, flags: int = 0):
         >>> examples(r"[A-Z]{2}\d{2}", count=2)
         ['AB12', 'XY34']
     """
-    return ExampleGenerator().generate(pattern, count, flags=flags)
+    return compile_pattern(pattern, flags).examples(count, seed, unique, length)
+
+
+def generate_parallel(pattern: str, count: int, flags: int = 0, processes=1, seed=None,
+                      unique: bool = False, length=None):
+    r"""
+    Generate many examples in reproducible blocks, optionally across processes.
+
+    Each block of examples has its own random stream derived from ``seed``, so
+    a seed gives the same examples whatever the number of processes.
+
+    Args:
+        pattern (str): The regex pattern.
+        count (int): Number of examples.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+        processes (Optional[int], optional): Worker processes; None uses one per
+            CPU. Defaults to 1.
+        seed (Optional[Union[int, str]], optional): Seed of the run; None picks
+            one from the global ``random`` module. Defaults to None.
+        unique (bool, optional): Generate distinct examples. Defaults to False.
+        length (Union[int, Tuple[int, int], None], optional): Only examples of
+            this length or inclusive ``(min, max)`` length range. Defaults to None.
+
+    Returns:
+        Iterator[str]: The examples, in order.
+
+    Example:
+        >>> fixtures = generate_parallel(r"[A-Z]{2}\d{6}", 10**6, processes=8, seed=42)
+        >>> next(fixtures)
+        'KN002768'
+    """
+    from .core.generator import generate_parallel as _generate_parallel
+    return _generate_parallel(pattern, count, flags, processes, seed, unique=unique, length=length)
 
 
-def test(pattern: str, test_string: str, flags: int = 0):
+def test(pattern: str, test_string: str, flags: int = 0, timeout=None):
     r"""
     Test if a string matches a regex pattern and explain why/why not.
 
@@ -49,6 +115,9 @@ def test(pattern: str, test_string: str, flags: int = 0):
         pattern (str): The regex pattern.
         test_string (str): The string to test.
         flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+        timeout (Optional[float], optional): Time budget in seconds. A test that
+            runs out of time returns a result with ``timed_out`` set instead of
+            hanging. Defaults to None.
 
     Returns:
         MatchResult: Result object with match status and explanation.
@@ -57,5 +126,50 @@ def test(pattern: str, test_string: str, flags: int = 0):
         >>> test(r"foo.*", "foobar")
         MatchResult(matches=True, reason='Full match.', ...)
     """
-    result = RegexTester().test(pattern, test_string, flags=flags)
-    return result
\ No newline at end of file
+    return compile_pattern(pattern, flags).test(test_string, timeout)
+
+
+def test_many(pattern: str, strings, flags: int = 0, processes=1, diagnose: bool = True):
+    r"""
+    Test a regex pattern against many strings and collect columnar results.
+
+    Args:
+        pattern (str): The regex pattern.
+        strings (Iterable[str]): The strings to test, consumed lazily in chunks.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+        processes (Optional[int], optional): Worker processes for large inputs;
+            None uses one per CPU. Defaults to 1.
+        diagnose (bool, optional): Record where non-matching strings fail. Pass
+            False when only match flags are needed. Defaults to True.
+
+    Returns:
+        BatchResult: Match flags, failure offsets and partial match lengths per
+        string; ``result(i)`` builds the full MatchResult of row ``i``.
+
+    Example:
+        >>> batch = test_many(r"\d+", ["12", "1a"])
+        >>> list(batch.matches), list(batch.failed_at)
+        ([1, 0], [-1, 1])
+    """
+    from .core.batch import test_many as _test_many
+    return _test_many(pattern, strings, flags, processes, diagnose=diagnose)
+
+
+def analyze(pattern: str, flags: int = 0):
+    r"""
+    Classify a regex pattern's worst-case matching cost without running it.
+
+    Args:
+        pattern (str): The regex pattern.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+
+    Returns:
+        Analysis: ``'linear'``, ``'polynomial'`` (with its degree) or
+        ``'exponential'``, with the nodes responsible and an attack string for each.
+
+    Example:
+        >>> result = analyze(r"(a+)+$")
+        >>> result.complexity, result.findings[0].spans
+        ('exponential', ((0, 5), (1, 3)))
+    """
+    return compile_pattern(pattern, flags).analysis
@@ -7,6 +7,7 @@ try:
     from rexplain.core.explainer import RegexExplainer
     from rexplain.core.generator import ExampleGenerator
     from rexplain.core.tester import RegexTester
+    from rexplain.core.compiled import compile_pattern
     from rexplain import __version__
 except ImportError as e:
     print("IMPORT ERROR:", e, file=sys.stderr)
@@ -20,6 +21,18 @@ except ImportError as e:
     class RegexTester:
         def test(self, pattern, string):
             return type('Result', (), {"matches": True, "reason": "[Stub] Always matches", "to_dict": lambda self: {"matches": True, "reason": "[Stub] Always matches"}})()
+    class compile_pattern:
+        def __init__(self, pattern, flags=0):
+            self.pattern = pattern
+        def explain(self):
+            return RegexExplainer().explain(self.pattern)
+        def examples(self, count=3):
+            return ExampleGenerator().generate(self.pattern, count)
+        def test(self, string, timeout=None):
+            return RegexTester().test(self.pattern, string)
+        @property
+        def analysis(self):
+            return type('Analysis', (), {"complexity": "linear", "degree": 1, "findings": ()})()
     __version__ = "unknown"
 
 PROJECT_ABOUT = (
@@ -28,10 +41,30 @@ PROJECT_ABOUT = (
     "Features: line-by-line explanations, example generation, detailed match testing, CLI & API."
 )
 
+def format_analysis(pattern, analysis, repeats=None):
+    # Complexity, then each finding with the responsible nodes marked under the pattern
+    if analysis.complexity == 'polynomial':
+        lines = [f"Complexity: polynomial (degree {analysis.degree})"]
+    else:
+        lines = [f"Complexity: {analysis.complexity}"]
+    for finding in analysis.findings:
+        marks = [' '] * len(pattern)
+        for start, end in finding.spans:
+            for i in range(start, end):
+                if marks[i] == ' ':
+                    marks[i] = '^'
+        lines.append('')
+        lines.append(f"{finding.kind}: {finding.message}")
+        lines.append(f"  {pattern}")
+        lines.append(f"  {''.join(marks).rstrip()}")
+        n = repeats if repeats is not None else finding.repeats
+        lines.append(f"  attack string: {finding.prefix!r} + {finding.pump!r} * {n} + {finding.suffix!r}")
+    return '\n'.join(lines)
+
 def main():
     parser = argparse.ArgumentParser(
         description='rexplain: Regex explanation toolkit',
-        epilog='Examples:\n  rexplain explain "^\\d{3}-\\d{2}-\\d{4}$" --examples 2\n  rexplain test "foo.*" "foobar"\n  rexplain --version\n  rexplain --about',
+        epilog='Examples:\n  rexplain explain "^\\d{3}-\\d{2}-\\d{4}$" --examples 2\n  rexplain test "foo.*" "foobar"\n  rexplain test "(a+)+b" "aaaaaaaaaaaaaaaaaaaaaaaaaaaa" --timeout 1\n  rexplain analyze "(a+)+$"\n  rexplain --version\n  rexplain --about',
         formatter_class=argparse.RawTextHelpFormatter
     )
     parser.add_argument('--version', action='store_true', help='Show version and exit')
@@ -53,6 +86,14 @@ def main():
     test_parser = subparsers.add_parser('test', help='Test if a string matches a pattern')
     test_parser.add_argument('pattern', help='Regex pattern to test')
     test_parser.add_argument('string', help='String to test against the pattern')
+    test_parser.add_argument('--timeout', type=float, default=None,
+                             help='Give up after this many seconds instead of hanging on catastrophic backtracking')
+
+    # rexplain analyze "pattern"
+    analyze_parser = subparsers.add_parser('analyze', help='Check a pattern for catastrophic backtracking (ReDoS)')
+    analyze_parser.add_argument('pattern', help='Regex pattern to analyze')
+    analyze_parser.add_argument('--repeats', type=int, default=None,
+                                help='Repetitions of the pumped part in attack strings')
 
     args = parser.parse_args()
 
@@ -69,27 +110,28 @@ def main():
 
     try:
         if args.command == 'explain':
-            explainer = RegexExplainer()
-            explanation = explainer.explain(args.pattern)
-            print(explanation)
+            # One compiled pattern serves both the explanation and the examples
+            compiled = compile_pattern(args.pattern)
+            print(compiled.explain())
             if getattr(args, 'examples', 0) > 0:
-                generator = ExampleGenerator()
                 print(f"\nExample matches:")
-                for ex in generator.generate(args.pattern, args.examples):
+                for ex in compiled.examples(args.examples):
                     print(f"  {ex}")
             sys.exit(0)
         elif args.command == 'examples':
-            generator = ExampleGenerator()
-            examples = generator.generate(args.pattern, args.count)
+            examples = compile_pattern(args.pattern).examples(args.count)
             for ex in examples:
                 print(ex)
             sys.exit(0)
         elif args.command == 'test':
-            tester = RegexTester()
-            result = tester.test(args.pattern, args.string)
+            result = compile_pattern(args.pattern).test(args.string, args.timeout)
             output = result.to_dict() if hasattr(result, 'to_dict') else result
             print(output)
             sys.exit(0 if getattr(result, 'matches', False) else 1)
+        elif args.command == 'analyze':
+            analysis = compile_pattern(args.pattern).analysis
+            print(format_analysis(args.pattern, analysis, args.repeats))
+            sys.exit(0 if analysis.complexity == 'linear' else 1)
         else:
             parser.print_help()
             sys.exit(1)
@@ -0,0 +1,551 @@
+r"""
+Static ReDoS analysis: worst-case matching cost of a pattern in a backtracking engine.
+
+Python's ``re`` backtracks, so some patterns take exponential or high-degree
+polynomial time on inputs that almost match. :func:`analyze` classifies a
+pattern as linear, polynomial (with degree) or exponential without running it,
+by looking for the three shapes behind almost every slow regex:
+
+* A repetition whose body ends (or starts) with another unbounded repetition
+  that can match the same character as the start (or end) of the body, as in
+  ``(a+)+`` or ``(\w+\s?)*``: a run of that character can be split between
+  iterations in exponentially many ways.
+* A repetition over an alternation with two branches that match the same
+  string, as in ``(.|\s)*``.
+* Unbounded repetitions one after another that can match the same character,
+  as in ``\d+\d+`` or ``.*=.*=.*``: a run of it can be divided between ``k`` of
+  them in O(n^k) ways. Groups are looked through and bounded repetitions are
+  unrolled when finding them, so ``(?:.*a)(?:.*a)`` has degree 2 and
+  ``(.*a){6}`` degree 6, like ``.*a.*a.*a.*a.*a.*a``.
+
+Lookarounds are never backtracked into once they succeed, so a construct at
+the end of a lookaround body, with nothing after it in the body that could
+fail, is not reported: ``(?=(a+)+)b`` is fast.
+
+Every finding names the responsible nodes with their spans in the pattern and
+builds an attack string: a prefix that reaches the nodes, a pumped part repeated
+many times and a suffix that makes the match fail.
+
+Character sets are compared on a fixed alphabet of probe characters (ASCII plus
+a few representative non-ASCII ones), and the analysis looks at a bounded
+number of candidates per node, so it runs in time proportional to the size of
+the AST. It is a screen, not a proof: it can miss exotic cases and flag a few
+patterns that a backtracking engine handles well.
+"""
+import re
+import string
+from typing import List, NamedTuple, Optional, Tuple
+
+from .cache import LRUCache, cached_parse
+from .parser import (
+    RegexAST, Sequence, Literal, LiteralRun, AnyChar, CharClass, Group, Quantifier,
+    Anchor, Escape, Alternation, _child_spans,
+)
+
+LINEAR = 'linear'
+POLYNOMIAL = 'polynomial'
+EXPONENTIAL = 'exponential'
+
+# Characters every atom is probed with; earlier ones are preferred in attack strings
+_PROBES = (
+    string.ascii_lowercase + string.digits + string.ascii_uppercase + '_ !-.,:;=/@#'
+    + ''.join(c for c in string.punctuation if c not in '_!-.,:;=/@#')
+    + '\t\n\r\x0b\x0c' + ''.join(chr(i) for i in range(32) if chr(i) not in '\t\n\r\x0b\x0c') + '\x7f'
+    + '\x85\xa0\xe9\xdfΣ٣ 中\U0001f600'
+)
+_ALL = (1 << len(_PROBES)) - 1
+
+# A quantifier that can repeat at least this many times counts as unbounded
+MANY_REPEATS = 64
+# Candidates kept per node, which bounds the work per node
+_MAX_CANDIDATES = 8
+# Longest shortest-match string kept per node, for attack strings
+_MAX_EXAMPLE = 256
+# Most items a chain of quantifiers is unrolled into, which bounds the degree found
+_MAX_UNROLLED = 256
+# Repetitions of the pumped part in the attack string by default
+_DEFAULT_REPEATS = {EXPONENTIAL: 30, POLYNOMIAL: 5000}
+
+_ZERO_WIDTH_ESCAPES = frozenset({r'\b', r'\B', r'\A', r'\Z', r'\G'})
+_BACKREFERENCE = re.compile(r'\\(?:[1-9]|g<)')
+_ZERO_WIDTH_GROUPS = frozenset({
+    'GROUP_LOOKAHEAD', 'GROUP_NEG_LOOKAHEAD', 'GROUP_LOOKBEHIND', 'GROUP_NEG_LOOKBEHIND',
+})
+# Groups that only wrap their body, as far as backtracking is concerned
+_PLAIN_GROUPS = frozenset({'GROUP_OPEN', 'GROUP_NONCAP', 'GROUP_NAMED'})
+
+# Probe masks of atoms, keyed by (regex text, flags)
+_mask_cache = LRUCache(maxsize=4096)
+
+class Finding(NamedTuple):
+    """
+    One construct that makes matching slow.
+
+    Attributes:
+        kind (str): ``'nested_quantifier'``, ``'overlapping_alternation'`` or
+            ``'adjacent_quantifiers'``.
+        complexity (str): ``'polynomial'`` or ``'exponential'``.
+        degree (Optional[int]): Degree of the polynomial, None if exponential.
+        nodes (Tuple[RegexAST, ...]): The responsible nodes.
+        spans (Tuple[Tuple[int, int], ...]): Their ``(start, end)`` in the pattern.
+        message (str): Human-readable explanation.
+        prefix (str): Start of the attack string, reaching the nodes.
+        pump (str): Part of the attack string to repeat.
+        suffix (str): End of the attack string, making the match fail.
+    """
+    kind: str
+    complexity: str
+    degree: Optional[int]
+    nodes: Tuple[RegexAST, ...]
+    spans: Tuple[Tuple[int, int], ...]
+    message: str
+    prefix: str
+    pump: str
+    suffix: str
+
+    @property
+    def repeats(self) -> int:
+        """
+        Repetitions of ``pump`` in :meth:`witness` by default.
+
+        30 for exponential findings and 5000 for polynomial ones.
+        """
+        return _DEFAULT_REPEATS[self.complexity]
+
+    def witness(self, repeats: Optional[int] = None) -> str:
+        r"""
+        Build the attack string.
+
+        Args:
+            repeats (Optional[int], optional): Times to repeat ``pump``. Defaults
+                to :attr:`repeats`.
+
+        Returns:
+            str: ``prefix + pump * repeats + suffix``.
+        """
+        if repeats is None:
+            repeats = self.repeats
+        return self.prefix + self.pump * repeats + self.suffix
+
+class Analysis(NamedTuple):
+    """
+    Result of :func:`analyze`.
+
+    Attributes:
+        pattern (str): The analyzed pattern.
+        complexity (str): ``'linear'``, ``'polynomial'`` or ``'exponential'``.
+        degree (Optional[int]): 1 if linear, the degree if polynomial, None if exponential.
+        findings (Tuple[Finding, ...]): The constructs responsible, worst first.
+    """
+    pattern: str
+    complexity: str
+    degree: Optional[int]
+    findings: Tuple[Finding, ...]
+
+    @property
+    def safe(self) -> bool:
+        """Whether matching takes linear time in the worst case."""
+        return self.complexity == LINEAR
+
+def analyze(pattern: str, flags: int = 0) -> Analysis:
+    r"""
+    Classify the worst-case backtracking cost of a regex pattern.
+
+    Args:
+        pattern (str): The regex pattern.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+
+    Returns:
+        Analysis: The complexity class and the findings behind it.
+
+    Raises:
+        ValueError: If the pattern cannot be parsed.
+
+    Example:
+        >>> analyze(r'(a+)+$').complexity
+        'exponential'
+        >>> analyze(r'\d+\d+').degree
+        2
+    """
+    return analyze_ast(cached_parse(pattern, flags), pattern, flags)
+
+def analyze_ast(ast: RegexAST, pattern: str, flags: int = 0) -> Analysis:
+    r"""
+    Classify the worst-case backtracking cost of an already parsed pattern.
+
+    Args:
+        ast (RegexAST): Root node from the native parser, whose spans are exact.
+        pattern (str): The pattern text the AST was parsed from.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+
+    Returns:
+        Analysis: The complexity class and the findings behind it.
+    """
+    findings = _Analyzer(ast, pattern, int(flags)).run()
+    findings.sort(key=lambda f: (f.complexity != EXPONENTIAL, -(f.degree or 0), f.spans))
+    if any(f.complexity == EXPONENTIAL for f in findings):
+        return Analysis(pattern, EXPONENTIAL, None, tuple(findings))
+    if findings:
+        return Analysis(pattern, POLYNOMIAL, findings[0].degree, tuple(findings))
+    return Analysis(pattern, LINEAR, 1, ())
+
+def _probe_mask(text: str, flags: int) -> int:
+    def build():
+        try:
+            fullmatch = re.compile(text, flags).fullmatch
+        except re.error:
+            return _ALL  # unknown: assume it can match anything
+        mask = 0
+        for bit, char in enumerate(_PROBES):
+            if fullmatch(char):
+                mask |= 1 << bit
+        return mask
+    return _mask_cache.get_or_create((text, flags), build)
+
+def _char(mask: int) -> str:
+    # The preferred probe character in a non-empty mask
+    return _PROBES[(mask & -mask).bit_length() - 1]
+
+def _cap(text: str) -> str:
+    return text[:_MAX_EXAMPLE]
+
+class _Analyzer:
+    # Per-node attributes live in lists indexed by pre-order node id. Leaves are
+    # shared between positions in the tree, so nodes are told apart by id.
+    def __init__(self, ast: RegexAST, pattern: str, flags: int):
+        self.pattern = pattern
+        self.flags = flags & ~re.VERBOSE
+        self.nodes: List[RegexAST] = []
+        self.spans: List[Tuple[int, int]] = []
+        self.parents: List[int] = []
+        self.children: List[List[int]] = []
+        stack = [(ast, 0, -1)]
+        while stack:
+            node, start, parent = stack.pop()
+            nid = len(self.nodes)
+            self.nodes.append(node)
+            self.spans.append((start, start + node.width))
+            self.parents.append(parent)
+            self.children.append([])
+            if parent >= 0:
+                self.children[parent].append(nid)
+            stack.extend((child, child_start, nid) for child, child_start in reversed(_child_spans(node, start)))
+        count = len(self.nodes)
+        self.nullable = [False] * count
+        self.first = [0] * count  # characters that can start a non-empty match
+        self.last = [0] * count  # characters that can end one
+        self.chars = [0] * count  # characters that can be consumed anywhere
+        self.single = [False] * count  # consumes exactly one character per match
+        self.example = [''] * count  # a shortest match
+        self.heads: List[Tuple[int, ...]] = [()] * count  # unbounded quantifiers that can start a match
+        self.tails: List[Tuple[int, ...]] = [()] * count  # ... and end one
+        self.has_unbounded = [False] * count  # an unbounded quantifier in the subtree
+        self.chained = set()  # sequences and repeats already searched as part of a larger chain
+
+    def text(self, nid: int) -> str:
+        start, end = self.spans[nid]
+        return self.pattern[start:end]
+
+    def run(self) -> List[Finding]:
+        for nid in range(len(self.nodes) - 1, -1, -1):  # children before parents
+            self._summarize(nid)
+        self.prefixes = self._prefixes()
+        self.suffix_char = self._suffix_char()
+        findings = []
+        for nid, node in enumerate(self.nodes):  # parents before children
+            if self._unbounded(nid):
+                finding = self._nested(nid) or self._alternation(nid)
+                if finding and not self._ends_lookaround(nid):
+                    findings.append(finding)
+            if (isinstance(node, Sequence) or self._unrollable(nid)) and nid not in self.chained:
+                finding = self._adjacent(nid)
+                if finding:
+                    findings.append(finding)
+        return findings
+
+    def _unbounded(self, nid: int) -> bool:
+        node = self.nodes[nid]
+        return (isinstance(node, Quantifier) and not (len(node.quant) > 1 and node.quant.endswith('+'))
+                and (node.max is None or node.max - node.min >= MANY_REPEATS))
+
+    def _unrollable(self, nid: int) -> bool:
+        # A bounded repeat of something holding an unbounded quantifier, as in (.*a){6}
+        node = self.nodes[nid]
+        return (isinstance(node, Quantifier) and not self._unbounded(nid) and node.max is not None
+                and node.max >= 2 and not node.quant.endswith('+') and self.has_unbounded[nid])
+
+    def _ends_lookaround(self, nid: int) -> bool:
+        # Whether the node sits in a lookaround body with nothing after it in
+        # the body: the lookaround then succeeds without backtracking into it
+        while True:
+            parent = self.parents[nid]
+            if parent < 0:
+                return False
+            node = self.nodes[parent]
+            if isinstance(node, Group) and node.group_type in _ZERO_WIDTH_GROUPS:
+                return True
+            siblings = self.children[parent]
+            if isinstance(node, (Sequence, Group)) and siblings[-1] != nid:
+                return False
+            if isinstance(node, Quantifier) and node.max != 1:
+                return False  # the next repetition follows
+            nid = parent
+
+    def _atom(self, nid: int, text: str) -> None:
+        mask = _probe_mask(text, self.flags)
+        self.first[nid] = self.last[nid] = self.chars[nid] = mask
+        self.single[nid] = True
+        self.example[nid] = _char(mask) if mask else ''
+
+    def _summarize(self, nid: int) -> None:
+        node = self.nodes[nid]
+        kids = self.children[nid]
+        self.has_unbounded[nid] = self._unbounded(nid) or any(self.has_unbounded[k] for k in kids)
+        if isinstance(node, Literal):
+            self._atom(nid, re.escape(node.value))
+            self.example[nid] = node.value
+        elif isinstance(node, LiteralRun):
+            self.first[nid] = _probe_mask(re.escape(node.value[0]), self.flags)
+            self.last[nid] = _probe_mask(re.escape(node.value[-1]), self.flags)
+            self.chars[nid] = 0
+            for char in set(node.value):
+                self.chars[nid] |= _probe_mask(re.escape(char), self.flags)
+            self.example[nid] = _cap(node.value)
+        elif isinstance(node, AnyChar):
+            self._atom(nid, '.')
+        elif isinstance(node, CharClass):
+            self._atom(nid, node.value)
+        elif isinstance(node, Escape):
+            if node.value in _ZERO_WIDTH_ESCAPES or _BACKREFERENCE.match(node.value):
+                # Zero-width, or a backreference whose text is not known statically
+                self.nullable[nid] = True
+            else:
+                self._atom(nid, node.value)
+        elif isinstance(node, Anchor):
+            self.nullable[nid] = True
+        elif isinstance(node, Group):
+            if node.group_type in _ZERO_WIDTH_GROUPS or not kids:
+                self.nullable[nid] = True
+            else:
+                self._copy(nid, kids[0])
+                if node.group_type == 'GROUP_CONDITIONAL':
+                    self.nullable[nid] = True
+                elif node.group_type == 'GROUP_ATOMIC':
+                    # Never backtracked into, so its repetitions cannot be re-split
+                    self.heads[nid] = self.tails[nid] = ()
+        elif isinstance(node, Quantifier):
+            child = kids[0]
+            self._copy(nid, child)
+            self.nullable[nid] = self.nullable[child] or node.min == 0
+            self.single[nid] = False
+            self.example[nid] = _cap(self.example[child] * min(node.min, _MAX_EXAMPLE))
+            if self._unbounded(nid):
+                self.heads[nid] = ((nid,) + self.heads[child])[:_MAX_CANDIDATES]
+                self.tails[nid] = ((nid,) + self.tails[child])[:_MAX_CANDIDATES]
+        elif isinstance(node, Sequence):
+            self._sequence(nid, kids)
+        elif isinstance(node, Alternation):
+            self.nullable[nid] = any(self.nullable[k] for k in kids)
+            heads = ()
+            tails = ()
+            for k in kids:
+                self.first[nid] |= self.first[k]
+                self.last[nid] |= self.last[k]
+                self.chars[nid] |= self.chars[k]
+                heads += self.heads[k]
+                tails += self.tails[k]
+            self.heads[nid] = heads[:_MAX_CANDIDATES]
+            self.tails[nid] = tails[:_MAX_CANDIDATES]
+            self.single[nid] = bool(kids) and all(self.single[k] for k in kids)
+            if kids:
+                self.example[nid] = min((self.example[k] for k in kids), key=len)
+
+    def _copy(self, nid: int, child: int) -> None:
+        self.nullable[nid] = self.nullable[child]
+        self.first[nid] = self.first[child]
+        self.last[nid] = self.last[child]
+        self.chars[nid] = self.chars[child]
+        self.single[nid] = self.single[child]
+        self.example[nid] = self.example[child]
+        self.heads[nid] = self.heads[child]
+        self.tails[nid] = self.tails[child]
+
+    def _sequence(self, nid: int, kids: List[int]) -> None:
+        nullable = self.nullable
+        heads = ()
+        for k in kids:
+            self.first[nid] |= self.first[k]
+            heads += self.heads[k]
+            if not nullable[k]:
+                break
+        tails = ()
+        for k in reversed(kids):
+            self.last[nid] |= self.last[k]
+            tails += self.tails[k]
+            if not nullable[k]:
+                break
+        for k in kids:
+            self.chars[nid] |= self.chars[k]
+        self.nullable[nid] = all(nullable[k] for k in kids)
+        self.heads[nid] = heads[:_MAX_CANDIDATES]
+        self.tails[nid] = tails[:_MAX_CANDIDATES]
+        self.example[nid] = _cap(''.join(self.example[k] for k in kids))
+
+    def _prefixes(self) -> List[str]:
+        # A shortest string leading from the start of the pattern to each node
+        prefixes = [''] * len(self.nodes)
+        for nid, node in enumerate(self.nodes):
+            kids = self.children[nid]
+            if isinstance(node, Sequence):
+                prefix = prefixes[nid]
+                for k in kids:
+                    prefixes[k] = prefix
+                    prefix = _cap(prefix + self.example[k])
+            else:
+                for k in kids:
+                    prefixes[k] = prefixes[nid]
+        return prefixes
+
+    def _suffix_char(self) -> str:
+        # A character the pattern cannot consume anywhere, to make the match fail
+        unused = _ALL & ~self.chars[0]
+        return _char(unused) if unused else ''
+
+    def _suffix(self, mask: int) -> str:
+        if self.suffix_char:
+            return self.suffix_char
+        unused = _ALL & ~mask
+        return _char(unused) if unused else ''
+
+    def _fullmatches(self, nid: int, text: str) -> Optional[bool]:
+        try:
+            return re.fullmatch(self.text(nid), text, self.flags) is not None
+        except re.error:
+            return None  # the fragment does not compile on its own
+
+    def _nested(self, nid: int) -> Optional[Finding]:
+        body = self.children[nid][0]
+        for inner, overlap in [(q, self.chars[q] & self.first[body]) for q in self.tails[body]] + \
+                              [(q, self.chars[q] & self.last[body]) for q in self.heads[body]]:
+            if inner == nid or not overlap:
+                continue
+            char = _char(overlap)
+            pump = char
+            if self._fullmatches(body, char) is False and self.example[body]:
+                pump = self.example[body]
+            message = (f"{self.text(nid)} repeats {self.text(body)}, which contains {self.text(inner)}; "
+                       f"both can match {char!r}, so a run of {char!r} can be split between the "
+                       f"repetitions in exponentially many ways")
+            return self._finding('nested_quantifier', EXPONENTIAL, None, (nid, inner), message,
+                                 nid, pump, self.chars[nid])
+        return None
+
+    def _alternation(self, nid: int) -> Optional[Finding]:
+        # Alternations repeated by this quantifier, not by a nested unbounded one
+        stack = list(self.children[nid])
+        while stack:
+            alt = stack.pop()
+            if self._unbounded(alt):
+                continue
+            stack.extend(self.children[alt])
+            if not isinstance(self.nodes[alt], Alternation) or self._merged_into_set(alt):
+                continue
+            options = self.children[alt][:_MAX_CANDIDATES]
+            for i, a in enumerate(options):
+                for b in options[i + 1:]:
+                    common = self._common_string(a, b)
+                    if common:
+                        message = (f"Alternatives {self.text(a)} and {self.text(b)} both match {common!r}, "
+                                   f"and {self.text(nid)} repeats them, so a run of {common!r} can be "
+                                   f"matched in exponentially many ways")
+                        return self._finding('overlapping_alternation', EXPONENTIAL, None, (nid, a, b),
+                                             message, nid, common, self.chars[nid])
+        return None
+
+    def _merged_into_set(self, alt: int) -> bool:
+        # re turns an alternation of single characters, classes and class escapes
+        # into one character set, which has nothing to backtrack into. It first
+        # factors out a prefix shared by every branch, so (a|a) stays ambiguous.
+        options = self.children[alt]
+        for k in options:
+            node = self.nodes[k]
+            if not (isinstance(node, Literal)
+                    or (isinstance(node, CharClass) and not node.value.startswith('[^'))
+                    or (isinstance(node, Escape) and self.single[k])):
+                return False
+        return len({self.text(k) for k in options}) > 1
+
+    def _common_string(self, a: int, b: int) -> str:
+        # A non-empty string both alternatives match, if one is easy to find
+        if not self.first[a] & self.first[b]:
+            return ''
+        if self.single[a] and self.single[b]:
+            return _char(self.chars[a] & self.chars[b])
+        for x, y in ((a, b), (b, a)):
+            example = self.example[x]
+            if example and self._fullmatches(y, example) and self._fullmatches(x, example):
+                return example
+        return ''
+
+    def _adjacent(self, nid: int) -> Optional[Finding]:
+        # Chains of unbounded quantifiers, in order, that share a character.
+        # Each chain is (characters shared so far, positions of its quantifiers
+        # in the items).
+        items = self._items(nid)
+        chains: List[Tuple[int, Tuple[int, ...]]] = []
+        best: Tuple[int, Tuple[int, ...]] = (0, ())
+        for position, k in enumerate(items):
+            if self._unbounded(k):
+                mask = self.chars[k]
+                grown = [(shared & mask, ids + (position,)) for shared, ids in chains if shared & mask]
+                chains = sorted(grown + [(mask, (position,))], key=lambda c: -len(c[1]))[:_MAX_CANDIDATES]
+                for chain in chains:
+                    if len(chain[1]) > len(best[1]):
+                        best = chain
+            elif not self.nullable[k]:
+                # A chain survives a single character it can also be pumped through
+                if self.single[k]:
+                    chains = [(shared & self.chars[k], ids) for shared, ids in chains if shared & self.chars[k]]
+                else:
+                    chains = []
+        shared, positions = best
+        degree = len(positions)
+        if degree < 2 or self._ends_lookaround(items[positions[-1]]):
+            return None
+        char = _char(shared)
+        # A quantifier unrolled from a bounded repeat appears once per repetition
+        ids = tuple(dict.fromkeys(items[p] for p in positions))
+        texts = ', '.join(self.text(q) for q in ids)
+        if len(ids) < degree:
+            texts = f"{degree} repetitions of {texts}"
+        message = (f"{texts} can all match {char!r}, so a run of "
+                   f"{char!r} can be divided between them in O(n^{degree}) ways")
+        prefix = self.prefixes[nid] + ''.join(self.example[k] for k in items[:positions[0]])
+        return self._finding('adjacent_quantifiers', POLYNOMIAL, degree, ids, message, ids[0], char,
+                             shared, _cap(prefix))
+
+    def _items(self, nid: int) -> List[int]:
+        # The node as a flat list of nodes matched one after another: sequences
+        # and plain groups are opened and bounded repeats holding an unbounded
+        # quantifier unrolled, up to _MAX_UNROLLED items
+        node = self.nodes[nid]
+        kids = self.children[nid]
+        if isinstance(node, Sequence) or (isinstance(node, Group) and node.group_type in _PLAIN_GROUPS):
+            self.chained.add(nid)
+            items = []
+            for k in kids:
+                items.extend(self._items(k))
+            return items[:_MAX_UNROLLED]
+        if self._unrollable(nid):
+            self.chained.add(nid)
+            body = self._items(kids[0])
+            return body * min(node.max, max(1, _MAX_UNROLLED // max(1, len(body))))
+        return [nid]
+
+    def _finding(self, kind, complexity, degree, ids, message, at, pump, mask, prefix=None) -> Finding:
+        return Finding(
+            kind, complexity, degree,
+            tuple(self.nodes[i] for i in ids),
+            tuple(self.spans[i] for i in ids),
+            message, self.prefixes[at] if prefix is None else prefix, pump, self._suffix(mask),
+        )
@@ -0,0 +1,541 @@
+r"""
+Thompson NFA for the regular subset of Python regexes.
+
+The automaton is built from an AST whose structure matches what ``re`` itself
+parses (``RegexParser().parse(pattern, flags, backend='stdlib')``) and runs
+over a string in a single left-to-right pass. Each step moves a set of states
+forward by one character, so answering "what is the longest prefix this pattern
+fully matches?" costs one pass over the string instead of one ``fullmatch`` per
+prefix. :meth:`NFA.trace` runs the same scan and also reports which AST nodes
+were waiting for input where the last thread died and which characters every
+node consumed, which the tester turns into failure messages.
+
+Characters are tested with tiny ``re`` patterns compiled per atom, with the
+flags in effect at that atom, so case folding, ``re.ASCII`` and ``re.DOTALL``
+behave exactly as in ``re``. Constructs that are not regular are not supported:
+:meth:`NFA.from_ast` returns None for lookarounds, backreferences, conditional
+and atomic groups, possessive quantifiers and ``\B``.
+"""
+import re
+from time import perf_counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .parser import (
+    RegexAST, Sequence, Literal, LiteralRun, AnyChar, CharClass, Group, Quantifier,
+    Anchor, Escape, Alternation,
+)
+
+# State kinds
+_CHAR, _SPLIT, _ASSERT, _MATCH = range(4)
+# Zero-width assertions; _EOL is '$' without re.MULTILINE, which also holds
+# before a newline that ends the string
+_BOL, _BOL_MULTILINE, _START, _EOL, _EOL_MULTILINE, _END, _WORD_BOUNDARY = range(7)
+# Result of an assertion that holds only if the string ends right after the next character
+_PENDING_END = 2
+
+# Largest automaton built; bounded repeats such as (x{100}){100} are unrolled
+MAX_STATES = 50000
+# Entries kept in the per-automaton transition caches before they are reset
+_MAX_CACHE = 1 << 16
+
+_FLAG_BITS = {
+    'i': re.IGNORECASE, 'L': re.LOCALE, 'm': re.MULTILINE, 's': re.DOTALL,
+    'x': re.VERBOSE, 'a': re.ASCII, 'u': re.UNICODE,
+}
+_UNSUPPORTED_GROUPS = frozenset({
+    'GROUP_LOOKAHEAD', 'GROUP_NEG_LOOKAHEAD', 'GROUP_LOOKBEHIND', 'GROUP_NEG_LOOKBEHIND',
+    'GROUP_ATOMIC', 'GROUP_CONDITIONAL',
+})
+_ASSERTION_ESCAPES = {r'\A': _START, r'\Z': _END, r'\b': _WORD_BOUNDARY}
+_BACKREFERENCE = re.compile(r'\\(?:[1-9]|g<)')
+
+class PrefixMatch(NamedTuple):
+    """
+    Result of :meth:`NFA.prefix_match`.
+
+    Attributes:
+        longest (Optional[int]): Length of the longest prefix of the string the
+            pattern fully matches, or None if not even the empty prefix matches.
+        viable (int): Length of the longest prefix that a match could still
+            begin with. The string cannot be matched past this offset.
+    """
+    longest: Optional[int]
+    viable: int
+
+class Trace(NamedTuple):
+    """
+    Result of :meth:`NFA.trace`.
+
+    Attributes:
+        longest (Optional[int]): As in :class:`PrefixMatch`.
+        failed_at (Optional[int]): Offset at which every thread of the automaton
+            had died (the length of the string if it ran out first), or None if
+            the whole string matches.
+        expected (Tuple[RegexAST, ...]): The nodes that could not go on at
+            ``failed_at``: atoms that needed another character (or a different
+            one) and assertions that did not hold.
+        spans (Tuple[Tuple[RegexAST, int, int], ...]): ``(node, start, end)`` for
+            every node that consumed characters on one path reaching ``failed_at``
+            (or matching the whole string), from the first character the node
+            consumed to the last, ordered by start offset.
+    """
+    longest: Optional[int]
+    failed_at: Optional[int]
+    expected: Tuple[RegexAST, ...]
+    spans: Tuple[Tuple[RegexAST, int, int], ...]
+
+class _Unsupported(Exception):
+    pass
+
+def _apply_flags(flags: int, letters: str) -> int:
+    added, _, removed = letters.partition('-')
+    for letter in added:
+        flags |= _FLAG_BITS.get(letter, 0)
+    for letter in removed:
+        flags &= ~_FLAG_BITS.get(letter, 0)
+    return flags
+
+class NFA:
+    """
+    Thompson NFA with one state per character test, branch or assertion.
+
+    States are stored in parallel lists: ``kinds``, ``outs`` (next state),
+    ``outs2`` (second branch of a split), ``args`` (predicate index for a
+    character test, assertion code and word predicate for an assertion) and
+    ``owners`` (index in ``nodes`` of the AST node a state tests for). A node
+    compiled several times, like the body of ``x{3}``, owns all its copies.
+    Transitions are cached per set of states, so after a warm-up every character
+    costs one dictionary lookup. Instances can be shared between threads.
+    """
+    def __init__(self):
+        self.kinds: List[int] = []
+        self.outs: List[int] = []
+        self.outs2: List[int] = []
+        self.args: List[object] = []
+        self.owners: List[int] = []
+        self.nodes: List[RegexAST] = []
+        self.parents: List[int] = []
+        self._node_ids: Dict[Tuple[int, int], int] = {}
+        self._ranks: List[int] = []  # pre-order position of each node in the pattern
+        self.start = 0
+        self.has_assertions = False
+        self._predicates: List[Tuple[object, Dict[str, bool]]] = []
+        self._predicate_ids: Dict[Tuple[str, int], int] = {}
+        self._step_cache: Dict[tuple, tuple] = {}
+        self._accept_cache: Dict[tuple, bool] = {}
+
+    @classmethod
+    def from_ast(cls, ast: RegexAST, flags: int = 0) -> Optional['NFA']:
+        r"""
+        Build the automaton for a parsed pattern.
+
+        Args:
+            ast (RegexAST): Root node, parsed with ``backend='stdlib'`` so that
+                its structure is the one ``re`` matches with.
+            flags (int, optional): Regex flags the pattern is compiled with. Defaults to 0.
+
+        Returns:
+            Optional[NFA]: The automaton, or None if the pattern uses constructs
+            that are not regular or would need more than ``MAX_STATES`` states.
+        """
+        nfa = cls()
+        # Inline global flags such as (?i) come first in the pattern
+        if isinstance(ast, Sequence) and ast.elements and _is_inline_flags(ast.elements[0]):
+            flags = _apply_flags(flags, ast.elements[0].flags or '')
+            ast = Sequence(ast.elements[1:])
+        elif _is_inline_flags(ast):
+            flags = _apply_flags(flags, ast.flags or '')
+            ast = Sequence(())
+        try:
+            nfa.start = nfa._build(ast, flags & ~re.VERBOSE)
+        except _Unsupported:
+            return None
+        nfa._rank_nodes()
+        return nfa
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _add(self, kind: int, out: int = -1, out2: int = -1, arg: object = None, owner: int = -1) -> int:
+        if len(self.kinds) >= MAX_STATES:
+            raise _Unsupported()
+        self.kinds.append(kind)
+        self.outs.append(out)
+        self.outs2.append(out2)
+        self.args.append(arg)
+        self.owners.append(owner)
+        return len(self.kinds) - 1
+
+    def _predicate(self, text: str, flags: int) -> int:
+        key = (text, flags)
+        index = self._predicate_ids.get(key)
+        if index is None:
+            index = len(self._predicates)
+            self._predicates.append((re.compile(text, flags).fullmatch, {}))
+            self._predicate_ids[key] = index
+        return index
+
+    def _char(self, text: str, flags: int, out: int, owner: int) -> int:
+        return self._add(_CHAR, out, -1, self._predicate(text, flags), owner)
+
+    def _assert(self, code: int, flags: int, out: int, owner: int) -> int:
+        self.has_assertions = True
+        word = self._predicate(r'\w', flags) if code == _WORD_BOUNDARY else None
+        return self._add(_ASSERT, out, -1, (code, word), owner)
+
+    def _node_id(self, parent: int, index: int, node: RegexAST) -> int:
+        # One id per position in the tree, however many times it is compiled
+        key = (parent, index)
+        nid = self._node_ids.get(key)
+        if nid is None:
+            nid = self._node_ids[key] = len(self.nodes)
+            self.nodes.append(node)
+            self.parents.append(parent)
+        return nid
+
+    def _rank_nodes(self) -> None:
+        # Ids follow the right-to-left build order; rank them as they appear in the pattern
+        children = [[] for _ in self.nodes]
+        for (parent, index), nid in sorted(self._node_ids.items()):
+            if parent >= 0:
+                children[parent].append(nid)
+        self._ranks = [0] * len(self.nodes)
+        stack = [0]
+        rank = 0
+        while stack:
+            nid = stack.pop()
+            self._ranks[nid] = rank
+            rank += 1
+            stack.extend(reversed(children[nid]))
+
+    def _build(self, ast: RegexAST, flags: int) -> int:
+        # Built right to left: every node is compiled knowing the state that
+        # follows it, so no patch lists are needed. An explicit task stack keeps
+        # deeply nested patterns clear of the recursion limit.
+        match = self._add(_MATCH)
+        results = []  # start states of compiled nodes
+        # (node, next state, flags, node id, continuation)
+        tasks = [(ast, match, flags, self._node_id(-1, 0, ast), None)]
+        while tasks:
+            node, nxt, flags, nid, cont = tasks.pop()
+            if cont is not None:
+                cont(results)
+                continue
+            if isinstance(node, Sequence) or (isinstance(node, Group) and node.group_type not in _UNSUPPORTED_GROUPS):
+                if isinstance(node, Group):
+                    if node.group_type == 'GROUP_FLAGS':
+                        if not node.children:
+                            raise _Unsupported()  # inline flags in the middle of a pattern
+                        flags = _apply_flags(flags, node.flags or '')
+                    children = node.children
+                else:
+                    children = node.elements
+                self._push_sequence(tasks, results, children, nxt, flags, nid)
+            elif isinstance(node, Alternation):
+                self._push_alternation(tasks, results, node.options, nxt, flags, nid)
+            elif isinstance(node, Quantifier):
+                if len(node.quant) > 1 and node.quant.endswith('+'):
+                    raise _Unsupported()  # possessive
+                self._push_quantifier(tasks, results, node, nxt, flags, nid)
+            else:
+                results.append(self._leaf(node, nxt, flags, nid))
+        return results.pop()
+
+    def _push_sequence(self, tasks, results, children, nxt, flags, nid):
+        if not children:
+            results.append(nxt)
+            return
+        # Compile the last child first; each result becomes the next state of the child before it
+        index = len(children) - 1
+
+        def chain(results, index=index):
+            start = results.pop()
+            if index == 0:
+                results.append(start)
+            else:
+                tasks.append((None, None, None, None, lambda r, i=index - 1: chain(r, i)))
+                tasks.append((children[index - 1], start, flags,
+                              self._node_id(nid, index - 1, children[index - 1]), None))
+
+        tasks.append((None, None, None, None, chain))
+        tasks.append((children[index], nxt, flags, self._node_id(nid, index, children[index]), None))
+
+    def _push_alternation(self, tasks, results, options, nxt, flags, nid):
+        def join(results, count=len(options)):
+            starts = results[-count:]
+            del results[-count:]
+            start = starts[-1]
+            for other in reversed(starts[:-1]):
+                start = self._add(_SPLIT, other, start)
+            results.append(start)
+
+        tasks.append((None, None, None, None, join))
+        for index in range(len(options) - 1, -1, -1):
+            tasks.append((options[index], nxt, flags, self._node_id(nid, index, options[index]), None))
+
+    def _push_quantifier(self, tasks, results, node: Quantifier, nxt, flags, nid):
+        # Unrolled right to left: the optional (or starred) tail first, then the
+        # required copies, each one leading into what was compiled before it
+        lo = node.min
+        hi = node.max
+        pieces = ['req'] * lo + (['star'] if hi is None else ['opt'] * (hi - lo))
+        if len(pieces) > MAX_STATES:
+            raise _Unsupported()
+        child = self._node_id(nid, 0, node.child)
+
+        def compile_piece(results, k, after):
+            # Compile pieces[k] (and those before it) in front of state ``after``
+            if k < 0:
+                results.append(after)
+                return
+            kind = pieces[k]
+            if kind == 'star':
+                split = self._add(_SPLIT, -1, after)
+
+                def close(results, split=split):
+                    self.outs[split] = results.pop()
+                    compile_piece(results, k - 1, split)
+                tasks.append((None, None, None, None, close))
+                tasks.append((node.child, split, flags, child, None))
+            else:
+                def done(results):
+                    start = results.pop()
+                    if kind == 'opt':
+                        start = self._add(_SPLIT, start, nxt)
+                    compile_piece(results, k - 1, start)
+                tasks.append((None, None, None, None, done))
+                tasks.append((node.child, after, flags, child, None))
+
+        compile_piece(results, len(pieces) - 1, nxt)
+
+    def _leaf(self, node: RegexAST, nxt: int, flags: int, nid: int) -> int:
+        if isinstance(node, Literal):
+            return self._char(re.escape(node.value), flags, nxt, nid)
+        if isinstance(node, LiteralRun):
+            for char in reversed(node.value):
+                nxt = self._char(re.escape(char), flags, nxt, nid)
+            return nxt
+        if isinstance(node, AnyChar):
+            return self._char('.', flags, nxt, nid)
+        if isinstance(node, CharClass):
+            return self._char(node.value, flags, nxt, nid)
+        if isinstance(node, Anchor):
+            multiline = bool(flags & re.MULTILINE)
+            if node.value == '^':
+                return self._assert(_BOL_MULTILINE if multiline else _BOL, flags, nxt, nid)
+            if node.value == '$':
+                return self._assert(_EOL_MULTILINE if multiline else _EOL, flags, nxt, nid)
+        if isinstance(node, Escape):
+            code = _ASSERTION_ESCAPES.get(node.value)
+            if code is not None:
+                return self._assert(code, flags, nxt, nid)
+            if node.value != r'\B' and not _BACKREFERENCE.match(node.value):
+                return self._char(node.value, flags, nxt, nid)
+        raise _Unsupported()
+
+    def _test(self, index: int, char: str) -> bool:
+        fullmatch, memo = self._predicates[index]
+        result = memo.get(char)
+        if result is None:
+            result = memo[char] = fullmatch(char) is not None
+        return result
+
+    def _holds(self, arg, prev: Optional[str], char: Optional[str]):
+        # Whether an assertion holds between ``prev`` and ``char``; None stands for
+        # the start or the end of the string
+        code, word = arg
+        if code == _BOL or code == _START:
+            return prev is None
+        if code == _BOL_MULTILINE:
+            return prev is None or prev == '\n'
+        if code == _EOL:
+            if char is None:
+                return True
+            return _PENDING_END if char == '\n' else False
+        if code == _EOL_MULTILINE:
+            return char is None or char == '\n'
+        if code == _END:
+            return char is None
+        before = prev is not None and self._test(word, prev)
+        after = char is not None and self._test(word, char)
+        return before != after
+
+    def _closure(self, states, prev: Optional[str], char: Optional[str]):
+        # States reachable through splits and assertions. ``pending`` holds states
+        # reached through a '$' that only holds if the string ends after ``char``,
+        # ``origins`` the member of ``states`` each state was first reached from and
+        # ``blocked`` the assertions that did not hold.
+        kinds = self.kinds
+        outs = self.outs
+        stack = [(state, False, state) for state in states]
+        origins = {}
+        closed = []
+        pending = []
+        blocked = []
+        while stack:
+            state, flagged, origin = stack.pop()
+            if (state, flagged) in origins:
+                continue
+            origins[state, flagged] = origin
+            kind = kinds[state]
+            if kind == _SPLIT:
+                stack.append((self.outs2[state], flagged, origin))
+                stack.append((outs[state], flagged, origin))
+            elif kind == _ASSERT:
+                holds = self._holds(self.args[state], prev, char)
+                if holds:
+                    stack.append((outs[state], flagged or holds is _PENDING_END, origin))
+                else:
+                    blocked.append(state)
+            else:
+                (pending if flagged else closed).append(state)
+        return closed, pending, origins, blocked
+
+    def _accepts(self, states, prev: Optional[str]) -> bool:
+        key = (states, prev if self.has_assertions else None)
+        result = self._accept_cache.get(key)
+        if result is None:
+            closed = self._closure(states, prev, None)[0]
+            result = any(self.kinds[state] == _MATCH for state in closed)
+            if len(self._accept_cache) >= _MAX_CACHE:
+                self._accept_cache.clear()
+            self._accept_cache[key] = result
+        return result
+
+    def _step(self, states, prev: Optional[str], char: str) -> Tuple[frozenset, frozenset, dict]:
+        # The third item maps each (next state, pending) to the character test
+        # taken and the member of ``states`` it was reached from
+        key = (states, prev if self.has_assertions else None, char)
+        result = self._step_cache.get(key)
+        if result is None:
+            closed, pending, origins, _ = self._closure(states, prev, char)
+            kinds = self.kinds
+            outs = self.outs
+            args = self.args
+            sources = {}
+            for flagged, found in ((False, closed), (True, pending)):
+                for state in found:
+                    if kinds[state] == _CHAR and self._test(args[state], char):
+                        sources.setdefault((outs[state], flagged), (state, origins[state, flagged]))
+            result = (
+                frozenset(state for state, flagged in sources if not flagged),
+                frozenset(state for state, flagged in sources if flagged),
+                sources,
+            )
+            if len(self._step_cache) >= _MAX_CACHE:
+                self._step_cache.clear()
+            self._step_cache[key] = result
+        return result
+
+    def prefix_match(self, text: str) -> PrefixMatch:
+        r"""
+        Scan ``text`` once and find how much of it the pattern can match.
+
+        ``longest`` agrees with the largest ``i`` for which
+        ``re.fullmatch(pattern, text[:i], flags)`` succeeds.
+
+        Args:
+            text (str): The string to scan.
+
+        Returns:
+            PrefixMatch: The longest fully matched prefix and the failure offset.
+        """
+        current = frozenset((self.start,))
+        pending = frozenset()  # states that can only match at the very next offset
+        longest = None
+        prev = None
+        i = 0
+        n = len(text)
+        while True:
+            if self._accepts(current, prev) or (pending and self._accepts(pending, prev)):
+                longest = i
+            if i == n or not current:
+                break
+            char = text[i]
+            current, pending, _ = self._step(current, prev, char)
+            if not current and not pending:
+                break
+            prev = char
+            i += 1
+        return PrefixMatch(longest, i)
+
+    def trace(self, text: str, deadline: Optional[float] = None) -> Trace:
+        r"""
+        Scan ``text`` once, like :meth:`prefix_match`, and explain where it fails.
+
+        Runs in O(len(text) * len(self)) time; the path behind ``spans`` is
+        rebuilt from one back-pointer table per character.
+
+        Args:
+            text (str): The string to scan.
+            deadline (Optional[float], optional): ``time.perf_counter()`` value
+                after which to give up, checked every 1024 characters. Defaults to None.
+
+        Returns:
+            Trace: The failure offset, what was expected there and the spans
+            consumed by each node.
+
+        Raises:
+            TimeoutError: If the deadline passes before the scan ends.
+        """
+        current = frozenset((self.start,))
+        pending = frozenset()
+        history = []  # the back-pointer table of every step taken
+        longest = None
+        prev = None
+        i = 0
+        n = len(text)
+        while True:
+            if self._accepts(current, prev) or (pending and self._accepts(pending, prev)):
+                longest = i
+            if i == n or not current:
+                break
+            if deadline is not None and not i & 1023 and perf_counter() > deadline:
+                raise TimeoutError(f"Scan stopped at offset {i} of {n}")
+            char = text[i]
+            stepped, stepped_pending, sources = self._step(current, prev, char)
+            if not stepped and not stepped_pending:
+                break
+            history.append(sources)
+            current, pending = stepped, stepped_pending
+            prev = char
+            i += 1
+        if longest == n:
+            failed_at = None
+            expected = ()
+            # Follow a path that ends in a match
+            end = next(((state, flagged) for flagged, states in ((False, current), (True, pending))
+                        for state in sorted(states) if self._accepts(frozenset((state,)), prev)))
+        else:
+            failed_at = i
+            closed, stuck, _, blocked = self._closure(current, prev, text[i] if i < n else None)
+            waiting = [s for s in closed + stuck if self.kinds[s] == _CHAR] + blocked
+            owners = sorted({self.owners[s] for s in waiting}, key=self._ranks.__getitem__)
+            expected = tuple(self.nodes[nid] for nid in owners)
+            end = (min(current), False) if current else (min(pending), True)
+        return Trace(longest, failed_at, expected, self._spans(history, end))
+
+    def _spans(self, history: list, end: Tuple[int, bool]) -> Tuple[Tuple[RegexAST, int, int], ...]:
+        starts = {}
+        ends = {}
+        key = end
+        for offset in range(len(history) - 1, -1, -1):
+            state, origin = history[offset][key]
+            nid = self.owners[state]
+            starts[nid] = offset
+            ends.setdefault(nid, offset + 1)
+            key = (origin, False)
+        # Children have larger ids than their parents, so one pass in reverse
+        # order widens every ancestor
+        for nid in range(len(self.nodes) - 1, 0, -1):
+            parent = self.parents[nid]
+            if nid in starts:
+                if parent not in starts or starts[nid] < starts[parent]:
+                    starts[parent] = starts[nid]
+                if ends[nid] > ends.get(parent, -1):
+                    ends[parent] = ends[nid]
+        order = sorted(starts, key=lambda nid: (starts[nid], self._ranks[nid]))
+        return tuple((self.nodes[nid], starts[nid], ends[nid]) for nid in order)
+
+def _is_inline_flags(node: RegexAST) -> bool:
+    return isinstance(node, Group) and node.group_type == 'GROUP_FLAGS' and not node.children
@@ -0,0 +1,202 @@
+r"""
+Testing one pattern against many strings.
+
+:func:`test_many` streams its input in chunks and records compact columns
+instead of one :class:`~rexplain.core.tester.MatchResult` per string: whether
+each string matched, where it failed and how long its partial match was. Full
+results, with their reasons, are rebuilt only for the rows that are asked for.
+Large inputs can be spread over a pool of processes, each compiling the
+pattern once.
+
+Strings that lack a literal every match must contain (see
+:mod:`rexplain.core.literals`) are rejected without calling ``re``. When only
+the ``matches`` column is needed, ``diagnose=False`` also skips working out
+where each rejected string failed, which is most of the cost when few strings
+match. Regular patterns other than fixed-shape ones are matched by their
+:class:`~rexplain.core.dfa.DFA` instead, in time linear in each string.
+Failure offsets of short regular patterns come from their
+:class:`~rexplain.core.bitparallel.BitMatcher`.
+"""
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .compiled import CompiledPattern, compile_pattern
+from .literals import literal_candidates
+from .tester import MatchResult
+
+# Strings per chunk handed to a worker process
+DEFAULT_CHUNK_SIZE = 10000
+
+# Value stored in the failed_at and prefix_lengths columns for a matching string
+NO_OFFSET = -1
+
+class BatchResult:
+    """
+    Columnar results of testing one pattern against many strings.
+
+    Row ``i`` describes the ``i``-th input string. ``failed_at`` and
+    ``prefix_lengths`` hold what :class:`~rexplain.core.tester.MatchResult` reports
+    as ``failed_at`` and the length of its partial match (the partial match is
+    the span ``[0, prefix_lengths[i])`` of the string, 0 if there is none), or
+    ``NO_OFFSET`` for strings that matched and for every string when the batch
+    was tested without diagnostics.
+
+    Attributes:
+        pattern (str): The regex pattern.
+        flags (int): Regex flags (e.g., re.IGNORECASE).
+        matches (array): One byte per string, 1 if it fully matched.
+        failed_at (array): Failure offset per string.
+        prefix_lengths (array): Partial match length per string.
+    """
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = pattern
+        self.flags = flags
+        self.matches = array('B')
+        self.failed_at = array('i')
+        self.prefix_lengths = array('i')
+        self._failures: Dict[int, str] = {}  # row -> string, to rebuild reasons
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    @property
+    def match_count(self) -> int:
+        """Number of strings that fully matched."""
+        return sum(self.matches)
+
+    def failures(self) -> Iterator[int]:
+        """Yield the rows of the strings that did not match, in order."""
+        return iter(self._failures)
+
+    def result(self, index: int) -> MatchResult:
+        r"""
+        Build the full MatchResult for one row.
+
+        Args:
+            index (int): Row of the string in the input.
+
+        Returns:
+            MatchResult: The same result ``test`` returns for that string.
+        """
+        if index < 0:
+            index += len(self)
+        if self.matches[index]:
+            return MatchResult(matches=True, reason="Full match.")
+        return compile_pattern(self.pattern, self.flags).test(self._failures[index])
+
+    def _extend(self, strings: List[str], columns: Tuple[array, array, array]) -> None:
+        matches, failed_at, prefix_lengths = columns
+        offset = len(self.matches)
+        for row, matched in enumerate(matches):
+            if not matched:
+                self._failures[offset + row] = strings[row]
+        self.matches.extend(matches)
+        self.failed_at.extend(failed_at)
+        self.prefix_lengths.extend(prefix_lengths)
+
+    def __repr__(self) -> str:
+        return f"BatchResult({self.pattern!r}, {len(self)} strings, {self.match_count} matched)"
+
+def _diagnose(compiled: CompiledPattern, s: str) -> Tuple[int, int]:
+    # failed_at and partial match length of a string that did not match
+    bit_matcher = compiled.bit_matcher
+    if bit_matcher is not None:
+        j = bit_matcher.failure_offset(s)
+        return j, j
+    automaton = compiled.automaton
+    if automaton is not None:
+        # The offset where the automaton's threads die, as in RegexTester
+        j = automaton.prefix_match(s).viable
+        return j, j
+    result = compiled.test(s)
+    return result.failed_at, len(result.partial_matches[0]) if result.partial_matches else 0
+
+def _test_chunk(pattern: str, flags: int, strings: List[str], diagnose: bool = True) -> Tuple[array, array, array]:
+    compiled = compile_pattern(pattern, flags)
+    literals = compiled.literals
+    fullmatch = compiled.regex.fullmatch
+    matches = array('B', bytes(len(strings)))
+    failed_at = array('i', [NO_OFFSET]) * len(strings)
+    prefix_lengths = array('i', [NO_OFFSET]) * len(strings)
+    # Only strings with every required literal reach re (or the DFA, for
+    # patterns re could backtrack catastrophically on)
+    rows = literal_candidates(literals, strings)
+    if literals.literal is not None:
+        matched = [True] * len(rows)
+    elif compiled.uses_dfa:
+        matched = compiled.dfa.match_many([strings[row] for row in rows])
+    else:
+        matched = [fullmatch(strings[row]) for row in rows]
+    for row, match in zip(rows, matched):
+        if match:
+            matches[row] = 1
+    if diagnose:
+        for row, matched in enumerate(matches):
+            if not matched:
+                failed_at[row], prefix_lengths[row] = _diagnose(compiled, strings[row])
+    return matches, failed_at, prefix_lengths
+
+def _chunks(strings: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(strings)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def test_many(pattern: str, strings: Iterable[str], flags: int = 0, processes: Optional[int] = 1,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, diagnose: bool = True) -> BatchResult:
+    r"""
+    Test a regex pattern against many strings and collect columnar results.
+
+    The input is consumed lazily, one chunk at a time, so it can be a generator
+    over a file or a database cursor. With more than one process, chunks are
+    tested in a process pool, at most two per process in flight, and results
+    keep the input order.
+
+    Args:
+        pattern (str): The regex pattern.
+        strings (Iterable[str]): The strings to test.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+        processes (Optional[int], optional): Worker processes; 1 tests in this
+            process and None uses one per CPU. Defaults to 1.
+        chunk_size (int, optional): Strings per chunk. Defaults to 10000.
+        diagnose (bool, optional): Fill ``failed_at`` and ``prefix_lengths`` for
+            strings that did not match. Without it only ``matches`` is filled;
+            ``result(i)`` still explains any row. Defaults to True.
+
+    Returns:
+        BatchResult: One row per input string.
+
+    Raises:
+        ValueError: If ``chunk_size`` or ``processes`` is less than 1.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError("processes must be at least 1")
+    flags = int(flags)
+    compile_pattern(pattern, flags).regex  # report an invalid pattern before any work
+    batch = BatchResult(pattern, flags)
+    chunks = _chunks(strings, chunk_size)
+    if processes == 1:
+        for chunk in chunks:
+            batch._extend(chunk, _test_chunk(pattern, flags, chunk, diagnose))
+        return batch
+    with ProcessPoolExecutor(processes) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append((chunk, pool.submit(_test_chunk, pattern, flags, chunk, diagnose)))
+            if len(in_flight) >= 2 * processes:
+                done, future = in_flight.popleft()
+                batch._extend(done, future.result())
+        while in_flight:
+            done, future = in_flight.popleft()
+            batch._extend(done, future.result())
+    return batch
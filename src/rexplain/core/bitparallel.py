@@ -0,0 +1,224 @@
+r"""
+Bit-parallel Glushkov matcher for short regular patterns.
+
+The Glushkov automaton of a pattern has one state per character test (a
+*position*) plus an initial state, and every transition into a position reads
+a character that position accepts. With fewer than ``MAX_POSITIONS``
+positions the set of active states fits in one integer, and a step is a few
+mask operations:
+
+    D' = Follow(D) & B[c]
+
+where ``B[c]`` has a bit for every position accepting ``c``. ``Follow`` is
+split as in Shift-And: transitions from a position to the next one are
+``D << 1``, and the others are looked up in one table per byte of ``D``
+(Navarro and Raffinot), so a pattern like ``[A-Z]{2}\d{4}`` steps with a shift
+and an and.
+
+Positions are taken from the pattern's :class:`~rexplain.core.automaton.NFA`,
+which already resolves flags, bounded repeats and unsupported constructs.
+Anchors are supported where they cannot fail under a full match (``^`` at the
+start, ``$`` at the end); patterns with other assertions get no matcher.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from .automaton import NFA, _ASSERT, _CHAR, _MATCH, _SPLIT, _BOL, _BOL_MULTILINE, _START
+
+# Most positions (character tests) a pattern may have
+MAX_POSITIONS = 64
+# Characters whose position mask is remembered before the memo is reset
+_MAX_MEMO = 1 << 16
+
+_LEADING = frozenset({_BOL, _BOL_MULTILINE, _START})
+
+class BitMatcher:
+    """
+    Glushkov automaton simulated on the bits of an integer.
+
+    Bit 0 is the initial state and bit ``p`` position ``p``, numbered from left
+    to right in the pattern. Built with :meth:`from_nfa`; instances can be
+    shared between threads.
+    """
+    def __init__(self, nfa: NFA, predicates: List[int], shift: int,
+                 blocks: Tuple[Tuple[int, Tuple[int, ...]], ...], last: int):
+        self._nfa = nfa
+        self._predicates = predicates  # NFA predicate index of each position
+        self._shift = shift  # positions entered from the one before them
+        self._blocks = blocks  # (bit offset, 256-entry table) for other transitions
+        self._last = last  # states in which a match may end
+        self._masks: Dict[str, int] = {}
+
+    @classmethod
+    def from_nfa(cls, nfa: NFA, max_positions: int = MAX_POSITIONS) -> Optional['BitMatcher']:
+        r"""
+        Build the matcher from a pattern's Thompson NFA.
+
+        Args:
+            nfa (NFA): The pattern's automaton.
+            max_positions (int, optional): Most character tests allowed.
+                Defaults to 64.
+
+        Returns:
+            Optional[BitMatcher]: The matcher, or None if the pattern has more
+            positions or uses assertions other than leading ``^``/``\A`` and
+            trailing ``$``/``\Z``.
+        """
+        kinds = nfa.kinds
+        # Left to right in the pattern: the NFA is built from the end
+        states = sorted((s for s in range(len(nfa)) if kinds[s] == _CHAR), reverse=True)
+        if len(states) > max_positions:
+            return None
+        bit = {state: index + 1 for index, state in enumerate(states)}
+        closures = [_closure(nfa, nfa.start)] + [_closure(nfa, nfa.outs[s]) for s in states]
+        if None in closures or any(leading for _, _, leading in closures[1:]):
+            return None  # an assertion that can fail, or '^' after a character
+        follow = []
+        last = 0
+        for source, (targets, matches, _) in enumerate(closures):
+            follow.append(sum(1 << bit[target] for target in targets))
+            if matches:
+                last |= 1 << source
+        # Shift-And part: position p + 1 entered from p; the rest goes to the tables
+        shift = 0
+        for source, targets in enumerate(follow):
+            if targets >> (source + 1) & 1:
+                shift |= 1 << (source + 1)
+                follow[source] &= ~(1 << (source + 1))
+        blocks = []
+        for offset in range(0, len(follow), 8):
+            part = follow[offset:offset + 8]
+            if not any(part):
+                continue
+            table = [0] * 256
+            for byte in range(1, 256):
+                # Built from the byte without its lowest bit
+                low = byte & -byte
+                index = low.bit_length() - 1
+                table[byte] = table[byte ^ low] | (part[index] if index < len(part) else 0)
+            blocks.append((offset, tuple(table)))
+        return cls(nfa, [nfa.args[s] for s in states], shift, tuple(blocks), last)
+
+    @property
+    def position_count(self) -> int:
+        """Number of positions (character tests) in the automaton."""
+        return len(self._predicates)
+
+    def fullmatch(self, text: str) -> bool:
+        r"""
+        Whether the pattern matches all of ``text``.
+
+        Args:
+            text (str): The string to test.
+
+        Returns:
+            bool: The same answer as ``bool(re.fullmatch(pattern, text, flags))``.
+        """
+        masks, shift, blocks = self._masks, self._shift, self._blocks
+        active = 1
+        for char in text:
+            try:
+                mask = masks[char]
+            except KeyError:
+                mask = self._mask(char)
+            following = active << 1 & shift
+            for offset, table in blocks:
+                following |= table[active >> offset & 255]
+            active = following & mask
+            if not active:
+                return False
+        return bool(active & self._last)
+
+    def failure_offset(self, text: str) -> Optional[int]:
+        r"""
+        Where matching ``text`` fails, as ``RegexTester.test`` reports it.
+
+        Args:
+            text (str): The string to test.
+
+        Returns:
+            Optional[int]: None if the whole string matches; otherwise the offset
+            of the first character no thread could consume, or ``len(text)`` if
+            the string ran out first.
+        """
+        masks, shift, blocks = self._masks, self._shift, self._blocks
+        active = 1
+        for i, char in enumerate(text):
+            try:
+                mask = masks[char]
+            except KeyError:
+                mask = self._mask(char)
+            following = active << 1 & shift
+            for offset, table in blocks:
+                following |= table[active >> offset & 255]
+            active = following & mask
+            if not active:
+                return i
+        return None if active & self._last else len(text)
+
+    def _mask(self, char: str) -> int:
+        # Positions that accept ``char``, one test per distinct predicate
+        test = self._nfa._test
+        accepted: Dict[int, bool] = {}
+        mask = 0
+        for index, predicate in enumerate(self._predicates):
+            ok = accepted.get(predicate)
+            if ok is None:
+                ok = accepted[predicate] = test(predicate, char)
+            if ok:
+                mask |= 2 << index
+        if len(self._masks) >= _MAX_MEMO:
+            self._masks.clear()
+        self._masks[char] = mask
+        return mask
+
+def _closure(nfa: NFA, state: int):
+    # Character tests reachable from ``state`` without consuming input, whether
+    # the match state is, and whether a leading assertion was passed on the
+    # way. None if an assertion on the way could fail under a full match.
+    kinds, outs = nfa.kinds, nfa.outs
+    targets = []
+    matches = False
+    leading = False
+    seen = set()
+    stack = [state]
+    while stack:
+        state = stack.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        kind = kinds[state]
+        if kind == _SPLIT:
+            stack.append(nfa.outs2[state])
+            stack.append(outs[state])
+        elif kind == _ASSERT:
+            code = nfa.args[state][0]
+            if code in _LEADING:
+                leading = True
+            elif _closure_has_chars(nfa, outs[state]):
+                return None  # '$', '\Z' or '\b' with input after it
+            elif nfa.args[state][1] is not None:
+                return None  # '\b' at the end still looks at the last character
+            stack.append(outs[state])
+        elif kind == _CHAR:
+            targets.append(state)
+        elif kind == _MATCH:
+            matches = True
+    return targets, matches, leading
+
+def _closure_has_chars(nfa: NFA, state: int) -> bool:
+    kinds = nfa.kinds
+    seen = set()
+    stack = [state]
+    while stack:
+        state = stack.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        kind = kinds[state]
+        if kind == _CHAR:
+            return True
+        if kind == _SPLIT:
+            stack.append(nfa.outs2[state])
+        if kind != _MATCH:
+            stack.append(nfa.outs[state])
+    return False
@@ -0,0 +1,155 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+from .parser import RegexParser, RegexAST
+
+_MISSING = object()
+
+# Patterns at least this long are parsed with lazy top-level alternation.
+LAZY_ALTERNATION_THRESHOLD = 4096
+
+class CacheInfo(NamedTuple):
+    """
+    Snapshot of a cache's counters.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to build a new entry.
+        evictions (int): Entries dropped to stay within ``maxsize``.
+        maxsize (int): Maximum number of entries kept.
+        currsize (int): Number of entries currently stored.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+class LRUCache:
+    """
+    A size-bounded, thread-safe least-recently-used cache.
+    """
+    def __init__(self, maxsize: int = 512):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int, optional): Maximum number of entries to keep. Defaults to 512.
+        """
+        if maxsize < 0:
+            raise ValueError('maxsize must be >= 0')
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the entry for ``key``, building it with ``factory()`` on a miss.
+
+        The factory runs outside the lock so a slow build does not block other
+        threads. If two threads miss on the same key, the first value stored wins
+        and both callers receive it.
+
+        Args:
+            key (Hashable): Cache key.
+            factory (Callable[[], Any]): Builds the value on a miss.
+
+        Returns:
+            Any: The cached (or newly built) value.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        value = factory()
+        with self._lock:
+            existing = self._data.get(key, _MISSING)
+            if existing is not _MISSING:
+                self._data.move_to_end(key)
+                return existing
+            if self.maxsize == 0:
+                return value
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Return a consistent snapshot of the cache counters.
+
+        Returns:
+            CacheInfo: Hits, misses, evictions and sizes.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+class ParseCache(LRUCache):
+    """
+    LRU cache of parsed regex ASTs keyed by ``(pattern, flags)``.
+
+    Patterns are parsed with literal coalescing enabled, so runs of plain
+    characters appear as single LiteralRun nodes. Patterns of at least
+    ``LAZY_ALTERNATION_THRESHOLD`` characters that are top-level alternations
+    get lazily parsed branches. The cached trees are shared between every
+    caller and are immutable.
+    """
+    def parse(self, pattern: str, flags: int = 0) -> RegexAST:
+        r"""
+        Return the AST for ``pattern``, parsing it only on a cache miss.
+
+        Args:
+            pattern (str): The regex pattern to parse.
+            flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+
+        Returns:
+            RegexAST: The (shared) root node of the parsed regex AST.
+        """
+        flags = int(flags)
+        lazy = len(pattern) >= LAZY_ALTERNATION_THRESHOLD
+        return self.get_or_create(
+            (pattern, flags),
+            lambda: RegexParser().parse(pattern, flags=flags, coalesce_literals=True, lazy_alternation=lazy),
+        )
+
+# Process-wide cache shared by the explainer, the generator and the tester.
+parse_cache = ParseCache(maxsize=512)
+
+def cached_parse(pattern: str, flags: int = 0) -> RegexAST:
+    r"""
+    Parse a regex pattern through the process-wide :data:`parse_cache`.
+
+    Args:
+        pattern (str): The regex pattern to parse.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+
+    Returns:
+        RegexAST: The (shared) root node of the parsed regex AST.
+    """
+    return parse_cache.parse(pattern, flags)
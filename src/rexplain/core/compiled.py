@@ -0,0 +1,349 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .analyzer import Analysis, analyze_ast
+from .automaton import NFA, Trace
+from .bitparallel import BitMatcher
+from .dfa import DFA
+from .cache import LRUCache, cached_parse
+from .parser import (
+    RegexAST, RegexParser, Sequence, Alternation, AnyChar, CharClass, Escape, Group, Literal, Quantifier,
+)
+from .explainer import explain
+from .generator import ExampleGenerator, GenerationPlan, _from_language
+from .language import Language
+from .literals import NO_LITERALS, RequiredLiterals, literal_matcher, required_literals
+from .tester import MatchResult, RegexTester, Step, plan_steps
+
+# Stateless helpers shared by every compiled pattern
+_generator = ExampleGenerator()
+_tester = RegexTester()
+_parser = RegexParser()
+
+class CompiledPattern:
+    """
+    A regex pattern parsed once, serving explanations, examples and tests.
+
+    Everything derived from the pattern (the AST, the compiled ``re.Pattern``, the
+    explanation text, the generation plan, the stepwise matching plan, the
+    required literals, the automata for failure diagnostics and the DFA) is
+    built on first use and then kept.
+    Instances are obtained through :func:`compile_pattern`, which returns the same
+    object for the same pattern and flags, and can be shared between threads:
+    concurrent first uses may build a value twice, but the results are equal and
+    only one is kept.
+
+    Attributes:
+        pattern (str): The regex pattern.
+        flags (int): Regex flags (e.g., re.IGNORECASE).
+        shared_ast (bool): Whether the AST comes from the process-wide parse
+            cache; otherwise the pattern parses its own and leaves the cache alone.
+    """
+    def __init__(self, pattern: str, flags: int = 0, shared_ast: bool = True):
+        self.pattern = pattern
+        self.flags = int(flags)
+        self.shared_ast = shared_ast
+        self._ast: Optional[RegexAST] = None
+        self._regex: Optional[re.Pattern] = None
+        self._plan: Optional[GenerationPlan] = None
+        self._language: Optional[Language] = None
+        self._steps: Optional[Tuple[RegexAST, ...]] = None
+        self._step_plan: Optional[Tuple[Step, ...]] = None
+        self._automaton: Optional[NFA] = None
+        self._automaton_built = False
+        self._dfa: Optional[DFA] = None
+        self._dfa_built = False
+        self._bit_matcher: Optional[BitMatcher] = None
+        self._bit_matcher_built = False
+        self._stdlib_ast: Optional[RegexAST] = None
+        self._literals: Optional[RequiredLiterals] = None
+        self._matcher: Optional[Callable[[str], bool]] = None
+        self._analysis: Optional[Analysis] = None
+        self._explanations: Dict[bool, str] = {}
+
+    @property
+    def ast(self) -> RegexAST:
+        """The parsed AST, from the process-wide parse cache if ``shared_ast`` is set."""
+        if self._ast is None:
+            if self.shared_ast:
+                self._ast = cached_parse(self.pattern, self.flags)
+            else:
+                self._ast = _parser.parse(self.pattern, self.flags, coalesce_literals=True)
+        return self._ast
+
+    @property
+    def regex(self) -> re.Pattern:
+        """The pattern compiled by the ``re`` module."""
+        if self._regex is None:
+            self._regex = re.compile(self.pattern, self.flags)
+        return self._regex
+
+    @property
+    def generation_plan(self) -> GenerationPlan:
+        """What the example generator needs for this pattern."""
+        if self._plan is None:
+            self._plan = _generator.plan(self.ast)
+        return self._plan
+
+    @property
+    def language(self) -> Language:
+        """
+        The distinct examples the generator can produce, counted and numbered.
+
+        Raises ValueError if the pattern needs too many states.
+        """
+        if self._language is None:
+            self._language = Language(self.generation_plan, _generator)
+        return self._language
+
+    @property
+    def steps(self) -> Tuple[RegexAST, ...]:
+        """The top-level elements matched one after another by the stepwise tester."""
+        if self._steps is None:
+            ast = self.ast
+            self._steps = ast.elements if isinstance(ast, Sequence) else (ast,)
+        return self._steps
+
+    @property
+    def step_plan(self) -> Tuple[Step, ...]:
+        """The steps with their character predicates compiled for the stepwise tester."""
+        if self._step_plan is None:
+            self._step_plan = plan_steps(self.steps, self.flags)
+        return self._step_plan
+
+    @property
+    def automaton(self) -> Optional[NFA]:
+        """The NFA for one-pass prefix diagnostics, or None if the pattern is not regular."""
+        if not self._automaton_built:
+            try:
+                self._automaton = NFA.from_ast(self._exact_ast(), self.flags)
+            except (ValueError, RecursionError):
+                self._automaton = None
+            self._automaton_built = True
+        return self._automaton
+
+    @property
+    def dfa(self) -> Optional[DFA]:
+        """
+        The minimized DFA for linear-time matching.
+
+        None if the pattern is not regular or its DFA is too large.
+        """
+        if not self._dfa_built:
+            automaton = self.automaton
+            self._dfa = DFA.from_nfa(automaton) if automaton is not None else None
+            self._dfa_built = True
+        return self._dfa
+
+    @property
+    def bit_matcher(self) -> Optional[BitMatcher]:
+        """
+        The bit-parallel matcher used for failure offsets.
+
+        None if the pattern is too large or has assertions.
+        """
+        if not self._bit_matcher_built:
+            automaton = self.automaton
+            self._bit_matcher = BitMatcher.from_nfa(automaton) if automaton is not None else None
+            self._bit_matcher_built = True
+        return self._bit_matcher
+
+    @property
+    def uses_dfa(self) -> bool:
+        r"""
+        Whether :meth:`test_many` decides full matches by the DFA instead of ``re``.
+
+        In bulk the DFA is used whenever it could be built, unless the pattern
+        has a fixed shape (every quantifier repeats one character a fixed
+        number of times, as in ``\d{3}-\d{4}``), where ``re`` cannot backtrack
+        more than the pattern's length. The ReDoS analysis is a screen that can
+        miss slow patterns, so its verdict alone does not decide. Single tests
+        go through :attr:`matcher`, which builds the DFA only for flagged patterns.
+        """
+        try:
+            if self.analysis.safe and _fixed_shape(self.ast):
+                return False
+        except (ValueError, RecursionError):
+            pass
+        return self.dfa is not None
+
+    @property
+    def literals(self) -> RequiredLiterals:
+        """
+        The literal text every full match contains.
+
+        See :func:`rexplain.core.literals.required_literals`.
+        """
+        if self._literals is None:
+            try:
+                self._literals = required_literals(self._exact_ast(), self.regex.flags)
+            except (ValueError, RecursionError):
+                self._literals = NO_LITERALS
+        return self._literals
+
+    @property
+    def matcher(self) -> Callable[[str], bool]:
+        """
+        Predicate telling whether a string fully matches.
+
+        Strings without the required literals are rejected before matching.
+        Patterns the ReDoS analysis flags are matched by the DFA when it can be
+        built, others by ``re``, which needs no construction up front.
+        """
+        if self._matcher is None:
+            try:
+                flagged = not self.analysis.safe
+            except (ValueError, RecursionError):
+                flagged = False
+            dfa = self.dfa if flagged else None
+            fullmatch = dfa.fullmatch if dfa is not None else self.regex.fullmatch
+            self._matcher = literal_matcher(self.literals, fullmatch)
+        return self._matcher
+
+    def _exact_ast(self) -> RegexAST:
+        # The stdlib backend sees the pattern exactly as ``re`` matches it
+        if self._stdlib_ast is None:
+            self._stdlib_ast = _parser.parse(self.pattern, self.flags, backend='stdlib')
+        return self._stdlib_ast
+
+    @property
+    def analysis(self) -> Analysis:
+        """
+        The pattern's worst-case backtracking cost.
+
+        See :func:`rexplain.core.analyzer.analyze`.
+        """
+        if self._analysis is None:
+            self._analysis = analyze_ast(self.ast, self.pattern, self.flags)
+        return self._analysis
+
+    def explain(self, group_literals: bool = False) -> str:
+        r"""
+        Explain the pattern as a formatted, line-by-line string.
+
+        Args:
+            group_literals (bool, optional): Describe runs of literal characters
+                as a whole instead of one line per character. Defaults to False.
+
+        Returns:
+            str: A line-by-line explanation of the regex pattern.
+        """
+        text = self._explanations.get(group_literals)
+        if text is None:
+            text = self._explanations.setdefault(group_literals, explain(self.ast, group_literals))
+        return text
+
+    def examples(self, count: int = 3, seed=None, unique: bool = False, length=None) -> List[str]:
+        r"""
+        Generate example strings that match the pattern.
+
+        Args:
+            count (int, optional): Number of examples to generate. Defaults to 3.
+            seed (Optional[Union[int, str]], optional): Seed for reproducible
+                examples; None draws from the global :mod:`random` module.
+                Defaults to None.
+            unique (bool, optional): Return distinct examples, drawn uniformly
+                from :attr:`language`. Defaults to False.
+            length (Union[int, Tuple[int, int], None], optional): Only examples
+                of this length or inclusive ``(min, max)`` length range, drawn
+                uniformly from :attr:`language`. Defaults to None.
+
+        Returns:
+            List[str]: Example strings matching the pattern.
+
+        Raises:
+            ValueError: If ``unique`` is set and the pattern has fewer than
+                ``count`` distinct examples of the requested lengths, or if it
+                has none of those lengths.
+        """
+        generator = _generator if seed is None else ExampleGenerator(seed)
+        if unique or length is not None:
+            return _from_language(self.language, count, generator._random, unique, length)
+        return generator.generate_from_plan(self.generation_plan, count)
+
+    def test(self, test_string: str, timeout: Optional[float] = None) -> MatchResult:
+        r"""
+        Test if a string matches the pattern and explain why/why not.
+
+        Args:
+            test_string (str): The string to test.
+            timeout (Optional[float], optional): Time budget in seconds; see
+                :func:`rexplain.core.safe.safe_test`. Defaults to None.
+
+        Returns:
+            MatchResult: Result object with match status and explanation.
+        """
+        if timeout is not None:
+            from .safe import safe_test
+            return safe_test(self, test_string, timeout)
+        return _tester.test_compiled(self, test_string)
+
+    def test_many(self, strings, processes: Optional[int] = 1, diagnose: bool = True):
+        r"""
+        Test many strings against the pattern, returning columnar results.
+
+        See :func:`rexplain.core.batch.test_many`.
+
+        Args:
+            strings (Iterable[str]): The strings to test.
+            processes (Optional[int], optional): Worker processes; None uses one
+                per CPU. Defaults to 1.
+            diagnose (bool, optional): Record where non-matching strings fail.
+                Defaults to True.
+
+        Returns:
+            BatchResult: Match flags, failure offsets and partial match lengths.
+        """
+        from .batch import test_many
+        return test_many(self.pattern, strings, self.flags, processes, diagnose=diagnose)
+
+    def trace(self, test_string: str) -> Optional[Trace]:
+        r"""
+        Run the pattern's automaton over a string and report where and why it fails.
+
+        Args:
+            test_string (str): The string to scan.
+
+        Returns:
+            Optional[Trace]: The failure offset, the nodes expected there and the
+            spans each node consumed, or None if the pattern is not regular.
+        """
+        automaton = self.automaton
+        return automaton.trace(test_string) if automaton is not None else None
+
+    def __repr__(self) -> str:
+        return f"CompiledPattern({self.pattern!r}, flags={self.flags})"
+
+def _fixed_shape(ast: RegexAST) -> bool:
+    # Whether every quantifier repeats a single character a fixed number of times
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Quantifier):
+            if node.min != node.max or not isinstance(node.child, (Literal, CharClass, AnyChar, Escape)):
+                return False
+            continue
+        if isinstance(node, Sequence):
+            stack.extend(node.elements)
+        elif isinstance(node, Alternation):
+            stack.extend(node.options)
+        elif isinstance(node, Group):
+            stack.extend(node.children)
+    return True
+
+# Process-wide cache of compiled patterns, keyed by (pattern, flags).
+compiled_cache = LRUCache(maxsize=512)
+
+def compile_pattern(pattern: str, flags: int = 0) -> CompiledPattern:
+    r"""
+    Return the shared CompiledPattern for ``pattern`` and ``flags``.
+
+    Args:
+        pattern (str): The regex pattern.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+
+    Returns:
+        CompiledPattern: The pattern, parsed at most once per process while cached.
+    """
+    flags = int(flags)
+    return compiled_cache.get_or_create((pattern, flags), lambda: CompiledPattern(pattern, flags))
@@ -0,0 +1,345 @@
+r"""
+Minimized DFA with table-driven matching for the regular subset of Python regexes.
+
+:class:`DFA` determinizes a pattern's :class:`~rexplain.core.automaton.NFA` by
+subset construction and minimizes the result. Matching then costs one table
+lookup per character, whatever the pattern, so patterns that make ``re``
+backtrack catastrophically (``(a+)+$``) still run in linear time.
+
+The alphabet is a set of character classes: two characters share a class when
+every character test and assertion of the NFA treats them alike, so
+``[a-z]+\d`` needs three classes, not a column per character. Classes are
+found for Latin-1 up front. A character from a class not seen before
+(for example the first CJK character tested against ``\w+``) rebuilds the
+tables with one more column. Determinization stops at ``MAX_DFA_STATES``
+states, or once its transitions and the NFA subsets they step from add up to
+``MAX_DFA_WORK`` (a 5000-word alternation has few DFA states but a start
+subset of thousands):
+:meth:`DFA.from_nfa` returns None then, and callers fall back to ``re``.
+Minimization uses Hopcroft's algorithm, in O(n log n) splits for n states.
+
+With NumPy installed, :meth:`DFA.match_many` advances all strings of the same
+length in lockstep, one array lookup per position; without it, strings are
+matched one at a time.
+"""
+import threading
+from array import array
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .automaton import NFA, _ASSERT
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+# Most states built before giving up on a pattern
+MAX_DFA_STATES = 10000
+# Most work before giving up: each transition built costs one plus the size of
+# the NFA subset it steps from
+MAX_DFA_WORK = 50000
+# Code points whose class is computed up front
+_LOW = 256
+# Characters whose class is remembered before the memo is reset
+_MAX_MEMO = 1 << 16
+
+class _Tables(NamedTuple):
+    # One immutable snapshot of the automaton; replaced when a class is added.
+    # States are numbered by the offset of their row, state * width.
+    start: int
+    dead: int  # the state no string can leave, or -1 if there is none
+    width: int  # number of classes
+    table: array  # next state of (state, class) at state + class
+    accepting: bytes  # by state // width
+    low: array  # class of each code point below _LOW
+    classes: Dict[int, int]  # character signature -> class
+    representatives: Tuple[str, ...]  # one character per class
+    memo: Dict[str, int]  # class of every character seen so far
+
+class DFA:
+    """
+    Minimized deterministic automaton for a pattern's full matches.
+
+    Instances are built with :meth:`from_nfa` and can be shared between threads.
+    """
+    def __init__(self, nfa: NFA, tables: _Tables, max_states: int):
+        self._nfa = nfa
+        self._tables: Optional[_Tables] = tables
+        self._max_states = max_states
+        self._lock = threading.Lock()
+        self._numpy = None  # NumPy copies of the current tables
+        # Assertions look back at the previous character only through these tests
+        self._context_predicates = tuple(sorted({
+            arg[1] for kind, arg in zip(nfa.kinds, nfa.args) if kind == _ASSERT and arg[1] is not None
+        }))
+
+    @classmethod
+    def from_nfa(cls, nfa: NFA, max_states: int = MAX_DFA_STATES) -> Optional['DFA']:
+        r"""
+        Determinize and minimize an NFA.
+
+        Args:
+            nfa (NFA): The pattern's automaton.
+            max_states (int, optional): Most states to build before giving up.
+                Defaults to 10000.
+
+        Returns:
+            Optional[DFA]: The automaton, or None if determinizing needs more
+            than ``max_states`` states or more than ``MAX_DFA_WORK`` work.
+        """
+        representatives = [chr(code) for code in range(_LOW)]
+        # Characters of the pattern beyond Latin-1 get their class up front
+        for text, _ in nfa._predicate_ids:
+            representatives.extend(char for char in text if ord(char) >= _LOW)
+        dfa = cls(nfa, None, max_states)
+        tables = dfa._build(representatives)
+        if tables is None:
+            return None
+        dfa._tables = tables
+        return dfa
+
+    @property
+    def state_count(self) -> int:
+        """Number of states after minimization (0 if the tables outgrew the limit)."""
+        tables = self._tables
+        return len(tables.accepting) if tables is not None else 0
+
+    @property
+    def class_count(self) -> int:
+        """Number of character classes in the alphabet."""
+        tables = self._tables
+        return tables.width if tables is not None else 0
+
+    def fullmatch(self, text: str) -> bool:
+        r"""
+        Whether the pattern matches all of ``text``, in time linear in its length.
+
+        Args:
+            text (str): The string to test.
+
+        Returns:
+            bool: The same answer as ``bool(re.fullmatch(pattern, text, flags))``.
+        """
+        while True:
+            tables = self._tables
+            if tables is None:
+                # Outgrew the limit after new classes appeared; the NFA is still linear
+                return self._nfa.prefix_match(text).longest == len(text)
+            table, memo, dead = tables.table, tables.memo, tables.dead
+            state = tables.start
+            try:
+                for char in text:
+                    state = table[state + memo[char]]
+                    if state == dead:
+                        return False
+            except KeyError:
+                # Characters not seen before: classify them all, then start over
+                if self._classify(tables, set(text).difference(memo)) and not memo.keys() >= set(text):
+                    return self._nfa.prefix_match(text).longest == len(text)  # too many to remember
+                continue
+            return bool(tables.accepting[state // tables.width])
+
+    def match_many(self, strings: Sequence[str]) -> List[bool]:
+        r"""
+        Test many strings, advancing strings of equal length in lockstep.
+
+        Args:
+            strings (Sequence[str]): The strings to test.
+
+        Returns:
+            List[bool]: ``fullmatch`` of each string, in order.
+        """
+        if np is None or self._tables is None:
+            return [self.fullmatch(s) for s in strings]
+        by_length: Dict[int, List[int]] = {}
+        for row, s in enumerate(strings):
+            by_length.setdefault(len(s), []).append(row)
+        results = [False] * len(strings)
+        for length, rows in by_length.items():
+            matched = self._lockstep([strings[row] for row in rows], length)
+            for row, value in zip(rows, matched):
+                results[row] = value
+        return results
+
+    def _lockstep(self, strings: List[str], length: int) -> List[bool]:
+        while True:
+            tables = self._tables
+            if tables is None:
+                return [self.fullmatch(s) for s in strings]
+            table, accepting, low = self._numpy_tables(tables)
+            if length == 0:
+                return [bool(accepting[tables.start // tables.width])] * len(strings)
+            codes = np.array(strings, dtype=f'<U{length}').view(np.uint32).reshape(len(strings), length)
+            classes = np.empty(codes.shape, dtype=np.intp)
+            is_low = codes < _LOW
+            classes[is_low] = low[codes[is_low]]
+            if not is_low.all():
+                unique, inverse = np.unique(codes[~is_low], return_inverse=True)
+                chars = [chr(code) for code in unique.tolist()]
+                if not self._classify(tables, chars):
+                    continue  # the tables were rebuilt; start over
+                memo = tables.memo
+                if not all(char in memo for char in chars):
+                    return [self.fullmatch(s) for s in strings]  # too many to remember
+                classes[~is_low] = np.asarray([memo[char] for char in chars], dtype=np.intp)[inverse]
+            states = np.full(len(strings), tables.start // tables.width, dtype=np.intp)
+            for position in range(length):
+                states = table[states, classes[:, position]]
+            return accepting[states].tolist()
+
+    def _numpy_tables(self, tables: _Tables):
+        cached = self._numpy
+        if cached is None or cached[0] is not tables:
+            cached = (
+                tables,
+                (np.frombuffer(tables.table, dtype=np.int32) // tables.width).astype(np.intp).reshape(-1, tables.width),
+                np.frombuffer(tables.accepting, dtype=np.uint8).astype(bool),
+                np.frombuffer(tables.low, dtype=np.int32).astype(np.intp),
+            )
+            self._numpy = cached
+        return cached[1:]
+
+    def _signature(self, char: str) -> int:
+        # Bit 0: the character is a newline that assertions look at; bit i + 1:
+        # it passes character test i
+        nfa = self._nfa
+        signature = 1 if char == '\n' and nfa.has_assertions else 0
+        for index in range(len(nfa._predicates)):
+            if nfa._test(index, char):
+                signature |= 2 << index
+        return signature
+
+    def _context(self, char: str) -> tuple:
+        # What assertions can see of a character when it is the previous one
+        return (char == '\n',) + tuple(self._nfa._test(index, char) for index in self._context_predicates)
+
+    def _classify(self, tables: _Tables, chars) -> bool:
+        # Add the classes of new characters to the memo. Returns False if one of
+        # them needs a new class, after rebuilding the tables with it.
+        found = {}
+        for char in chars:
+            k = tables.classes.get(self._signature(char))
+            if k is None:
+                with self._lock:
+                    if self._tables is tables:
+                        self._tables = self._build(list(tables.representatives) + [char])
+                return False
+            found[char] = k
+        memo = tables.memo
+        if len(memo) + len(found) > _MAX_MEMO:
+            memo.clear()
+            memo.update((chr(code), k) for code, k in enumerate(tables.low))
+        if len(memo) + len(found) <= _MAX_MEMO:
+            memo.update(found)
+        return True
+
+    def _build(self, representatives: List[str]) -> Optional[_Tables]:
+        # Subset construction over one representative character per class, then minimization
+        classes: Dict[int, int] = {}
+        reps: List[str] = []
+        for char in representatives:
+            signature = self._signature(char)
+            if signature not in classes:
+                classes[signature] = len(reps)
+                reps.append(char)
+        width = len(reps)
+        nfa = self._nfa
+        # The previous character matters only to assertions, through its context
+        previous = [None] * width
+        if nfa.has_assertions:
+            canonical: Dict[tuple, str] = {}
+            for k, char in enumerate(reps):
+                previous[k] = canonical.setdefault(self._context(char), char)
+        dead_key = (frozenset(), frozenset(), None)
+        start_key = (frozenset((nfa.start,)), frozenset(), None)
+        ids = {start_key: 0}
+        keys = [start_key]
+        table = []
+        work = 0
+        i = 0
+        while i < len(keys):
+            current, _, prev = keys[i]
+            work += (len(current) + 1) * width
+            if work > MAX_DFA_WORK:
+                return None
+            for k, char in enumerate(reps):
+                if current:
+                    stepped, pending, _ = nfa._step(current, prev, char)
+                    key = (stepped, pending, previous[k]) if stepped or pending else dead_key
+                else:
+                    key = dead_key
+                target = ids.get(key)
+                if target is None:
+                    if len(keys) >= self._max_states:
+                        return None
+                    target = ids[key] = len(keys)
+                    keys.append(key)
+                table.append(target)
+            i += 1
+        accepting = [
+            nfa._accepts(current, prev) or bool(pending and nfa._accepts(pending, prev))
+            for current, pending, prev in keys
+        ]
+        start, dead, table, accepting = _minimize(table, accepting, width, ids.get(dead_key, -1))
+        low = array('i', [classes[self._signature(chr(code))] for code in range(_LOW)])
+        memo = {chr(code): k for code, k in enumerate(low)}
+        return _Tables(start * width, dead * width if dead >= 0 else -1, width,
+                       array('i', [target * width for target in table]), bytes(accepting), low, classes,
+                       tuple(reps), memo)
+
+def _minimize(table: List[int], accepting: List[bool], width: int, dead: int):
+    # Hopcroft's partition refinement: split blocks by the states that reach a
+    # splitter block on one class, queueing the smaller half of every split,
+    # until states in one block agree on acceptance and on every transition
+    count = len(accepting)
+    inverse: List[Dict[int, List[int]]] = [{} for _ in range(width)]
+    for state in range(count):
+        for k in range(width):
+            inverse[k].setdefault(table[state * width + k], []).append(state)
+    blocks = [members for members in ({s for s in range(count) if accepting[s]},
+                                      {s for s in range(count) if not accepting[s]}) if members]
+    block = [0] * count
+    for b, members in enumerate(blocks):
+        for state in members:
+            block[state] = b
+    pending = deque((b, k) for b in range(len(blocks)) for k in range(width))
+    queued = set(pending)
+    while pending:
+        splitter = pending.popleft()
+        queued.discard(splitter)
+        b, k = splitter
+        sources = inverse[k]
+        touched: Dict[int, set] = {}
+        for target in blocks[b]:
+            for state in sources.get(target, ()):
+                touched.setdefault(block[state], set()).add(state)
+        for c, inside in touched.items():
+            if len(inside) == len(blocks[c]):
+                continue
+            blocks[c] -= inside
+            new = len(blocks)
+            blocks.append(inside)
+            for state in inside:
+                block[state] = new
+            smaller = new if len(inside) <= len(blocks[c]) else c
+            for j in range(width):
+                if (c, j) in queued:
+                    queued.add((new, j))
+                    pending.append((new, j))
+                else:
+                    queued.add((smaller, j))
+                    pending.append((smaller, j))
+    total = len(blocks)
+    # Renumber so the start state is 0
+    order: Dict[int, int] = {block[0]: 0}
+    for state in range(count):
+        order.setdefault(block[state], len(order))
+    minimized = [0] * (total * width)
+    final = [False] * total
+    for state in range(count):
+        b = order[block[state]]
+        final[b] = accepting[state]
+        for k in range(width):
+            minimized[b * width + k] = order[block[table[state * width + k]]]
+    return 0, (order[block[dead]] if dead >= 0 else -1), minimized, final
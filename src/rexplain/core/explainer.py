@@ -1,39 +1,128 @@
-from typing import Union
-from .parser import RegexAST, Literal, CharClass, Escape, Quantifier, Anchor, Sequence, Alternation, Group
+from typing import List, Optional, Union
+from .parser import RegexAST, Literal, LiteralRun, AnyChar, CharClass, Escape, Quantifier, Anchor, Sequence, Alternation, Group
 
 import string
 
-def _token_and_explanation(ast: RegexAST) -> list:
-    lines = []
+class _GroupLine:
+    """
+    Explanation line of a group whose child lines are kept unjoined until the
+    final text is rendered, so deeply nested groups are not re-copied per level.
+    """
+    __slots__ = ('head', 'children')
+
+    def __init__(self, head: str, children: list):
+        self.head = head
+        self.children = children
+
+_Line = Union[str, _GroupLine]
+
+# Token classes that are explained on one line together with their quantifier
+_SIMPLE_TOKENS = (Literal, AnyChar, Escape, CharClass, Group)
+
+def _explained_children(ast: RegexAST) -> Optional[tuple]:
+    # Sub-nodes whose lines are needed to explain ``ast``; None for leaf lines
     if isinstance(ast, Sequence):
-        for elem in ast.elements:
-            lines.extend(_token_and_explanation(elem))
+        return ast.elements
     elif isinstance(ast, Alternation):
-        # Each option on a new line, with 'or' for clarity
-        for i, opt in enumerate(ast.options):
-            opt_lines = _token_and_explanation(opt)
-            if i > 0:
-                opt_lines[0] = 'or ' + opt_lines[0]
-            lines.extend(opt_lines)
+        return ast.options
+    elif isinstance(ast, Group):
+        return ast.children
+    elif isinstance(ast, Quantifier):
+        if isinstance(ast.child, Group):
+            return ast.child.children
+        if not isinstance(ast.child, _SIMPLE_TOKENS):
+            return (ast.child,)
+    return None
+
+def _leaf_lines(ast: RegexAST, group_literals: bool) -> List[_Line]:
+    if isinstance(ast, LiteralRun):
+        if group_literals:
+            return [f"{ast.value} - {_explain_token(ast)}"]
+        # One line per character, exactly as for separate literals
+        return [f"{c} - {_explain_token(Literal(c))}" for c in ast.value]
     elif isinstance(ast, Quantifier):
         # Combine quantifier with its child token
-        child = ast.child
-        if isinstance(child, (Literal, Escape, CharClass, Group)):
-            token = _get_token(child) + ast.quant
-            explanation = _explain_token(child, quant=ast.quant)
-            lines.append(f"{token} - {explanation}")
-        else:
-            # For complex children, recurse
-            for l in _token_and_explanation(child):
-                lines.append(f"{l.split(' - ')[0]}{ast.quant} - {l.split(' - ')[1]} repeated as per quantifier '{ast.quant}'")
-    else:
-        token = _get_token(ast)
-        explanation = _explain_token(ast)
-        lines.append(f"{token} - {explanation}")
+        return [f"{_get_token(ast.child)}{ast.quant} - {_explain_token(ast.child, quant=ast)}"]
+    return [f"{_get_token(ast)} - {_explain_token(ast)}"]
+
+def _combine_lines(ast: RegexAST, parts: List[List[_Line]]) -> List[_Line]:
+    if isinstance(ast, Alternation):
+        # Each option on a new line, with 'or' for clarity
+        for i, opt_lines in enumerate(parts):
+            if i > 0 and opt_lines:
+                first = opt_lines[0]
+                if isinstance(first, _GroupLine):
+                    opt_lines[0] = _GroupLine('or ' + first.head, first.children)
+                else:
+                    opt_lines[0] = 'or ' + first
+    lines = [line for part in parts for line in part]
+    if isinstance(ast, Group):
+        return [_group_line(ast, None, lines)]
+    elif isinstance(ast, Quantifier):
+        if isinstance(ast.child, Group):
+            return [_group_line(ast.child, ast, lines)]
+        # For complex children, repeat each child line
+        repeated = []
+        for l in map(_render_line, lines):
+            repeated.append(f"{l.split(' - ')[0]}{ast.quant} - {l.split(' - ')[1]} repeated as per quantifier '{ast.quant}'")
+        return repeated
     return lines
 
+def _group_line(group: Group, quant: Optional[Quantifier], child_lines: List[_Line]) -> _Line:
+    token = _get_token(group) + (quant.quant if quant is not None else '')
+    desc = _group_description(group, quant)
+    if group.children:
+        return _GroupLine(f"{token} - {desc} containing:\n  ", child_lines)
+    return f"{token} - {desc}"
+
+def _explanation_lines(ast: RegexAST, group_literals: bool = False) -> List[_Line]:
+    # Post-order walk with an explicit stack, so deep nesting cannot hit the
+    # recursion limit. A frame (node, None) still has to be expanded; a frame
+    # (node, n) combines the line lists of its n children from ``results``.
+    results = []
+    stack = [(ast, None)]
+    while stack:
+        node, count = stack.pop()
+        if count is None:
+            children = _explained_children(node)
+            if children is None:
+                results.append(_leaf_lines(node, group_literals))
+            else:
+                stack.append((node, len(children)))
+                stack.extend((child, None) for child in reversed(children))
+        else:
+            split = len(results) - count
+            parts = results[split:]
+            del results[split:]
+            results.append(_combine_lines(node, parts))
+    return results[0]
+
+def _write_line(line: _Line, out: List[str]) -> None:
+    # Append the text of ``line`` to ``out`` without recursion
+    stack = [line]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _GroupLine):
+            out.append(item.head)
+            for i in range(len(item.children) - 1, -1, -1):
+                stack.append(item.children[i])
+                if i:
+                    stack.append('\n  ')
+        else:
+            out.append(item)
+
+def _render_line(line: _Line) -> str:
+    if isinstance(line, str):
+        return line
+    out = []
+    _write_line(line, out)
+    return ''.join(out)
+
+def _token_and_explanation(ast: RegexAST, group_literals: bool = False) -> list:
+    return [_render_line(line) for line in _explanation_lines(ast, group_literals)]
+
 def _get_token(ast: RegexAST) -> str:
-    if isinstance(ast, Literal):
+    if isinstance(ast, (Literal, LiteralRun, AnyChar)):
         return ast.value
     elif isinstance(ast, Escape):
         return ast.value
@@ -52,126 +141,126 @@ def _get_token(ast: RegexAST) -> str:
             return "(...)"
     return str(ast)
 
-def _explain_token(ast: RegexAST, quant: str = None) -> str:
+def _explain_token(ast: RegexAST, quant: Quantifier = None) -> str:
+    quant_desc = f" {_quantifier_explanation(quant)}" if quant is not None else ""
     if isinstance(ast, Literal):
         c = ast.value
         code = ord(c) if len(c) == 1 else None
         code_str = f" (ASCII {code})" if code is not None and c in string.printable else ""
-        return f"matches the character '{c}'{code_str} literally (case sensitive)"
+        return f"matches the character '{c}'{code_str} literally (case sensitive){quant_desc}"
+    elif isinstance(ast, LiteralRun):
+        return f"matches the text '{ast.value}' literally (case sensitive)"
+    elif isinstance(ast, AnyChar):
+        return f"matches any character except a newline{quant_desc}"
     elif isinstance(ast, Escape):
-        escape_map = {
-            r'\\': 'a literal backslash',
-            r'\d': 'a digit character',
-            r'\w': 'a word character',
-            r'\s': 'a whitespace character',
-            r'\D': 'a non-digit character',
-            r'\W': 'a non-word character',
-            r'\S': 'a non-whitespace character',
-            r'\n': 'a newline character',
-            r'\t': 'a tab character',
-            r'\r': 'a carriage return',
-            r'\b': 'a word boundary',
-            r'\B': 'a non-word boundary',
-        }
-        return f"matches {escape_map.get(ast.value, 'the escape sequence ' + ast.value)}"
+        return f"matches {_ESCAPE_DESCRIPTIONS.get(ast.value, 'the escape sequence ' + ast.value)}{quant_desc}"
     elif isinstance(ast, CharClass):
-        return f"matches any character in the set {ast.value}"
+        return f"matches any character in the set {ast.value}{quant_desc}"
     elif isinstance(ast, Anchor):
-        anchor_map = {
-            '^': 'asserts position at the start of a line',
-            '$': 'asserts position at the end of a line',
-            r'\b': 'a word boundary',
-            r'\B': 'a non-word boundary',
-        }
-        return anchor_map.get(ast.value, f"the anchor '{ast.value}'")
+        return _ANCHOR_DESCRIPTIONS.get(ast.value, f"the anchor '{ast.value}'") + quant_desc
     elif isinstance(ast, Group):
-        group_type_map = {
-            'GROUP_NONCAP': 'a non-capturing group',
-            'GROUP_NAMED': f"a named group '{ast.name}'" if ast.name else 'a named group',
-            'GROUP_LOOKAHEAD': 'a lookahead group (must be followed by)',
-            'GROUP_NEG_LOOKAHEAD': 'a negative lookahead group (must NOT be followed by)',
-            'GROUP_LOOKBEHIND': 'a lookbehind group (must be preceded by)',
-            'GROUP_NEG_LOOKBEHIND': 'a negative lookbehind group (must NOT be preceded by)',
-            'GROUP_FLAGS': f'a group with flags ({ast.flags})' if ast.flags else 'a group with flags',
-            'GROUP_CONDITIONAL': 'a conditional group',
-            'GROUP_OPEN': 'a capturing group',
-        }
-        desc = group_type_map.get(ast.group_type, 'a group')
+        desc = _group_description(ast, quant)
         if ast.children:
-            child_lines = []
-            for child in ast.children:
-                child_lines.extend(_token_and_explanation(child))
+            child_lines = [line for child in ast.children for line in _token_and_explanation(child)]
             return f"{desc} containing:\n  " + "\n  ".join(child_lines)
-        else:
-            return desc
-    if quant:
-        quant_desc = _quantifier_explanation(quant)
-        return f"{_explain_token(ast)} {quant_desc}"
-    return f"matches {ast}"
-
-def _quantifier_explanation(quant: str) -> str:
-    if quant == '*':
-        return 'zero or more times (greedy)'
-    elif quant == '+':
-        return 'one or more times (greedy)'
-    elif quant == '?':
-        return 'zero or one time (greedy)'
-    elif quant.endswith('?'):
-        base = quant[:-1]
-        if base == '*':
-            return 'zero or more times (non-greedy)'
-        elif base == '+':
-            return 'one or more times (non-greedy)'
-        elif base == '?':
-            return 'zero or one time (non-greedy)'
-        elif base.startswith('{'):
-            return f"{base} times (non-greedy)"
-        else:
-            return f"{quant} times"
-    elif quant.startswith('{'):
-        import re
-        m = re.match(r'\{(\d+)(,(\d*)?)?\}', quant)
-        if m:
-            n1 = m.group(1)
-            n2 = m.group(3)
-            if n2 == '' or n2 is None:
-                return f"exactly {n1} times"
-            else:
-                return f"{n1} to {n2} times"
-        else:
-            return f"{quant} times"
+        return desc
+    return f"matches {ast}{quant_desc}"
+
+def _group_description(group: Group, quant: Optional[Quantifier]) -> str:
+    if group.group_type == 'GROUP_NAMED':
+        desc = f"a named group '{group.name}'" if group.name else 'a named group'
+    elif group.group_type == 'GROUP_FLAGS':
+        desc = f'a group with flags ({group.flags})' if group.flags else 'a group with flags'
+    else:
+        desc = _GROUP_DESCRIPTIONS.get(group.group_type, 'a group')
+    if quant is not None:
+        desc += f" repeated {_quantifier_explanation(quant)}"
+    return desc
+
+_ESCAPE_DESCRIPTIONS = {
+    r'\\': 'a literal backslash',
+    r'\d': 'a digit character',
+    r'\w': 'a word character',
+    r'\s': 'a whitespace character',
+    r'\D': 'a non-digit character',
+    r'\W': 'a non-word character',
+    r'\S': 'a non-whitespace character',
+    r'\n': 'a newline character',
+    r'\t': 'a tab character',
+    r'\r': 'a carriage return',
+    r'\b': 'a word boundary',
+    r'\B': 'a non-word boundary',
+}
+
+_ANCHOR_DESCRIPTIONS = {
+    '^': 'asserts position at the start of a line',
+    '$': 'asserts position at the end of a line',
+    r'\b': 'a word boundary',
+    r'\B': 'a non-word boundary',
+}
+
+_GROUP_DESCRIPTIONS = {
+    'GROUP_NONCAP': 'a non-capturing group',
+    'GROUP_LOOKAHEAD': 'a lookahead group (must be followed by)',
+    'GROUP_NEG_LOOKAHEAD': 'a negative lookahead group (must NOT be followed by)',
+    'GROUP_LOOKBEHIND': 'a lookbehind group (must be preceded by)',
+    'GROUP_NEG_LOOKBEHIND': 'a negative lookbehind group (must NOT be preceded by)',
+    'GROUP_CONDITIONAL': 'a conditional group',
+    'GROUP_ATOMIC': 'an atomic group',
+    'GROUP_OPEN': 'a capturing group',
+}
+
+def _quantifier_explanation(quant: Quantifier) -> str:
+    # Uses the bounds parsed into the node; no pattern text is re-read here
+    lo, hi = quant.min, quant.max
+    if hi is None:
+        count = 'zero or more times' if lo == 0 else ('one or more times' if lo == 1 else f"at least {lo} times")
+    elif lo == 0 and hi == 1:
+        count = 'zero or one time'
+    elif lo == hi:
+        count = f"exactly {lo} times"
     else:
-        return f"{quant} times"
+        count = f"{lo} to {hi} times"
+    return f"{count} ({'greedy' if quant.greedy else 'non-greedy'})"
 
 
-def explain(ast: RegexAST) -> str:
+def explain(ast: RegexAST, group_literals: bool = False) -> str:
     r"""
     Return a line-by-line, context-aware explanation of the regex AST.
 
     Args:
         ast (RegexAST): The root node of the regex AST.
+        group_literals (bool, optional): Describe each LiteralRun as a whole
+            instead of one line per character. Defaults to False.
 
     Returns:
         str: A formatted, line-by-line explanation of the regex pattern.
     """
-    lines = _token_and_explanation(ast)
-    return '\n'.join(lines)
+    out = []
+    for i, line in enumerate(_explanation_lines(ast, group_literals)):
+        if i:
+            out.append('\n')
+        _write_line(line, out)
+    return ''.join(out)
 
 class RegexExplainer:
     """
     Provides human-readable explanations for regex patterns.
+
+    Instances hold no per-call state and can be shared between threads.
     """
-    def explain(self, pattern: str, flags: int = 0) -> str:
+    def explain(self, pattern: str, flags: int = 0, group_literals: bool = False) -> str:
         r"""
         Explain a regex pattern as a formatted, line-by-line string.
 
         Args:
             pattern (str): The regex pattern to explain.
             flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+            group_literals (bool, optional): Describe runs of literal characters
+                as a whole instead of one line per character. Defaults to False.
 
         Returns:
             str: A line-by-line explanation of the regex pattern.
         """
-        from .parser import RegexParser
-        ast = RegexParser().parse(pattern, flags=flags)
-        return explain(ast)
+        from .compiled import compile_pattern
+        return compile_pattern(pattern, flags).explain(group_literals)
@@ -1,20 +1,80 @@
+import hashlib
+import os
 import random
-from typing import List, Tuple
-from .parser import RegexParser, RegexAST, Literal, CharClass, Escape, Quantifier, Anchor, Sequence, Alternation, Group
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+from .parser import RegexParser, RegexAST, Literal, LiteralRun, AnyChar, CharClass, Escape, Quantifier, Anchor, Sequence, Alternation, Group
+
+_LOOKAROUND_GROUPS = frozenset({'GROUP_LOOKAHEAD', 'GROUP_NEG_LOOKAHEAD', 'GROUP_LOOKBEHIND', 'GROUP_NEG_LOOKBEHIND'})
+
+# Kinds of compiled plan nodes. A _DRAW node holds a tuple of candidate
+# sequences and produces one random element of each, in order: a literal is a
+# one-element tuple and a character class the string of its characters.
+_DRAW, _SEQ, _REPEAT, _CHOICE = range(4)
+
+# Batches this large are generated in one pass, with NumPy when it is installed
+_VECTORIZE_MIN = 256
+# Examples per independently seeded block in generate_parallel
+DEFAULT_BLOCK_SIZE = 10000
+_DIGITS = '0123456789'
+_WORD = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_'
+_SPACE = ' \t\n'
+_CONTROL = {r'\\': '\\', r'\n': '\n', r'\t': '\t', r'\r': '\r', r'\b': '', r'\B': ''}
+
+class GenerationPlan(NamedTuple):
+    """
+    Everything the generator derives from a pattern before producing examples.
+
+    Attributes:
+        ast (RegexAST): The parsed pattern.
+        anchored (bool): Whether the pattern is fully anchored (``^...$``), in
+            which case every example is the same.
+        root (tuple): The pattern compiled into samplers: candidate characters
+            and literals, repetition bounds and alternation tables, so that
+            producing an example only draws random numbers.
+    """
+    ast: RegexAST
+    anchored: bool
+    root: tuple
 
 class ExampleGenerator:
     """
     Generates example strings that match a given regex pattern using the AST.
+
+    Instances hold no per-call state and can be shared between threads. A
+    seeded generator draws from its own ``random.Random``, so its output is
+    reproducible without touching the global :mod:`random` state; shared
+    between threads, the order in which they take its numbers decides who gets
+    which examples.
     """
-    def __init__(self):
+    def __init__(self, seed: Optional[Union[int, str]] = None):
         """
         Initialize the ExampleGenerator.
+
+        Args:
+            seed (Optional[Union[int, str]], optional): Seed of the generator's
+                own random number stream. None draws from the global
+                :mod:`random` module. Defaults to None.
         """
+        self.seed = seed
+        # The random module has the same methods as a Random instance
+        self._random = random if seed is None else random.Random(seed)
         self.parser = RegexParser()
         # For negated char classes, pick from this set
         self.default_charset = [chr(i) for i in range(32, 127)]
+        charset = ''.join(self.default_charset)
+        self._escapes = {
+            r'\d': _DIGITS,
+            r'\w': _WORD,
+            r'\s': _SPACE,
+            r'\D': ''.join(c for c in charset if not c.isdigit()),
+            r'\W': ''.join(c for c in charset if not (c.isalnum() or c == '_')),
+            r'\S': ''.join(c for c in charset if not c.isspace()),
+        }
 
-    def generate(self, pattern: str, count: int = 3, flags: int = 0) -> List[str]:
+    def generate(self, pattern: str, count: int = 3, flags: int = 0, unique: bool = False,
+                 length: Union[int, Tuple[int, int], None] = None) -> List[str]:
         """
         Generate a list of example strings that match the given regex pattern.
 
@@ -22,18 +82,80 @@ class ExampleGenerator:
             pattern (str): The regex pattern.
             count (int, optional): Number of examples to generate. Defaults to 3.
             flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+            unique (bool, optional): Return distinct examples, drawn uniformly
+                from the strings the generator can produce. Defaults to False.
+            length (Union[int, Tuple[int, int], None], optional): Only examples
+                of this length or inclusive ``(min, max)`` length range, each
+                equally likely. Defaults to None.
+
+        Returns:
+            List[str]: Example strings matching the pattern.
+
+        Raises:
+            ValueError: If ``unique`` is set and the pattern has fewer than
+                ``count`` distinct examples of the requested lengths, or if it
+                has none of those lengths.
+        """
+        from .compiled import compile_pattern
+        compiled = compile_pattern(pattern, flags)
+        if unique or length is not None:
+            return _from_language(compiled.language, count, self._random, unique, length)
+        return self.generate_from_plan(compiled.generation_plan, count)
+
+    def plan(self, ast: RegexAST) -> GenerationPlan:
+        """
+        Prepare a parsed pattern for generation.
+
+        Args:
+            ast (RegexAST): The root node of the regex AST.
+
+        Returns:
+            GenerationPlan: Plan to pass to :meth:`generate_from_plan`.
+        """
+        return GenerationPlan(ast, self._is_fully_anchored(ast), self._compile(ast))
+
+    def generate_from_plan(self, plan: GenerationPlan, count: int = 3, unique: bool = False,
+                           length: Union[int, Tuple[int, int], None] = None) -> List[str]:
+        """
+        Generate a list of example strings from a prepared plan.
+
+        Args:
+            plan (GenerationPlan): Plan returned by :meth:`plan`.
+            count (int, optional): Number of examples to generate. Defaults to 3.
+            unique (bool, optional): Return distinct examples; see
+                :meth:`generate`. Defaults to False.
+            length (Union[int, Tuple[int, int], None], optional): Only examples
+                of this length or length range; see :meth:`generate`.
+                Defaults to None.
 
         Returns:
             List[str]: Example strings matching the pattern.
+
+        Raises:
+            ValueError: As for :meth:`generate`.
         """
-        ast = self.parser.parse(pattern, flags=flags)
+        if unique or length is not None:
+            from .language import Language
+            return _from_language(Language(plan, self), count, self._random, unique, length)
+        root = plan.root
         # For alternations, try to cover all branches if possible
-        if isinstance(ast, Alternation) and count <= len(ast.options):
-            return [self._generate_from_ast(opt) for opt in ast.options[:count]]
+        if root[0] == _CHOICE and count <= len(root[1]):
+            return [self._sample(self._option(root, i)) for i in range(count)]
         # Special handling for anchored patterns: only generate the exact match
-        if self._is_fully_anchored(ast):
-            return [self._generate_from_ast(ast)] * count
-        return [self._generate_from_ast(ast) for _ in range(count)]
+        if plan.anchored:
+            return [self._sample(root)] * count
+        if count >= _VECTORIZE_MIN:
+            from .vectorgen import generate_vectorized
+            try:
+                return generate_vectorized(self, root, count)
+            except RecursionError:
+                pass  # too deeply nested for the vectorized pass
+        if root[0] == _DRAW:
+            # No repetition or alternation: one draw per element
+            items = root[1]
+            choice = self._random.choice
+            return [''.join(map(choice, items)) for _ in range(count)]
+        return [self._sample(root) for _ in range(count)]
 
     def _is_fully_anchored(self, ast: RegexAST) -> bool:
         # Returns True if the pattern is ^...$ (fully anchored)
@@ -49,75 +171,105 @@ class ExampleGenerator:
         return False
 
     def _generate_from_ast(self, ast: RegexAST) -> str:
-        if isinstance(ast, Literal):
-            return ast.value
+        # One example without a cached plan
+        return self._sample(self._compile(ast))
+
+    def _sample(self, root: tuple) -> str:
+        # Walk the compiled plan with an explicit stack of pending nodes, so
+        # deeply nested patterns cannot hit the recursion limit
+        rng = self._random
+        choice = rng.choice
+        randint = rng.randint
+        out = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            kind = node[0]
+            if kind == _DRAW:
+                out.extend(map(choice, node[1]))
+            elif kind == _SEQ:
+                stack.extend(node[1])  # stored in reverse
+            elif kind == _REPEAT:
+                n = randint(node[2], node[3])
+                child = node[1]
+                if child[0] == _DRAW and len(child[1]) == 1:
+                    out.extend(rng.choices(child[1][0], k=n))
+                else:
+                    stack.extend([child] * n)
+            else:
+                stack.append(self._option(node, rng.randrange(len(node[1]))))
+        return ''.join(out)
+
+    def _option(self, node: tuple, index: int) -> tuple:
+        # Options are compiled when first picked, so huge alternations stay lazily parsed
+        compiled = node[2]
+        option = compiled[index]
+        if option is None:
+            option = compiled[index] = self._compile(node[1][index])
+        return option
+
+    def _compile(self, ast: RegexAST) -> tuple:
+        # Post-order over the tree with an explicit stack; results keyed by id()
+        # since leaves are shared between positions
+        results = {}
+        stack = [(ast, False)]
+        while stack:
+            node, ready = stack.pop()
+            if isinstance(node, Sequence):
+                children = node.elements
+            elif isinstance(node, Group):
+                # For lookahead/lookbehind, do not generate any characters
+                children = () if node.group_type in _LOOKAROUND_GROUPS else node.children
+            elif isinstance(node, Quantifier):
+                children = (node.child,)
+            else:
+                # Alternation options are compiled lazily; leaves have no children
+                children = ()
+            if not ready:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children if id(child) not in results)
+                continue
+            if isinstance(node, (Sequence, Group)):
+                results[id(node)] = _sequence([results[id(child)] for child in children])
+            elif isinstance(node, Quantifier):
+                results[id(node)] = _repeat(results[id(node.child)], *self._quant_bounds(node))
+            elif isinstance(node, Alternation):
+                results[id(node)] = (_CHOICE, node.options, [None] * len(node.options))
+            else:
+                results[id(node)] = (_DRAW, (self._leaf_candidates(node),))
+        return results[id(ast)]
+
+    def _leaf_candidates(self, ast: RegexAST):
+        # The strings a leaf can produce, as a sequence to draw one element from
+        if isinstance(ast, (Literal, LiteralRun)):
+            return (ast.value,)
+        elif isinstance(ast, AnyChar):
+            return ''.join(self.default_charset)
         elif isinstance(ast, CharClass):
             chars, negated = self._parse_char_class(ast.value)
             if negated:
-                candidates = [c for c in self.default_charset if c not in chars]
-                return random.choice(candidates) if candidates else '?'
+                candidates = ''.join(c for c in self.default_charset if c not in chars)
+                return candidates or ('?',)
             else:
-                return random.choice(chars) if chars else ''
+                return ''.join(chars) or ('',)
         elif isinstance(ast, Escape):
             # Map escapes to representative characters
-            escape_map = {
-                r'\d': lambda: str(random.randint(0, 9)),
-                r'\w': lambda: random.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_'),
-                r'\s': lambda: random.choice([' ', '\t', '\n']),
-                r'\D': lambda: random.choice([c for c in self.default_charset if not c.isdigit()]),
-                r'\W': lambda: random.choice([c for c in self.default_charset if not (c.isalnum() or c == '_')]),
-                r'\S': lambda: random.choice([c for c in self.default_charset if not c.isspace()]),
-                r'\\': lambda: '\\',
-                r'\n': lambda: '\n',
-                r'\t': lambda: '\t',
-                r'\r': lambda: '\r',
-                r'\b': lambda: '',  # word boundary, ignore in generation
-                r'\B': lambda: '',  # non-word boundary, ignore
-            }
+            candidates = self._escapes.get(ast.value)
+            if candidates is not None:
+                return candidates
+            if ast.value in _CONTROL:
+                return (_CONTROL[ast.value],)
             # Unicode/hex escapes
-            if ast.value.startswith(r'\u') and len(ast.value) == 6:
+            if (ast.value.startswith(r'\u') and len(ast.value) == 6) or \
+               (ast.value.startswith(r'\x') and len(ast.value) == 4):
                 try:
-                    codepoint = int(ast.value[2:], 16)
-                    return chr(codepoint)
+                    return (chr(int(ast.value[2:], 16)),)
                 except Exception:
-                    return '?'
-            if ast.value.startswith(r'\x') and len(ast.value) == 4:
-                try:
-                    codepoint = int(ast.value[2:], 16)
-                    return chr(codepoint)
-                except Exception:
-                    return '?'
-            return escape_map.get(ast.value, lambda: '?')()
-        elif isinstance(ast, Quantifier):
-            min_n, max_n = self._parse_quant(ast.quant)
-            # For larger ranges, limit max_n for practicality
-            max_n = min(max_n, 8)
-            n = random.randint(min_n, max_n)
-            return ''.join(self._generate_from_ast(ast.child) for _ in range(n))
-        elif isinstance(ast, Anchor):
-            # Anchors do not produce characters
-            return ''
-        elif isinstance(ast, Sequence):
-            # If fully anchored, only generate the inner content
-            if self._is_fully_anchored(ast):
-                elements = ast.elements
-                # Remove ^ and $ anchors
-                inner = elements[1:-1]
-                return ''.join(self._generate_from_ast(e) for e in inner)
-            # Recursively generate for each element
-            return ''.join(self._generate_from_ast(e) for e in ast.elements)
-        elif isinstance(ast, Alternation):
-            # Randomly pick one option, support nested alternations
-            option = random.choice(ast.options)
-            return self._generate_from_ast(option)
-        elif isinstance(ast, Group):
-            # For lookahead/lookbehind, do not generate any characters
-            if ast.group_type in {'GROUP_LOOKAHEAD', 'GROUP_NEG_LOOKAHEAD', 'GROUP_LOOKBEHIND', 'GROUP_NEG_LOOKBEHIND'}:
-                return ''
-            # Recursively generate for each child (supports nested groups)
-            return ''.join(self._generate_from_ast(child) for child in ast.children)
+                    return ('?',)
+            return ('?',)
         else:
-            return ''
+            # Anchors and unknown nodes do not produce characters
+            return ('',)
 
     def _parse_char_class(self, class_str: str) -> Tuple[List[str], bool]:
         # Enhanced char class parser: supports negation and ranges
@@ -140,27 +292,142 @@ class ExampleGenerator:
                     i += 1
         return chars, negated
 
-    def _parse_quant(self, quant: str) -> Tuple[int, int]:
-        # Returns (min, max) for quantifier
-        if quant == '*':
-            return (0, 4)
-        elif quant == '+':
-            return (1, 4)
-        elif quant == '?':
-            return (0, 1)
-        elif quant.endswith('?'):
-            # Non-greedy, treat as normal
-            return self._parse_quant(quant[:-1])
-        elif quant.startswith('{'):
-            import re
-            m = re.match(r'\{(\d+)(,(\d*)?)?\}', quant)
-            if m:
-                n1 = int(m.group(1))
-                n2 = m.group(3)
-                if n2 == '' or n2 is None:
-                    return (n1, n1)
-                elif n2:
-                    return (n1, int(n2) if n2.isdigit() else n1+4)
-            return (1, 1)
-        else:
-            return (1, 1)
+    def _quant_bounds(self, quant: Quantifier) -> Tuple[int, int]:
+        # Returns (min, max) repetitions to generate; unbounded quantifiers get
+        # up to 4 repetitions and larger ranges are limited to 8 for practicality
+        min_n = quant.min
+        max_n = quant.max if quant.max is not None else max(min_n, 4)
+        return min_n, max(min_n, min(max_n, 8))
+
+def generate_parallel(pattern: str, count: int, flags: int = 0, processes: Optional[int] = 1,
+                      seed: Optional[Union[int, str]] = None,
+                      block_size: int = DEFAULT_BLOCK_SIZE, unique: bool = False,
+                      length: Union[int, Tuple[int, int], None] = None) -> Iterator[str]:
+    r"""
+    Generate many examples of a pattern, optionally across a process pool.
+
+    The examples are cut into blocks of ``block_size``, and block ``k`` is
+    generated by an :class:`ExampleGenerator` seeded with a hash of ``seed``
+    and ``k``. Each block thus has its own stream, and the output for a given
+    seed is the same whatever the number of processes, and whether or not
+    NumPy is installed.
+    Blocks are yielded in order, at most two per process in flight, so the
+    examples can be written out as they arrive.
+
+    With ``unique``, block ``k`` is instead slice ``k`` of one seeded
+    permutation of the pattern's distinct examples (see
+    :meth:`rexplain.core.language.Language.sample`), so no example repeats
+    across blocks either.
+
+    Args:
+        pattern (str): The regex pattern.
+        count (int): Number of examples.
+        flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+        processes (Optional[int], optional): Worker processes; 1 generates in
+            this process and None uses one per CPU. Defaults to 1.
+        seed (Optional[Union[int, str]], optional): Seed of the whole run. None
+            takes one from the global :mod:`random` module. Defaults to None.
+        block_size (int, optional): Examples per block. Defaults to 10000.
+        unique (bool, optional): Generate distinct examples. Defaults to False.
+        length (Union[int, Tuple[int, int], None], optional): Only examples of
+            this length or inclusive ``(min, max)`` length range, each equally
+            likely. Defaults to None.
+
+    Returns:
+        Iterator[str]: The examples.
+
+    Raises:
+        ValueError: If ``block_size`` or ``processes`` is less than 1, if
+            ``unique`` is set and the pattern has fewer than ``count``
+            distinct examples of the requested lengths, or if it has none of
+            those lengths.
+        re.error: If the pattern is invalid.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError("processes must be at least 1")
+    from .compiled import compile_pattern
+    flags = int(flags)
+    compiled = compile_pattern(pattern, flags)
+    compiled.regex  # report an invalid pattern before any work
+    if unique or length is not None:
+        # Report too few examples before any work
+        available = compiled.language.count(length)
+        if unique and available < count:
+            raise ValueError(f"pattern has only {available} distinct examples, {count} requested")
+        if not available and count:
+            raise ValueError(f"pattern has no examples of length {length!r}")
+    if seed is None:
+        seed = random.getrandbits(64)
+    blocks = [(seed, k, start, min(block_size, count - start), unique, length)
+              for k, start in enumerate(range(0, count, block_size))]
+    return _generate_blocks(pattern, flags, processes, blocks)
+
+def _generate_blocks(pattern: str, flags: int, processes: int, blocks: List[tuple]) -> Iterator[str]:
+    if processes == 1:
+        for block in blocks:
+            yield from _generate_block(pattern, flags, *block)
+        return
+    with ProcessPoolExecutor(processes) as pool:
+        in_flight = deque()
+        for block in blocks:
+            in_flight.append(pool.submit(_generate_block, pattern, flags, *block))
+            if len(in_flight) >= 2 * processes:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def _generate_block(pattern: str, flags: int, seed, index: int, start: int, size: int,
+                    unique: bool, length) -> List[str]:
+    from .compiled import compile_pattern
+    compiled = compile_pattern(pattern, flags)
+    if unique:
+        # Every block keys the same permutation and takes its own slice
+        return compiled.language.sample(size, random.Random(_block_seed(seed, -1)), start, length)
+    generator = ExampleGenerator(_block_seed(seed, index))
+    if length is not None:
+        return compiled.language.choices(size, generator._random, length)
+    return generator.generate_from_plan(compiled.generation_plan, size)
+
+def _from_language(language, count: int, rng, unique: bool, length) -> List[str]:
+    # Uniform over the distinct strings instead of over choices at each node
+    if unique:
+        return language.sample(count, rng, length=length)
+    return language.choices(count, rng, length)
+
+def _block_seed(seed, index: int) -> int:
+    # Unrelated seeds for neighbouring blocks, stable across runs and platforms
+    digest = hashlib.sha256(f'{seed!r}/{index}'.encode('utf-8')).digest()
+    return int.from_bytes(digest[:16], 'little')
+
+def _sequence(parts: List[tuple]) -> tuple:
+    # Children in order, with runs of draws merged into one node and adjacent
+    # literals joined
+    merged = []
+    items = []
+    for part in parts:
+        if part[0] == _DRAW:
+            for item in part[1]:
+                if isinstance(item, tuple) and items and isinstance(items[-1], tuple):
+                    items[-1] = (items[-1][0] + item[0],)
+                elif item != ('',):
+                    items.append(item)
+            continue
+        if items:
+            merged.append((_DRAW, tuple(items)))
+            items = []
+        merged.append(part)
+    if items or not merged:
+        merged.append((_DRAW, tuple(items)))
+    if len(merged) == 1:
+        return merged[0]
+    return (_SEQ, tuple(reversed(merged)))
+
+def _repeat(child: tuple, lo: int, hi: int) -> tuple:
+    if lo == hi and child[0] == _DRAW:
+        # A fixed count of draws is one longer draw, [A-Z]{2} as [A-Z][A-Z]
+        return _sequence([child] * lo)
+    return (_REPEAT, child, lo, hi)
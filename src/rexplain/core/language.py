@@ -0,0 +1,451 @@
+r"""
+Counting, ranking and unranking the examples a pattern can produce.
+
+The example generator bounds every quantifier (see
+:meth:`~rexplain.core.generator.ExampleGenerator.plan`), so the strings it can
+produce for a pattern form a finite language. :class:`Language` determinizes
+the compiled generation plan into an acyclic automaton and counts, for every
+state, the strings that lead from it to acceptance. Counting paths of a
+deterministic automaton counts strings, not ways of producing them, so
+``a*a*`` or ``(a|a)`` are counted once per distinct string.
+
+With the counts, the strings can be numbered in code point order:
+:meth:`Language.unrank` turns a number into its string by choosing, at every
+state, the transition whose block of numbers holds it, and
+:meth:`Language.rank` does the reverse. :meth:`Language.sample` maps
+``0, 1, 2, ...`` through a seeded pseudo-random permutation of the numbers
+before unranking them, which gives distinct examples without remembering
+the ones already drawn.
+
+The same walk counts strings by length: a state's strings of length ``n``
+are the strings of length ``n - 1`` of each target, times the characters
+leading there. Sampling a number below the count for a length range and
+unranking it among those lengths picks every string in the range with the
+same probability, where the generator's per-node choices favour short
+branches and few repetitions.
+"""
+import random
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+from .generator import _CHOICE, _DRAW, _REPEAT, GenerationPlan
+
+# Most automaton states built before giving up
+MAX_LANGUAGE_STATES = 10000
+
+class Language:
+    """
+    The finite set of strings the example generator can produce for a pattern.
+
+    Strings are numbered from 0 in code point order. Built from a
+    :class:`~rexplain.core.generator.GenerationPlan`; instances can be shared
+    between threads.
+    """
+    def __init__(self, plan: GenerationPlan, generator=None, max_states: int = MAX_LANGUAGE_STATES):
+        r"""
+        Determinize and count the plan.
+
+        Args:
+            plan (GenerationPlan): The pattern's generation plan.
+            generator (Optional[ExampleGenerator], optional): The generator that
+                compiled the plan; it compiles alternation options that were
+                never sampled. Defaults to a new generator.
+            max_states (int, optional): Most automaton states to build.
+                Defaults to 10000.
+
+        Raises:
+            ValueError: If the automaton needs more than ``max_states`` states.
+        """
+        if generator is None:
+            from .generator import ExampleGenerator
+            generator = ExampleGenerator()
+        edges, epsilons, start, final = _Thompson(generator).build(plan.root)
+        self._accepting, self._runs = _determinize(edges, epsilons, start, final, max_states)
+        self._order = _post_order(self._runs)
+        self._counts = _count(self._accepting, self._runs, self._order)
+        self._by_length: Optional[List[List[int]]] = None
+        # Start of each run's block of numbers, per state
+        self._offsets = []
+        for state, runs in enumerate(self._runs):
+            offsets = []
+            total = int(self._accepting[state])
+            for chars, target in runs:
+                offsets.append(total)
+                total += len(chars) * self._counts[target]
+            self._offsets.append(offsets)
+
+    @property
+    def size(self) -> int:
+        """Number of distinct strings, as an exact integer."""
+        return self._counts[0]
+
+    @property
+    def length_counts(self) -> Tuple[int, ...]:
+        """Number of distinct strings of each length, indexed by length up to the longest."""
+        return tuple(self._length_table()[0])
+
+    def count(self, length: Union[int, Tuple[int, int], None] = None) -> int:
+        r"""
+        Number of distinct strings with a given length.
+
+        Args:
+            length (Union[int, Tuple[int, int], None], optional): A length, an
+                inclusive ``(min, max)`` range, or None for all strings.
+                Defaults to None.
+
+        Returns:
+            int: The exact count.
+
+        Raises:
+            ValueError: If ``length`` is negative or an empty range.
+        """
+        if length is None:
+            return self.size
+        lo, hi = _length_range(length)
+        return sum(self.length_counts[lo:hi + 1])
+
+    @property
+    def state_count(self) -> int:
+        """Number of states of the counting automaton."""
+        return len(self._runs)
+
+    def rank(self, text: str) -> int:
+        r"""
+        The number of a string in the language.
+
+        Args:
+            text (str): A string of the language.
+
+        Returns:
+            int: How many strings of the language sort before ``text``.
+
+        Raises:
+            ValueError: If the generator cannot produce ``text``.
+        """
+        counts = self._counts
+        state = 0
+        number = 0
+        for char in text:
+            for (chars, target), offset in zip(self._runs[state], self._offsets[state]):
+                index = chars.find(char)
+                if index >= 0:
+                    number += offset + index * counts[target]
+                    state = target
+                    break
+            else:
+                raise ValueError(f"{text!r} is not in the language")
+        if not self._accepting[state]:
+            raise ValueError(f"{text!r} is not in the language")
+        return number
+
+    def unrank(self, number: int) -> str:
+        r"""
+        The string with a given number.
+
+        Args:
+            number (int): From 0 to ``size - 1``.
+
+        Returns:
+            str: The string with ``number`` strings of the language before it.
+
+        Raises:
+            IndexError: If ``number`` is out of range.
+        """
+        if not 0 <= number < self.size:
+            raise IndexError(f"language has {self.size} strings, no string {number}")
+        counts, accepting = self._counts, self._accepting
+        out = []
+        state = 0
+        while True:
+            if accepting[state]:
+                if not number:
+                    return ''.join(out)
+            offsets = self._offsets[state]
+            i = bisect_right(offsets, number) - 1
+            chars, target = self._runs[state][i]
+            index, number = divmod(number - offsets[i], counts[target])
+            out.append(chars[index])
+            state = target
+
+    def sample(self, count: int, rng=None, offset: int = 0,
+               length: Union[int, Tuple[int, int], None] = None) -> List[str]:
+        r"""
+        Distinct strings drawn uniformly from the language.
+
+        The strings are numbers ``offset`` to ``offset + count - 1`` of a
+        pseudo-random permutation of the language keyed from ``rng``, so
+        equally seeded generators can draw consecutive, non-overlapping
+        slices of one sequence.
+
+        Args:
+            count (int): Number of strings.
+            rng (Optional[random.Random], optional): Source of the permutation
+                key. Defaults to the global :mod:`random` module.
+            offset (int, optional): Strings of the permutation to skip.
+                Defaults to 0.
+            length (Union[int, Tuple[int, int], None], optional): Only strings
+                of this length or inclusive ``(min, max)`` length range.
+                Defaults to None.
+
+        Returns:
+            List[str]: ``count`` distinct strings.
+
+        Raises:
+            ValueError: If the language has fewer than ``offset + count``
+                strings of the requested lengths.
+        """
+        size = self.count(length)
+        if offset + count > size:
+            raise ValueError(f"pattern has only {size} distinct examples{_describe(length)}, "
+                             f"{offset + count} requested")
+        permutation = _Permutation(size, random if rng is None else rng)
+        unrank = self.unrank if length is None else self._ranker(length)
+        return [unrank(permutation(i)) for i in range(offset, offset + count)]
+
+    def choices(self, count: int, rng=None, length: Union[int, Tuple[int, int], None] = None) -> List[str]:
+        r"""
+        Strings drawn uniformly and independently from the language.
+
+        Unlike the example generator, which picks among the branches and
+        repetition counts of each node, every string is equally likely, and a
+        length range is sampled in one pass instead of generating and
+        filtering.
+
+        Args:
+            count (int): Number of strings; they may repeat.
+            rng (Optional[random.Random], optional): Source of randomness.
+                Defaults to the global :mod:`random` module.
+            length (Union[int, Tuple[int, int], None], optional): Only strings
+                of this length or inclusive ``(min, max)`` length range.
+                Defaults to None.
+
+        Returns:
+            List[str]: ``count`` strings.
+
+        Raises:
+            ValueError: If no string has a requested length.
+        """
+        size = self.count(length)
+        if not size and count:
+            raise ValueError(f"pattern has no examples{_describe(length)}")
+        randbelow = (random if rng is None else rng).randrange
+        unrank = self.unrank if length is None else self._ranker(length)
+        return [unrank(randbelow(size)) for _ in range(count)]
+
+    def _ranker(self, length: Union[int, Tuple[int, int]]):
+        # Unrank among the strings of a length range, shorter lengths first
+        lo, hi = _length_range(length)
+        table, runs = self._length_table(), self._runs
+        starts = []
+        total = 0
+        for n in range(lo, min(hi, len(table[0]) - 1) + 1):
+            starts.append((total, n))
+            total += table[0][n]
+
+        def unrank(number: int) -> str:
+            total, n = starts[bisect_right(starts, (number, float('inf'))) - 1]
+            number -= total
+            out = []
+            state = 0
+            while n:
+                n -= 1
+                for chars, target in runs[state]:
+                    counts = table[target]
+                    block = len(chars) * counts[n] if n < len(counts) else 0
+                    if number < block:
+                        index, number = divmod(number, counts[n])
+                        out.append(chars[index])
+                        state = target
+                        break
+                    number -= block
+            return ''.join(out)
+        return unrank
+
+    def _length_table(self) -> List[List[int]]:
+        # Per state, the number of strings of each length leading to acceptance
+        if self._by_length is None:
+            table: List[List[int]] = [[] for _ in self._runs]
+            for state in self._order:
+                counts = [int(self._accepting[state])]
+                for chars, target in self._runs[state]:
+                    width = len(chars)
+                    following = table[target]
+                    if len(counts) <= len(following):
+                        counts.extend([0] * (len(following) + 1 - len(counts)))
+                    for n, c in enumerate(following, 1):
+                        counts[n] += width * c
+                table[state] = counts
+            self._by_length = table
+        return self._by_length
+
+    def __contains__(self, text: str) -> bool:
+        try:
+            self.rank(text)
+        except ValueError:
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"Language({self.size} strings, {self.state_count} states)"
+
+class _Thompson:
+    # Epsilon-NFA of a generation plan, built from the end; ``edges[s]`` is
+    # (characters, target) for a state reading one character
+    def __init__(self, generator):
+        self.generator = generator
+        self.edges: List[Optional[Tuple[FrozenSet[str], int]]] = []
+        self.epsilons: List[Tuple[int, ...]] = []
+
+    def build(self, root: tuple):
+        final = self._state()
+        return self.edges, self.epsilons, self._build(root, final), final
+
+    def _state(self, edge=None, epsilons=()) -> int:
+        self.edges.append(edge)
+        self.epsilons.append(epsilons)
+        return len(self.edges) - 1
+
+    def _build(self, node: tuple, out: int) -> int:
+        kind = node[0]
+        if kind == _DRAW:
+            for item in reversed(node[1]):
+                if isinstance(item, tuple):
+                    for char in reversed(item[0]):
+                        out = self._state((frozenset(char), out))
+                else:
+                    out = self._state((frozenset(item), out))
+            return out
+        if kind == _REPEAT:
+            _, child, lo, hi = node
+            state = out
+            for _ in range(hi - lo):
+                state = self._state(epsilons=(self._build(child, state), out))
+            for _ in range(lo):
+                state = self._build(child, state)
+            return state
+        if kind == _CHOICE:
+            options = [self._build(self.generator._option(node, i), out) for i in range(len(node[1]))]
+            return self._state(epsilons=tuple(options))
+        # A sequence, stored in reverse
+        for child in node[1]:
+            out = self._build(child, out)
+        return out
+
+def _determinize(edges, epsilons, start: int, final: int, max_states: int):
+    # Subset construction over classes of characters that every edge treats
+    # alike. Returns, per DFA state, whether it accepts and its transitions as
+    # runs of consecutive characters (in code point order) sharing a target.
+    # State 0 is the start; there is no dead state.
+    signatures: Dict[str, List[int]] = {}
+    for state, edge in enumerate(edges):
+        if edge is not None:
+            for char in edge[0]:
+                signatures.setdefault(char, []).append(state)
+    # State -> classes it reads; a class is the characters with one signature
+    classes: Dict[tuple, List[str]] = {}
+    for char, states in signatures.items():
+        classes.setdefault(tuple(states), []).append(char)
+    reads: Dict[int, List[int]] = {}
+    members = []
+    for index, (states, chars) in enumerate(classes.items()):
+        members.append(chars)
+        for state in states:
+            reads.setdefault(state, []).append(index)
+
+    def closure(seeds) -> FrozenSet[int]:
+        seen = set()
+        stack = list(seeds)
+        while stack:
+            state = stack.pop()
+            if state not in seen:
+                seen.add(state)
+                stack.extend(epsilons[state])
+        return frozenset(seen)
+
+    ids = {closure((start,)): 0}
+    subsets = list(ids)
+    accepting = []
+    runs = []
+    for subset in subsets:  # grows while it is walked
+        moves: Dict[int, set] = {}
+        for state in subset:
+            for index in reads.get(state, ()):
+                moves.setdefault(index, set()).add(edges[state][1])
+        by_char = []
+        for index, targets in moves.items():
+            target = closure(targets)
+            number = ids.get(target)
+            if number is None:
+                if len(subsets) >= max_states:
+                    raise ValueError(f"language needs more than {max_states} states")
+                number = ids[target] = len(subsets)
+                subsets.append(target)
+            by_char.extend((char, number) for char in members[index])
+        by_char.sort()
+        state_runs = []
+        for char, number in by_char:
+            if state_runs and state_runs[-1][1] == number and ord(state_runs[-1][0][-1]) + 1 == ord(char):
+                state_runs[-1][0] += char
+            else:
+                state_runs.append([char, number])
+        accepting.append(final in subset)
+        runs.append([(chars, number) for chars, number in state_runs])
+    return accepting, runs
+
+def _post_order(runs) -> List[int]:
+    # States with every target before its sources; the automaton is acyclic
+    done = [False] * len(runs)
+    order = []
+    stack = [(0, False)]
+    while stack:
+        state, ready = stack.pop()
+        if done[state]:
+            continue
+        if not ready:
+            stack.append((state, True))
+            stack.extend((target, False) for _, target in runs[state] if not done[target])
+            continue
+        done[state] = True
+        order.append(state)
+    return order
+
+def _count(accepting: List[bool], runs, order: List[int]) -> List[int]:
+    # Strings accepted from each state
+    counts = [0] * len(runs)
+    for state in order:
+        counts[state] = int(accepting[state]) + sum(len(chars) * counts[target] for chars, target in runs[state])
+    return counts
+
+def _length_range(length: Union[int, Tuple[int, int]]) -> Tuple[int, int]:
+    lo, hi = (length, length) if isinstance(length, int) else length
+    if lo < 0 or hi < lo:
+        raise ValueError(f"invalid length {length!r}")
+    return lo, hi
+
+def _describe(length) -> str:
+    if length is None:
+        return ''
+    lo, hi = _length_range(length)
+    return f" of length {lo}" if lo == hi else f" of length {lo} to {hi}"
+
+class _Permutation:
+    # Pseudo-random permutation of range(size): a four-round balanced Feistel
+    # network on the smallest even number of bits covering size, walking the
+    # cycle past values of size and above
+    def __init__(self, size: int, rng):
+        bits = max(2, (size - 1).bit_length())
+        half = (bits + 1) // 2
+        self._size = size
+        self._half = half
+        self._mask = (1 << half) - 1
+        self._keys = [(rng.getrandbits(half), rng.getrandbits(2 * half) | 1) for _ in range(4)]
+
+    def __call__(self, value: int) -> int:
+        half, mask, keys = self._half, self._mask, self._keys
+        while True:
+            left, right = value >> half, value & mask
+            for key, multiplier in keys:
+                left, right = right, left ^ ((right ^ key) * multiplier >> half & mask)
+            value = left << half | right
+            if value < self._size:
+                return value
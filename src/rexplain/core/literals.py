@@ -0,0 +1,291 @@
+r"""
+Literals every match of a pattern must contain, used to reject strings early.
+
+Most real patterns have mandatory literal text: ``^\d+ ERROR .*timeout`` only
+matches strings that contain ``' ERROR '`` and ``'timeout'``. :func:`required_literals`
+finds the literal prefix, the literal suffix and the other substrings every
+full match must have, and :func:`literal_matcher` turns them into a predicate
+that rules most non-matching strings out with ``str.startswith``,
+``str.endswith`` and ``in`` before ``re`` is called. :func:`literal_candidates`
+does the same for a whole list of strings, one check at a time, so only the
+survivors reach ``re``. A pattern that is nothing but a literal is answered by
+string equality alone.
+
+The analysis runs on the tree from the stdlib backend, which sees the pattern
+exactly as ``re`` does. Literals under ``re.IGNORECASE`` are not extracted.
+"""
+import os
+import re
+from typing import Callable, Collection, List, NamedTuple, Optional, Tuple
+
+from .parser import (
+    RegexAST, Sequence, Literal, LiteralRun, Group, Quantifier, Anchor, Escape, Alternation,
+)
+
+# Longest literal kept from a counted repetition such as a{1000}
+MAX_LITERAL = 256
+
+_CONTROL_CHARS = {r'\n': '\n', r'\t': '\t', r'\r': '\r'}
+_ZERO_WIDTH_ESCAPES = frozenset({r'\b', r'\B', r'\A', r'\Z'})
+_TRANSPARENT_GROUPS = frozenset({'GROUP_OPEN', 'GROUP_NONCAP', 'GROUP_NAMED', 'GROUP_ATOMIC'})
+_ZERO_WIDTH_GROUPS = frozenset({
+    'GROUP_LOOKAHEAD', 'GROUP_NEG_LOOKAHEAD', 'GROUP_LOOKBEHIND', 'GROUP_NEG_LOOKBEHIND',
+})
+
+class RequiredLiterals(NamedTuple):
+    """
+    Literal text every full match of a pattern contains.
+
+    Attributes:
+        literal (Optional[str]): The one string the pattern matches, if the
+            pattern is nothing but literal characters; None otherwise.
+        prefix (str): Text every match starts with.
+        suffix (str): Text every match ends with.
+        infixes (Tuple[str, ...]): Other text every match contains, longest first.
+    """
+    literal: Optional[str]
+    prefix: str
+    suffix: str
+    infixes: Tuple[str, ...]
+
+    def rejects(self, text: str) -> bool:
+        r"""
+        Whether ``text`` certainly does not fully match the pattern.
+
+        Args:
+            text (str): The string to check.
+
+        Returns:
+            bool: True if a required literal is missing. False means the string
+            may match and ``re`` has to decide.
+        """
+        if self.literal is not None:
+            return text != self.literal
+        if not text.startswith(self.prefix) or not text.endswith(self.suffix):
+            return True
+        return any(infix not in text for infix in self.infixes)
+
+# Nothing is required
+NO_LITERALS = RequiredLiterals(None, '', '', ())
+
+class _Info(NamedTuple):
+    # What is known about the strings one node matches: the single string it
+    # always matches (exact), or a prefix, a suffix and inner literals.
+    exact: Optional[str]
+    prefix: str
+    suffix: str
+    infixes: frozenset
+
+_UNKNOWN = _Info(None, '', '', frozenset())
+_EMPTY = _Info('', '', '', frozenset())
+
+def _exact(text: str) -> _Info:
+    if len(text) > MAX_LITERAL:
+        return _Info(None, text[:MAX_LITERAL], text[-MAX_LITERAL:], frozenset())
+    return _Info(text, text, text, frozenset((text,)) if text else frozenset())
+
+def required_literals(ast: RegexAST, flags: int = 0) -> RequiredLiterals:
+    r"""
+    Find the literal text every full match of a pattern must contain.
+
+    Args:
+        ast (RegexAST): Root node from the stdlib backend
+            (``RegexParser().parse(pattern, flags, backend='stdlib')``).
+        flags (int, optional): The pattern's effective flags, including inline
+            ones (``re.compile(pattern, flags).flags``). Defaults to 0.
+
+    Returns:
+        RequiredLiterals: The literal, prefix, suffix and infixes; empty under
+        ``re.IGNORECASE``.
+    """
+    if flags & re.IGNORECASE:
+        return NO_LITERALS
+    info = _summarize(ast)
+    literal = info.exact if _is_literal(ast) else None
+    if info.exact is not None:
+        return RequiredLiterals(literal, info.exact, info.exact, ())
+    infixes = [i for i in info.infixes if i not in info.prefix and i not in info.suffix]
+    # Longest first; a literal inside a longer one adds nothing
+    infixes.sort(key=lambda i: (-len(i), i))
+    kept: List[str] = []
+    for infix in infixes:
+        if not any(infix in longer for longer in kept):
+            kept.append(infix)
+    return RequiredLiterals(None, info.prefix, info.suffix, tuple(kept))
+
+def literal_matcher(literals: RequiredLiterals, fullmatch: Callable) -> Callable[[str], bool]:
+    r"""
+    Build a predicate telling whether a string fully matches, checking required literals first.
+
+    Args:
+        literals (RequiredLiterals): The pattern's required literals.
+        fullmatch (Callable): Tells whether a string fully matches, with a
+            truthy result: the compiled pattern's ``fullmatch`` method or
+            :meth:`DFA.fullmatch <rexplain.core.dfa.DFA.fullmatch>`.
+
+    Returns:
+        Callable[[str], bool]: ``text -> bool``. Pure literal patterns never call
+        ``fullmatch``.
+    """
+    if literals.literal is not None:
+        literal = literals.literal
+        return lambda text: text == literal
+    prefix, suffix, infixes = literals.prefix, literals.suffix, literals.infixes
+    if not (prefix or suffix or infixes):
+        return lambda text: bool(fullmatch(text))
+
+    def matches(text: str) -> bool:
+        if (prefix and not text.startswith(prefix)) or (suffix and not text.endswith(suffix)):
+            return False
+        for infix in infixes:
+            if infix not in text:
+                return False
+        return bool(fullmatch(text))
+    return matches
+
+def literal_candidates(literals: RequiredLiterals, strings: List[str]) -> Collection[int]:
+    r"""
+    Rows of the strings that contain every required literal.
+
+    Each literal is checked over the surviving rows in one pass, which costs far
+    less per string than a call to ``fullmatch``.
+
+    Args:
+        literals (RequiredLiterals): The pattern's required literals.
+        strings (List[str]): The strings to check.
+
+    Returns:
+        Collection[int]: Indexes into ``strings``, in order. For a pure literal
+        pattern these rows match; otherwise ``re`` still has to decide.
+    """
+    rows: Collection[int] = range(len(strings))
+    if literals.literal is not None:
+        literal = literals.literal
+        return [row for row in rows if strings[row] == literal]
+    if literals.prefix:
+        prefix = literals.prefix
+        rows = [row for row in rows if strings[row].startswith(prefix)]
+    if literals.suffix:
+        suffix = literals.suffix
+        rows = [row for row in rows if strings[row].endswith(suffix)]
+    for infix in literals.infixes:
+        rows = [row for row in rows if infix in strings[row]]
+    return rows
+
+def _is_literal(ast: RegexAST) -> bool:
+    # The pattern consists of literal characters only
+    nodes = ast.elements if isinstance(ast, Sequence) else (ast,)
+    return all(isinstance(n, (Literal, LiteralRun)) or (isinstance(n, Escape) and n.value in _CONTROL_CHARS)
+               for n in nodes)
+
+def _summarize(ast: RegexAST) -> _Info:
+    # Post-order over the tree without recursion; results keyed by id() since
+    # leaves are shared between positions
+    results = {}
+    stack = [(ast, False)]
+    while stack:
+        node, ready = stack.pop()
+        if ready:
+            results[id(node)] = _combine(node, [results[id(c)] for c in _children(node)])
+            continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in _children(node) if id(child) not in results)
+    return results[id(ast)]
+
+def _children(node: RegexAST) -> Tuple[RegexAST, ...]:
+    if isinstance(node, Sequence):
+        return node.elements
+    if isinstance(node, Alternation):
+        return tuple(node.options)
+    if isinstance(node, Quantifier):
+        return (node.child,)
+    if isinstance(node, Group):
+        return tuple(node.children)
+    return ()
+
+def _combine(node: RegexAST, kids: List[_Info]) -> _Info:
+    if isinstance(node, (Literal, LiteralRun)):
+        return _exact(node.value)
+    if isinstance(node, Escape):
+        if node.value in _CONTROL_CHARS:
+            return _exact(_CONTROL_CHARS[node.value])
+        return _EMPTY if node.value in _ZERO_WIDTH_ESCAPES else _UNKNOWN
+    if isinstance(node, Anchor):
+        return _EMPTY
+    if isinstance(node, Group):
+        if node.group_type in _ZERO_WIDTH_GROUPS:
+            return _EMPTY
+        if node.group_type == 'GROUP_FLAGS' and 'i' in (node.flags or '').split('-')[0]:
+            return _UNKNOWN  # (?i:...) matches other cases
+        if node.group_type in _TRANSPARENT_GROUPS or node.group_type == 'GROUP_FLAGS':
+            return kids[0] if kids else _EMPTY
+        return _UNKNOWN  # conditional groups
+    if isinstance(node, Quantifier):
+        child = kids[0]
+        if node.max == 0:
+            return _EMPTY
+        if node.min == 0:
+            return _UNKNOWN
+        if child.exact is not None:
+            # The first min repetitions are fixed; enough of them for the kept ends
+            repeated = child.exact * min(node.min, MAX_LITERAL // max(len(child.exact), 1) + 1)
+            if node.min == node.max and len(repeated) <= MAX_LITERAL:
+                return _exact(repeated)
+            info = _Info(None, repeated[:MAX_LITERAL], repeated[-MAX_LITERAL:], frozenset())
+            return info._replace(infixes=_literals_of(info))
+        return _Info(None, child.prefix, child.suffix, child.infixes | _literals_of(child))
+    if isinstance(node, Sequence):
+        return _sequence(kids)
+    if isinstance(node, Alternation):
+        return _alternation(kids)
+    return _UNKNOWN  # any character or a character class
+
+def _literals_of(info: _Info) -> frozenset:
+    return frozenset(text for text in (info.prefix, info.suffix) if text)
+
+def _sequence(kids: List[_Info]) -> _Info:
+    if all(k.exact is not None for k in kids):
+        return _exact(''.join(k.exact for k in kids))
+    prefix = ''
+    for k in kids:
+        if k.exact is None:
+            prefix += k.prefix
+            break
+        prefix += k.exact
+    suffix = ''
+    for k in reversed(kids):
+        if k.exact is None:
+            suffix = k.suffix + suffix
+            break
+        suffix = k.exact + suffix
+    # Literals spanning several children: a run of exact children, joined to the
+    # suffix before it and the prefix after it
+    infixes = set()
+    run = ''
+    for k in kids:
+        if k.exact is not None:
+            run += k.exact
+            continue
+        run += k.prefix
+        if run:
+            infixes.add(run[-MAX_LITERAL:])
+        infixes |= k.infixes
+        run = k.suffix
+    if run:
+        infixes.add(run[:MAX_LITERAL])
+    return _Info(None, prefix[:MAX_LITERAL], suffix[-MAX_LITERAL:], frozenset(infixes))
+
+def _alternation(kids: List[_Info]) -> _Info:
+    if not kids:
+        return _EMPTY
+    exacts = {k.exact for k in kids}
+    if len(exacts) == 1 and None not in exacts:
+        return kids[0]
+    prefix = os.path.commonprefix([k.prefix for k in kids])
+    suffix = os.path.commonprefix([k.suffix[::-1] for k in kids])[::-1]
+    # Literals every option contains
+    common = None
+    for k in kids:
+        options = k.infixes | _literals_of(k)
+        common = options if common is None else common & options
+    return _Info(None, prefix, suffix, common | {text for text in (prefix, suffix) if text})
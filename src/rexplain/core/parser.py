@@ -1,382 +1,841 @@
-from typing import List, Optional, Union
-from dataclasses import dataclass, field
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+from dataclasses import dataclass, field, fields, replace
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence as _SequenceABC
+from itertools import accumulate, repeat
+from operator import add, attrgetter
 import re
 
-@dataclass
+def _node(cls):
+    """
+    Turn ``cls`` into a frozen dataclass whose instances use ``__slots__``.
+
+    ``dataclass(slots=True)`` needs Python 3.10, so the slotted class is rebuilt
+    here the same way the standard library does it.
+    """
+    cls = dataclass(frozen=True)(cls)
+    inherited = set()
+    for base in cls.__mro__[1:]:
+        inherited.update(getattr(base, '__slots__', ()))
+    own = tuple(f.name for f in fields(cls) if f.name not in inherited)
+    namespace = dict(cls.__dict__)
+    for name in own:
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    namespace['__slots__'] = own
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+def _freeze(node: 'RegexAST', name: str) -> None:
+    # Store list arguments (e.g. from hand-built trees) as tuples so nodes stay hashable
+    value = getattr(node, name)
+    if type(value) is not tuple:
+        object.__setattr__(node, name, tuple(value))
+
+def _init_width(node: 'RegexAST') -> None:
+    # Nodes built by hand get the width of their canonical source text
+    if node.width is None:
+        object.__setattr__(node, 'width', node._source_width())
+
+def _width_field():
+    # Source width in characters. Not part of equality, hashing or repr, so trees
+    # from different sources (or built by hand) still compare equal.
+    return field(default=None, compare=False, repr=False)
+
+@_node
 class RegexAST:
     """
     Base class for all AST nodes representing regex components.
+
+    Nodes are immutable and hashable, so parsed trees can be shared between
+    callers and used as dictionary or cache keys.
+
+    Every node records the ``width`` of the source text it was parsed from, but
+    not its absolute position: a subtree can then be reused unchanged wherever
+    it ends up after an edit (see :meth:`RegexParser.reparse`). Use
+    :func:`iter_spans` to get the start/end offset of every node.
     """
-    pass
+    def __post_init__(self):
+        _init_width(self)
 
-@dataclass
+    def _source_width(self) -> int:
+        return len(self.value)
+
+    def __getstate__(self):
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def __setstate__(self, state):
+        for f, value in zip(fields(self), state):
+            object.__setattr__(self, f.name, value)
+
+@_node
 class Sequence(RegexAST):
     """
     Represents a sequence of regex elements (e.g., abcd).
     """
-    elements: List[RegexAST]
+    elements: Tuple[RegexAST, ...]
+    width: Optional[int] = _width_field()
 
-@dataclass
+    def __post_init__(self):
+        _freeze(self, 'elements')
+        _init_width(self)
+
+    def _source_width(self) -> int:
+        return sum(e.width for e in self.elements)
+
+@_node
 class Literal(RegexAST):
     """
     Represents a literal character in the regex.
     """
     value: str
+    width: Optional[int] = _width_field()
 
-@dataclass
+@_node
+class LiteralRun(RegexAST):
+    """
+    Represents a run of two or more adjacent, unquantified literal characters,
+    e.g. ``GET /api/``. Only produced when the parser coalesces literals.
+    """
+    value: str
+    width: Optional[int] = _width_field()
+
+@_node
+class AnyChar(RegexAST):
+    """
+    Represents the wildcard ``.``, which matches any character except a newline
+    (or any character at all under re.DOTALL).
+    """
+    value: str = '.'
+    width: Optional[int] = _width_field()
+
+@_node
 class CharClass(RegexAST):
     """
     Represents a character class, e.g., [a-z] or [^abc].
     """
     value: str  # The raw class string, e.g., '[a-z]'
+    width: Optional[int] = _width_field()
 
-@dataclass
+@_node
 class Group(RegexAST):
     """
     Represents a group (capturing, non-capturing, named, lookahead, etc.).
     """
     group_type: str  # 'capturing', 'noncap', 'named', 'lookahead', etc.
-    children: List[RegexAST]
+    children: Tuple[RegexAST, ...]
     name: Optional[str] = None  # For named groups
     flags: Optional[str] = None  # For inline/scoped flags
     condition: Optional[str] = None  # For conditional expressions
+    width: Optional[int] = _width_field()
 
-@dataclass
+    def __post_init__(self):
+        _freeze(self, 'children')
+        _init_width(self)
+
+    def _source_width(self) -> int:
+        body = sum(c.width for c in self.children)
+        if self.group_type == 'GROUP_FLAGS':
+            # (?i) when there is no body, (?i:...) otherwise
+            return len(self.flags or '') + 3 + body + (1 if self.children else 0)
+        if self.group_type == 'GROUP_NAMED':
+            return len(self.name or '') + 5 + body + 1
+        return len(_GROUP_OPENERS.get(self.group_type, '(')) + body + 1
+
+@_node
 class Quantifier(RegexAST):
     """
     Represents a quantifier applied to a subpattern, e.g., a*, b{2,3}.
+
+    The repetition bounds are parsed once, when the node is built: ``max`` is
+    None for unbounded quantifiers and ``greedy`` is False for lazy ones (``*?``).
     """
     child: RegexAST
     quant: str  # '*', '+', '?', '{n}', '{n,m}', etc.
+    min: Optional[int] = None
+    max: Optional[int] = None
+    greedy: Optional[bool] = None
+    width: Optional[int] = _width_field()
 
-@dataclass
+    def __post_init__(self):
+        if self.min is None or self.greedy is None:
+            lo, hi, greedy = parse_quantifier(self.quant)
+            object.__setattr__(self, 'min', lo)
+            object.__setattr__(self, 'max', hi)
+            object.__setattr__(self, 'greedy', greedy)
+        _init_width(self)
+
+    def _source_width(self) -> int:
+        return self.child.width + len(self.quant)
+
+@_node
 class Anchor(RegexAST):
     r"""
     Represents anchors like ^, $, \b, etc.
     """
     value: str
+    width: Optional[int] = _width_field()
 
-@dataclass
+@_node
 class Escape(RegexAST):
     r"""
     Represents escape sequences like \d, \w, etc.
     """
     value: str
+    width: Optional[int] = _width_field()
 
-@dataclass
+@_node
 class Alternation(RegexAST):
     """
     Represents alternation, e.g., a|b|c.
+
+    ``options`` is a tuple, or a LazyOptions sequence when the parser was asked
+    to parse the branches of a top-level alternation on demand.
+    """
+    options: Tuple[RegexAST, ...]
+    width: Optional[int] = _width_field()
+
+    def __post_init__(self):
+        if not isinstance(self.options, LazyOptions):
+            _freeze(self, 'options')
+        _init_width(self)
+
+    def _source_width(self) -> int:
+        if isinstance(self.options, LazyOptions):
+            return self.options.bounds[-1][1] - self.options.bounds[0][0]
+        return sum(o.width for o in self.options) + max(len(self.options) - 1, 0)
+
+# Opening text of each group type whose opener does not depend on a name or flags.
+_GROUP_OPENERS = {
+    'GROUP_OPEN': '(', 'GROUP_NONCAP': '(?:', 'GROUP_LOOKAHEAD': '(?=',
+    'GROUP_NEG_LOOKAHEAD': '(?!', 'GROUP_LOOKBEHIND': '(?<=', 'GROUP_NEG_LOOKBEHIND': '(?<!',
+    'GROUP_ATOMIC': '(?>',
+}
+
+class LazyOptions(_SequenceABC):
+    """
+    Branches of a top-level alternation, each parsed the first time it is accessed.
+
+    Only the branch boundaries are known up front. Indexing parses (and keeps) a
+    single branch, while iterating, comparing or hashing parses all of them. A
+    syntax error inside a branch is raised when that branch is first accessed.
+    """
+    __slots__ = ('pattern', 'bounds', 'flags', 'coalesce_literals', '_nodes')
+
+    def __init__(self, pattern: str, bounds: List[Tuple[int, int]], flags: int = 0, coalesce_literals: bool = False):
+        self.pattern = pattern
+        self.bounds = bounds
+        self.flags = flags
+        self.coalesce_literals = coalesce_literals
+        self._nodes = [None] * len(bounds)
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        node = self._nodes[index]
+        if node is None:
+            start, end = self.bounds[index]
+            # Concurrent first accesses may both parse the branch; the results are equal
+            node = RegexParser().parse(self.pattern[start:end], self.flags, coalesce_literals=self.coalesce_literals)
+            self._nodes[index] = node
+        return node
+
+    @property
+    def parsed_count(self) -> int:
+        """Number of branches parsed so far."""
+        return sum(node is not None for node in self._nodes)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (LazyOptions, tuple, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return f"LazyOptions({len(self)} branches, {self.parsed_count} parsed)"
+
+_BRACES = re.compile(r'\{(\d*)(,?)(\d*)\}')
+
+def parse_quantifier(quant: str) -> Tuple[int, Optional[int], bool]:
+    r"""
+    Parse a quantifier string into its repetition bounds.
+
+    Args:
+        quant (str): The quantifier, e.g. '*', '+?', '{2}', '{2,}' or '{2,5}'.
+
+    Returns:
+        Tuple[int, Optional[int], bool]: ``(min, max, greedy)``; ``max`` is None
+        when the repetition is unbounded. Malformed braces count as ``{1}``.
+    """
+    greedy = True
+    if len(quant) > 1 and quant.endswith('?'):
+        greedy = False
+        quant = quant[:-1]
+    if quant == '*':
+        return 0, None, greedy
+    elif quant == '+':
+        return 1, None, greedy
+    elif quant == '?':
+        return 0, 1, greedy
+    m = _BRACES.fullmatch(quant)
+    if m is None or not (m.group(1) or m.group(3)):
+        return 1, 1, greedy
+    lo = int(m.group(1)) if m.group(1) else 0
+    if not m.group(2):
+        return lo, lo, greedy
+    return lo, (int(m.group(3)) if m.group(3) else None), greedy
+
+def _merge_run(run: List[RegexAST]) -> RegexAST:
+    if len(run) == 1:
+        return run[0]
+    return LiteralRun(''.join(node.value for node in run), sum(node.width for node in run))
+
+def _coalesce_literals(elements: List[RegexAST]) -> List[RegexAST]:
+    # Merge each run of adjacent Literal elements into one LiteralRun
+    merged = []
+    run = []
+    for node in elements:
+        if type(node) is Literal:
+            run.append(node)
+            continue
+        if run:
+            merged.append(_merge_run(run))
+            run = []
+        merged.append(node)
+    if run:
+        merged.append(_merge_run(run))
+    return merged
+
+# Interned leaf nodes, shared by every parse. Bounded so that arbitrary user
+# patterns cannot grow it without limit.
+_INTERN_LIMIT = 1 << 16
+_interned = {}
+
+def _leaf(cls, value: str, width: Optional[int] = None) -> RegexAST:
+    key = (cls, value, width)
+    node = _interned.get(key)
+    if node is None:
+        node = cls(value, width)
+        if len(_interned) < _INTERN_LIMIT:
+            node = _interned.setdefault(key, node)
+    return node
+
+@dataclass
+class RegexToken:
+    """
+    Represents a single regex component (token) in the pattern.
+
+    ``start`` and ``end`` are the token's offsets in the pattern (end exclusive);
+    they are ignored when tokens are compared.
+    """
+    type: str
+    value: str
+    start: Optional[int] = field(default=None, compare=False, repr=False)
+    end: Optional[int] = field(default=None, compare=False, repr=False)
+
+# Token kind codes stored in a TokenStream. LITERAL must stay 0 so that a run of
+# literal characters can be appended as zero bytes.
+(TOK_LITERAL, TOK_SPECIAL, TOK_QUANTIFIER, TOK_ESCAPE, TOK_CHAR_CLASS,
+ TOK_GROUP_OPEN, TOK_GROUP_CLOSE, TOK_GROUP_NONCAP, TOK_GROUP_NAMED,
+ TOK_GROUP_LOOKAHEAD, TOK_GROUP_NEG_LOOKAHEAD, TOK_GROUP_LOOKBEHIND,
+ TOK_GROUP_NEG_LOOKBEHIND, TOK_GROUP_FLAGS) = range(14)
+
+# Token type names, indexed by kind code.
+TOKEN_TYPES = (
+    'LITERAL', 'SPECIAL', 'QUANTIFIER', 'ESCAPE', 'CHAR_CLASS',
+    'GROUP_OPEN', 'GROUP_CLOSE', 'GROUP_NONCAP', 'GROUP_NAMED',
+    'GROUP_LOOKAHEAD', 'GROUP_NEG_LOOKAHEAD', 'GROUP_LOOKBEHIND',
+    'GROUP_NEG_LOOKBEHIND', 'GROUP_FLAGS',
+)
+
+# Master scanner: one alternative per token kind, tried in priority order. Every
+# character of a pattern is covered by some alternative, so consecutive matches
+# tile the whole pattern. The last two alternatives only fire on syntax errors.
+_SCANNER = re.compile(r"""
+    (?P<LITERAL>[^\\\[\](){}.*+?|^$]+)
+  | (?P<CHAR_CLASS>\[(?:\\.|[^\]\\])*\])
+  | (?P<GROUP_NONCAP>\(\?:)
+  | (?P<GROUP_NAMED>\(\?P<[^>]*>)
+  | (?P<GROUP_LOOKAHEAD>\(\?=)
+  | (?P<GROUP_NEG_LOOKAHEAD>\(\?!)
+  | (?P<GROUP_LOOKBEHIND>\(\?<=)
+  | (?P<GROUP_NEG_LOOKBEHIND>\(\?<!)
+  | (?P<GROUP_FLAGS>\(\?[imsxauL]*[:)])
+  | (?P<GROUP_OPEN>\()
+  | (?P<GROUP_CLOSE>\))
+  | (?P<QUANTIFIER>\{[^}]*\}|[*+?])
+  | (?P<ESCAPE>\\(?:u.{4}|x.{2}|N\{[^}]*\}|.)?)
+  | (?P<SPECIAL>[.|^$\]}])
+  | (?P<UNCLOSED_CLASS>\[)
+  | (?P<UNCLOSED_BRACES>\{)
+""", re.VERBOSE | re.DOTALL)
+
+_UNCLOSED_CLASS = -1
+_UNCLOSED_BRACES = -2
+# Kind code for each scanner group, indexed by ``match.lastindex``.
+_GROUP_KINDS = (None,) + tuple(
+    TOKEN_TYPES.index(name) if name in TOKEN_TYPES else
+    (_UNCLOSED_CLASS if name == 'UNCLOSED_CLASS' else _UNCLOSED_BRACES)
+    for name in sorted(_SCANNER.groupindex, key=_SCANNER.groupindex.get)
+)
+
+_METACHARS = frozenset('.*+?|()[]{}^$\\')
+_ANCHORS = frozenset('^$')
+_GROUP_KINDS_WITH_BODY = frozenset({
+    TOK_GROUP_LOOKAHEAD, TOK_GROUP_NEG_LOOKAHEAD, TOK_GROUP_LOOKBEHIND,
+    TOK_GROUP_NEG_LOOKBEHIND, TOK_GROUP_NONCAP, TOK_GROUP_FLAGS, TOK_GROUP_NAMED,
+})
+
+# Only the characters that decide where a top-level '|' is: escapes and classes
+# are skipped whole, parentheses change the depth.
+_BRANCH_SCANNER = re.compile(r'\\.|\[(?:\\.|[^\]\\])*\]|[()|]', re.DOTALL)
+
+def _top_level_branches(pattern: str) -> Optional[List[Tuple[int, int]]]:
+    # (start, end) offsets of the top-level alternatives, found in one scan.
+    # Returns None when parentheses are unbalanced; the full parser then decides.
+    bounds = []
+    depth = 0
+    start = 0
+    for m in _BRANCH_SCANNER.finditer(pattern):
+        c = m.group()
+        if c == '|':
+            if depth == 0:
+                bounds.append((start, m.start()))
+                start = m.end()
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if depth < 0:
+                return None
+    if depth:
+        return None
+    bounds.append((start, len(pattern)))
+    return bounds
+
+class TokenStream(_SequenceABC):
     """
-    options: List[RegexAST]
+    Compact token stream produced by :meth:`RegexParser.tokenize`.
+
+    Tokens are stored as parallel arrays of kind codes and start/end offsets into
+    the pattern. Indexing or iterating creates :class:`RegexToken` objects on
+    demand; the parser reads the arrays directly.
+
+    Attributes:
+        pattern (str): The tokenized pattern.
+        kinds (array): Token kind codes (see ``TOKEN_TYPES``).
+        starts (array): Start offset of each token in ``pattern``.
+        ends (array): End offset (exclusive) of each token in ``pattern``.
+    """
+    __slots__ = ('pattern', 'kinds', 'starts', 'ends')
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.kinds = array('B')
+        self.starts = array('l')
+        self.ends = array('l')
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start = self.starts[index]
+        end = self.ends[index]
+        return RegexToken(TOKEN_TYPES[self.kinds[index]], self.pattern[start:end], start, end)
+
+    def __iter__(self) -> Iterator[RegexToken]:
+        pattern = self.pattern
+        for kind, start, end in zip(self.kinds, self.starts, self.ends):
+            yield RegexToken(TOKEN_TYPES[kind], pattern[start:end], start, end)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TokenStream):
+            return (self.kinds == other.kinds and self.starts == other.starts
+                    and self.ends == other.ends and self.pattern == other.pattern)
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TokenStream({list(self)!r})"
+
+def _scan_tokens(tokens: TokenStream, start: int, end: int) -> int:
+    # Append the tokens that start in tokens.pattern[start:end] to ``tokens``.
+    # Scanning happens in the context of the whole pattern, so the result is
+    # exactly the tokens a full tokenize() produces for that range. Returns the
+    # end of the last token, which is past ``end`` if a token runs across it.
+    pattern = tokens.pattern
+    kinds = tokens.kinds
+    starts = tokens.starts
+    ends = tokens.ends
+    group_kinds = _GROUP_KINDS
+    last = start
+    for m in _SCANNER.finditer(pattern, start):
+        token_start, last = m.span()
+        if token_start >= end:
+            return token_start
+        kind = group_kinds[m.lastindex]
+        if kind == TOK_LITERAL:
+            kinds.frombytes(bytes(last - token_start))
+            starts.extend(range(token_start, last))
+            ends.extend(range(token_start + 1, last + 1))
+        elif kind >= 0:
+            kinds.append(kind)
+            starts.append(token_start)
+            ends.append(last)
+        elif kind == _UNCLOSED_CLASS:
+            raise ValueError('Unclosed character class: missing ]')
+        else:
+            raise ValueError('Unclosed quantifier braces: missing }')
+    return last
+
+_WIDTH = attrgetter('width')
+
+def _child_spans(node: RegexAST, start: int) -> List[Tuple[RegexAST, int]]:
+    # Direct children of ``node`` with their start offsets, given the node's start
+    if isinstance(node, Quantifier):
+        return [(node.child, start)]
+    if isinstance(node, Sequence):
+        children = node.elements
+        gap = 0
+    elif isinstance(node, Alternation):
+        if isinstance(node.options, LazyOptions):
+            return [(option, start + bounds[0]) for option, bounds in zip(node.options, node.options.bounds)]
+        children = node.options
+        gap = 1  # the '|' between alternatives
+    elif isinstance(node, Group) and node.children:
+        children = node.children
+        gap = 0
+        # The body ends right before the closing ')'
+        start += node.width - 1 - sum(child.width for child in children)
+    else:
+        return []
+    # Running sum of the widths (plus separators), computed at C speed
+    return list(zip(children, accumulate(map(add, map(_WIDTH, children), repeat(gap)), initial=start)))
+
+def _child_containing(node: RegexAST, start: int, lo: int, hi: int) -> Optional[Tuple[int, RegexAST, int]]:
+    # (index, child, child start) of a direct child of ``node`` whose span
+    # contains lo:hi, or None. Only the child offsets are computed, not spans.
+    if isinstance(node, (Sequence, Alternation)):
+        # Many children: bisect the running offsets for the last child starting at or before lo
+        children = node.elements if isinstance(node, Sequence) else node.options
+        gap = 0 if isinstance(node, Sequence) else 1
+        offsets = list(accumulate(map(add, map(_WIDTH, children), repeat(gap)), initial=start))
+        index = bisect_right(offsets, lo, 0, len(children)) - 1
+        candidates = [(index, children[index], offsets[index])] if index >= 0 else []
+    else:
+        candidates = [(i, child, child_start) for i, (child, child_start) in enumerate(_child_spans(node, start))]
+    for index, child, child_start in candidates:
+        if child_start <= lo and hi <= child_start + child.width:
+            return index, child, child_start
+    return None
+
+def iter_spans(ast: RegexAST, start: int = 0) -> Iterator[Tuple[RegexAST, int, int]]:
+    r"""
+    Walk a parsed AST in pre-order, yielding every node with its source span.
+
+    Leaf nodes are shared between trees and positions, so spans are computed
+    from the node widths during the walk rather than stored on the nodes.
+
+    Args:
+        ast (RegexAST): Root node, as returned by :meth:`RegexParser.parse`.
+        start (int, optional): Offset of the root in the pattern. Defaults to 0.
+
+    Yields:
+        Tuple[RegexAST, int, int]: ``(node, start, end)`` with ``end`` exclusive.
+
+    Example:
+        >>> [(type(n).__name__, s, e) for n, s, e in iter_spans(RegexParser().parse(r'a\d+'))]
+        [('Sequence', 0, 4), ('Literal', 0, 1), ('Quantifier', 1, 4), ('Escape', 1, 3)]
+    """
+    stack = [(ast, start)]
+    while stack:
+        node, pos = stack.pop()
+        yield node, pos, pos + node.width
+        stack.extend(reversed(_child_spans(node, pos)))
+
+class TextEdit(NamedTuple):
+    """
+    A change to a pattern: ``text`` replaces the characters ``start:end`` of the
+    pattern before the edit. Insertions have ``start == end``, deletions an empty
+    ``text``.
+    """
+    start: int
+    end: int
+    text: str
+
+def _group_body(group: Group, start: int) -> Optional[Tuple[int, int]]:
+    # (start, end) of the body of a group spanning from ``start``, or None for
+    # inline flag groups such as (?i), which have no body
+    if group.children:
+        end = start + group.width - 1
+        return end - sum(child.width for child in group.children), end
+    if group.group_type == 'GROUP_FLAGS' and group.width == len(group.flags or '') + 3:
+        return None
+    end = start + group.width - 1
+    return end, end
+
+def _replace_child(node: RegexAST, index: int, child: RegexAST, delta: int) -> RegexAST:
+    # Copy of ``node`` with its index-th child replaced and the width adjusted
+    if isinstance(node, Quantifier):
+        return replace(node, child=child, width=node.width + delta)
+    name = {Sequence: 'elements', Alternation: 'options', Group: 'children'}[type(node)]
+    children = list(getattr(node, name))
+    children[index] = child
+    return replace(node, **{name: tuple(children), 'width': node.width + delta})
+
+class _ParseContext:
+    # State of a single parse call. It lives outside the parser so that one
+    # RegexParser (and the objects holding one) can be shared between threads.
+    __slots__ = ('pattern', 'kinds', 'starts', 'ends', 'pos', 'coalesce_literals')
+
+    def __init__(self, tokens: TokenStream, coalesce_literals: bool):
+        self.pattern = tokens.pattern
+        self.kinds = tokens.kinds
+        self.starts = tokens.starts
+        self.ends = tokens.ends
+        self.pos = 0  # index of the next token to parse
+        self.coalesce_literals = coalesce_literals
 
 class RegexParser:
     """
     Parses a regex string into an abstract syntax tree (AST).
+
+    A parser keeps no state between or during calls, so a single instance can be
+    shared by any number of threads.
     """
-    def parse(self, pattern: str, flags: int = 0) -> RegexAST:
+    def parse(self, pattern: str, flags: int = 0, coalesce_literals: bool = False,
+              lazy_alternation: bool = False, backend: str = 'native') -> RegexAST:
         r"""
         Parse a regex pattern string into an AST.
 
         Args:
             pattern (str): The regex pattern to parse.
             flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+            coalesce_literals (bool, optional): Merge adjacent unquantified literals
+                into a single LiteralRun node. Defaults to False.
+            lazy_alternation (bool, optional): If the pattern is a top-level
+                alternation, only locate its branches and parse each one on first
+                access (see LazyOptions). Defaults to False.
+            backend (str, optional): 'native' for the hand-written tokenizer and
+                parser, or 'stdlib' to convert the parse tree of Python's ``re``
+                module instead (see :mod:`rexplain.core.stdlib_parser`); the
+                stdlib backend honours ``flags`` and ignores ``lazy_alternation``.
+                Defaults to 'native'.
 
         Returns:
             RegexAST: The root node of the parsed regex AST.
         """
-        tokens = self.tokenize(pattern, flags)
-        self._tokens = tokens
-        self._pos = 0
-        ast = self._parse_alternation()
-        return ast
-
-    def _peek(self):
-        if self._pos < len(self._tokens):
-            return self._tokens[self._pos]
-        return None
+        if backend == 'stdlib':
+            from .stdlib_parser import parse_stdlib
+            return parse_stdlib(pattern, flags, coalesce_literals)
+        if backend != 'native':
+            raise ValueError(f"Unknown parser backend: {backend!r}")
+        if lazy_alternation:
+            bounds = _top_level_branches(pattern)
+            if bounds is not None and len(bounds) > 1:
+                return Alternation(LazyOptions(pattern, bounds, flags, coalesce_literals))
+        ctx = _ParseContext(self.tokenize(pattern, flags), coalesce_literals)
+        return self._parse_tokens(ctx)
+
+    def _parse_tokens(self, ctx: '_ParseContext') -> RegexAST:
+        # Iterative parser: every open group pushes the enclosing sequence and
+        # alternation state on an explicit stack, so nesting depth is limited only
+        # by memory, not by Python's recursion limit.
+        pattern = ctx.pattern
+        kinds = ctx.kinds
+        starts = ctx.starts
+        ends = ctx.ends
+        n = len(kinds)
+        pos = ctx.pos
+        stack = []  # (elements, options, group kind, group token text, position after the opener)
+        elements = []  # atoms of the sequence being built
+        options = []  # finished alternatives of the alternation being built
+        quantifiable = False  # whether the last atom can still take a quantifier
+        while pos < n:
+            kind = kinds[pos]
+            value = pattern[starts[pos]:ends[pos]]
+            pos += 1
+            if kind == TOK_QUANTIFIER and quantifiable:
+                # Check for non-greedy quantifier (e.g., *?, +?, ??, {n,m}?)
+                if pos < n and kinds[pos] == TOK_QUANTIFIER and pattern[starts[pos]] == '?':
+                    value += '?'
+                    pos += 1
+                lo, hi, greedy = parse_quantifier(value)
+                elements[-1] = Quantifier(elements[-1], value, lo, hi, greedy)
+                quantifiable = False
+                continue
+            if kind == TOK_LITERAL:
+                node = _leaf(Literal, value)
+            elif kind == TOK_ESCAPE:
+                # Escaped metacharacters as literals
+                if len(value) == 2 and value[1] in _METACHARS:
+                    node = _leaf(Literal, value[1], 2)
+                else:
+                    node = _leaf(Escape, value)
+            elif kind == TOK_CHAR_CLASS:
+                node = _leaf(CharClass, value)
+            elif kind == TOK_SPECIAL:
+                if value == '|':
+                    options.append(self._finish_sequence(ctx, elements))
+                    elements = []
+                    quantifiable = False
+                    continue
+                elif value in _ANCHORS:
+                    node = _leaf(Anchor, value)
+                elif value == '.':
+                    node = _leaf(AnyChar, value)
+                else:
+                    node = _leaf(Literal, value)
+            elif kind == TOK_GROUP_CLOSE:
+                if not stack:
+                    # An unbalanced ')' ends the pattern
+                    pos -= 1
+                    break
+                body = self._finish_alternation(ctx, options, elements)
+                group_elements, group_options, group_kind, group_value, body_start = stack.pop()
+                children = () if pos - 1 == body_start else (body,)
+                width = ends[pos - 1] - starts[body_start - 1]
+                node = self._make_group(group_kind, group_value, children, width)
+                elements = group_elements
+                options = group_options
+            elif kind == TOK_GROUP_FLAGS and value[-1] == ')' and len(value) > 3:
+                # Inline flags group, e.g. (?i), has no body
+                node = Group(TOKEN_TYPES[kind], (), None, flags=value[2:-1], width=len(value))
+            elif kind >= TOK_GROUP_OPEN:
+                stack.append((elements, options, kind, value, pos))
+                elements = []
+                options = []
+                quantifiable = False
+                continue
+            else:
+                # A quantifier with nothing to repeat is kept as a literal
+                node = _leaf(Literal, value)
+            elements.append(node)
+            quantifiable = True
+        if stack:
+            raise ValueError('Unclosed group: missing )')
+        ctx.pos = pos
+        return self._finish_alternation(ctx, options, elements)
+
+    def reparse(self, old_ast: RegexAST, edit: TextEdit, pattern: str, flags: int = 0,
+                coalesce_literals: bool = False) -> RegexAST:
+        r"""
+        Update a parsed AST after an edit, re-parsing only the part it touched.
+
+        Only the body of the smallest group that contains the edit is tokenized
+        and parsed again; every subtree outside it is reused as is. Edits that
+        are not inside any group, or that change the structure around the group
+        (e.g. by adding an unbalanced parenthesis), parse the whole pattern again.
+        The result is always equal to ``parse(pattern, flags, coalesce_literals)``.
 
-    def _advance(self):
-        tok = self._peek()
-        if tok:
-            self._pos += 1
-        return tok
-
-    def _parse_alternation(self):
-        options = [self._parse_sequence()]
-        while self._peek() and self._peek().type == 'SPECIAL' and self._peek().value == '|':
-            self._advance()  # skip '|'
-            options.append(self._parse_sequence())
-        if len(options) == 1:
-            return options[0]
-        return Alternation(options)
-
-    def _parse_sequence(self):
-        elements = []
+        Args:
+            old_ast (RegexAST): The AST of the pattern before the edit.
+            edit (TextEdit): The edit, in offsets of the pattern before the edit.
+            pattern (str): The pattern after the edit.
+            flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+            coalesce_literals (bool, optional): Must match the value the old AST
+                was parsed with. Defaults to False.
+
+        Returns:
+            RegexAST: The root node of the AST of the edited pattern.
+        """
+        if pattern[edit.start:edit.start + len(edit.text)] != edit.text:
+            raise ValueError('Edit text does not match the edited pattern')
+        delta = len(edit.text) - (edit.end - edit.start)
+        if not 0 <= edit.start <= edit.end <= old_ast.width:
+            return self.parse(pattern, flags, coalesce_literals)
+        if isinstance(old_ast, Alternation) and isinstance(old_ast.options, LazyOptions):
+            # Finding the branches again is a single cheap scan
+            return self.parse(pattern, flags, coalesce_literals, lazy_alternation=True)
+        # Descend to the innermost node containing the edit, remembering the path
+        # and the innermost group whose body contains it
+        path = []  # (node, index of the child on the path)
+        target = None  # (path length, group start) of the innermost enclosing group
+        node, start = old_ast, 0
         while True:
-            tok = self._peek()
-            if tok is None or (tok.type == 'SPECIAL' and tok.value == '|') or (tok.type == 'GROUP_CLOSE'):
+            if isinstance(node, Group):
+                body = _group_body(node, start)
+                # After a bare '(' an edit at the body start could turn it into '(?...'
+                if body is not None and body[0] + (node.group_type == 'GROUP_OPEN') <= edit.start \
+                        and edit.end <= body[1]:
+                    target = (len(path), start)
+            found = _child_containing(node, start, edit.start, edit.end)
+            if found is None:
                 break
-            elements.append(self._parse_quantifier())
+            index, child, start = found
+            path.append((node, index))
+            node = child
+        if target is None:
+            return self.parse(pattern, flags, coalesce_literals)
+        depth, group_start = target
+        group = path[depth][0] if depth < len(path) else node
+        body_start, body_end = _group_body(group, group_start)
+        body_end += delta
+        tokens = TokenStream(pattern)
+        try:
+            if _scan_tokens(tokens, body_start, body_end) != body_end:
+                return self.parse(pattern, flags, coalesce_literals)
+            ctx = _ParseContext(tokens, coalesce_literals)
+            body = self._parse_tokens(ctx)
+        except ValueError:
+            # Let the full parse report (or disprove) the error in context
+            return self.parse(pattern, flags, coalesce_literals)
+        if ctx.pos != len(tokens):
+            return self.parse(pattern, flags, coalesce_literals)
+        new = replace(group, children=(body,) if len(tokens) else (), width=group.width + delta)
+        for parent, index in reversed(path[:depth]):
+            new = _replace_child(parent, index, new, delta)
+        return new
+
+    def _finish_sequence(self, ctx: '_ParseContext', elements: List[RegexAST]) -> RegexAST:
+        if ctx.coalesce_literals and len(elements) > 1:
+            elements = _coalesce_literals(elements)
         if len(elements) == 1:
             return elements[0]
-        return Sequence(elements)
-
-    def _parse_quantifier(self):
-        # Always allow quantifiers to apply to any atom, including Anchor
-        atom = self._parse_atom()
-        tok = self._peek()
-        if tok and tok.type == 'QUANTIFIER':
-            quant_tok = self._advance()
-            # Check for non-greedy quantifier (e.g., *?, +?, ??, {n,m}?)
-            next_tok = self._peek()
-            if next_tok and next_tok.type == 'SPECIAL' and next_tok.value == '?':
-                self._advance()
-                quant_str = quant_tok.value + '?'
-            else:
-                quant_str = quant_tok.value
-            return Quantifier(atom, quant_str)
-        return atom
-
-    def _parse_atom(self):
-        tok = self._peek()
-        if tok is None:
-            return None
-        # Escaped metacharacters as literals
-        if tok.type == 'ESCAPE':
-            # If it's an escaped metacharacter, treat as Literal
-            metachars = {'.', '*', '+', '?', '|', '(', ')', '[', ']', '{', '}', '^', '$', '\\'}
-            if len(tok.value) == 2 and tok.value[1] in metachars:
-                self._advance()
-                return Literal(tok.value[1])
-            else:
-                self._advance()
-                return Escape(tok.value)
-        elif tok.type == 'LITERAL':
-            self._advance()
-            return Literal(tok.value)
-        elif tok.type == 'CHAR_CLASS':
-            self._advance()
-            return CharClass(tok.value)
-        elif tok.type == 'SPECIAL' and tok.value in {'^', '$'}:
-            self._advance()
-            return Anchor(tok.value)
-        elif tok.type.startswith('GROUP_'):
-            return self._parse_group()
-        else:
-            self._advance()
-            return Literal(tok.value)
+        return Sequence(tuple(elements))
 
-    def _parse_group(self):
-        tok = self._advance()
-        group_type = tok.type
+    def _finish_alternation(self, ctx: '_ParseContext', options: List[RegexAST], elements: List[RegexAST]) -> RegexAST:
+        last = self._finish_sequence(ctx, elements)
+        if not options:
+            return last
+        options.append(last)
+        return Alternation(tuple(options))
+
+    def _make_group(self, kind: int, value: str, children: Tuple[RegexAST, ...], width: int) -> Group:
         name = None
         flags = None
-        condition = None
-        # Inline flags: (?i), (?m), (?s), or scoped flags (?i:...)
-        if group_type == 'GROUP_FLAGS':
-            # Distinguish between inline and scoped flags
-            import re
-            m = re.match(r'\(\?[a-zA-Z]+([):])', tok.value)
-            if m and m.group(1) == ')':
-                # Inline flags group, e.g., (?i)
-                flags = tok.value[2:-1]  # extract flags between (? and )
-                return Group('GROUP_FLAGS', [], None, flags=flags)
-            elif m and m.group(1) == ':':
-                # Scoped flags group, e.g., (?m:...)
-                flags = tok.value[2:-1]  # extract flags between (? and :
-                group_type = 'GROUP_FLAGS'
-                # Parse group contents until closing paren
-                children = []
-                if self._peek() and self._peek().type == 'GROUP_CLOSE':
-                    self._advance()  # empty group
-                    return Group(group_type, children, name, flags, condition)
-                children.append(self._parse_alternation())
-                if self._peek() and self._peek().type == 'GROUP_CLOSE':
-                    self._advance()
-                else:
-                    raise ValueError('Unclosed group: missing )')
-                return Group(group_type, children, name, flags, condition)
-        if group_type == 'GROUP_NAMED':
-            # Extract group name from value, e.g., (?P<name>
-            import re
-            m = re.match(r'\(\?P<([^>]+)>', tok.value)
-            if m:
-                name = m.group(1)  # FIX: should be group(1), not group(2)
-        # For lookahead/lookbehind/noncap/flags/conditional and other group types, parse contents then expect GROUP_CLOSE
-        children = []
-        if group_type in {'GROUP_LOOKAHEAD', 'GROUP_NEG_LOOKAHEAD', 'GROUP_LOOKBEHIND', 'GROUP_NEG_LOOKBEHIND', 'GROUP_NONCAP', 'GROUP_FLAGS', 'GROUP_CONDITIONAL', 'GROUP_NAMED'}:
-            # Parse group contents until closing paren
-            if self._peek() and self._peek().type == 'GROUP_CLOSE':
-                self._advance()  # empty group
-                return Group(group_type, children, name, flags, condition)
-            children.append(self._parse_alternation())
-            if self._peek() and self._peek().type == 'GROUP_CLOSE':
-                self._advance()
-            else:
-                raise ValueError('Unclosed group: missing )')
-            return Group(group_type, children, name, flags, condition)
-        # For capturing groups, parse alternation (may be nested)
-        if self._peek() and self._peek().type == 'GROUP_CLOSE':
-            self._advance()  # consume ')'
-            return Group(group_type, children, name, flags, condition)
-        while self._peek() and not (self._peek().type == 'GROUP_CLOSE'):
-            children.append(self._parse_alternation())
-        if self._peek() and self._peek().type == 'GROUP_CLOSE':
-            self._advance()  # consume ')'
-        else:
-            raise ValueError('Unclosed group: missing )')
-        return Group(group_type, children, name, flags, condition)
+        if kind == TOK_GROUP_FLAGS:
+            flags = value[2:-1]  # scoped flags, e.g. (?m:...)
+        elif kind == TOK_GROUP_NAMED:
+            name = value[4:-1] or None  # (?P<name>
+        return Group(TOKEN_TYPES[kind], children, name, flags, None, width)
 
-    def tokenize(self, pattern: str, flags: int = 0) -> List['RegexToken']:
+    def tokenize(self, pattern: str, flags: int = 0) -> TokenStream:
         r"""
-        Tokenize a regex pattern string into RegexToken objects, including character classes and groups.
+        Tokenize a regex pattern string, including character classes and groups.
+
+        The pattern is scanned in a single pass with one compiled master scanner.
+        Runs of plain characters are matched at once and stored as one LITERAL
+        token per character.
 
         Args:
             pattern (str): The regex pattern to tokenize.
             flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
 
         Returns:
-            List[RegexToken]: List of tokens representing the regex pattern.
+            TokenStream: Compact stream of tokens; indexing or iterating it yields RegexToken objects.
         """
-        tokens: List[RegexToken] = []
-        i = 0
-        special_chars = {'.', '*', '+', '?', '|', '(', ')', '[', ']', '{', '}', '^', '$'}
-        escape_sequences = {'d', 'w', 's', 'D', 'W', 'S', 'b', 'B', 'A', 'Z', 'G', 'n', 'r', 't', 'v', 'f', '\\', 'u', 'x', 'N'}
-        length = len(pattern)
-        while i < length:
-            c = pattern[i]
-            # Character class
-            if c == '[':
-                start = i
-                i += 1
-                in_escape = False
-                while i < length:
-                    if not in_escape and pattern[i] == ']':
-                        i += 1
-                        break
-                    if pattern[i] == '\\' and not in_escape:
-                        in_escape = True
-                        i += 1
-                    else:
-                        in_escape = False
-                        i += 1
-                if i > length or (i == length and (length == 0 or pattern[i-1] != ']')):
-                    raise ValueError('Unclosed character class: missing ]')
-                tokens.append(RegexToken(type='CHAR_CLASS', value=pattern[start:i]))
-            # Group constructs
-            elif c == '(':
-                if pattern[i:i+3] == '(?:':
-                    tokens.append(RegexToken(type='GROUP_NONCAP', value='(?:'))
-                    i += 3
-                elif pattern[i:i+4] == '(?P<':
-                    # Named group: (?P<name>
-                    start = i
-                    j = i+4
-                    while j < length and pattern[j] != '>':
-                        j += 1
-                    if j < length and pattern[j] == '>':
-                        group_str = pattern[start:j+1]
-                        tokens.append(RegexToken(type='GROUP_NAMED', value=group_str))
-                        i = j+1  # Advance index to after the closing '>'
-                    else:
-                        tokens.append(RegexToken(type='GROUP_OPEN', value='('))
-                        i += 1
-                elif pattern[i:i+3] == '(?=':
-                    tokens.append(RegexToken(type='GROUP_LOOKAHEAD', value='(?='))
-                    i += 3
-                elif pattern[i:i+4] == '(?!':
-                    tokens.append(RegexToken(type='GROUP_NEG_LOOKAHEAD', value='(?!'))
-                    i += 4
-                elif pattern[i:i+4] == '(?<=':
-                    tokens.append(RegexToken(type='GROUP_LOOKBEHIND', value='(?<='))
-                    i += 4
-                elif pattern[i:i+5] == '(?<!':
-                    tokens.append(RegexToken(type='GROUP_NEG_LOOKBEHIND', value='(?<!'))
-                    i += 5
-                # Inline flags or conditional expressions
-                elif pattern[i:i+2] == '(?':
-                    # Could be inline flags, scoped flags, or conditional
-                    j = i+2
-                    flag_str = ''
-                    while j < length and pattern[j] in 'imsxauL':
-                        flag_str += pattern[j]
-                        j += 1
-                    if j < length and pattern[j] == ':':
-                        tokens.append(RegexToken(type='GROUP_FLAGS', value=pattern[i:j+1]))
-                        i = j+1
-                    elif j < length and pattern[j] == ')':
-                        tokens.append(RegexToken(type='GROUP_FLAGS', value=pattern[i:j+1]))
-                        i = j+1
-                    else:
-                        tokens.append(RegexToken(type='GROUP_OPEN', value='('))
-                        i += 1
-                else:
-                    tokens.append(RegexToken(type='GROUP_OPEN', value='('))
-                    i += 1
-            elif c == ')':
-                tokens.append(RegexToken(type='GROUP_CLOSE', value=')'))
-                i += 1
-            # Quantifier braces
-            elif c == '{':
-                start = i
-                i += 1
-                while i < length and pattern[i] != '}':
-                    i += 1
-                if i < length and pattern[i] == '}':
-                    i += 1
-                else:
-                    raise ValueError('Unclosed quantifier braces: missing }')
-                tokens.append(RegexToken(type='QUANTIFIER', value=pattern[start:i]))
-            # Quantifiers *, +, ?
-            elif c in {'*', '+', '?'}:
-                tokens.append(RegexToken(type='QUANTIFIER', value=c))
-                i += 1
-            # Escape sequences (including Unicode/ASCII/Named)
-            elif c == '\\':
-                if i + 1 < length:
-                    next_c = pattern[i+1]
-                    if next_c in escape_sequences:
-                        # Unicode: \uXXXX, ASCII: \xXX, Named: \N{...}
-                        if next_c == 'u' and i+5 < length:
-                            tokens.append(RegexToken(type='ESCAPE', value=pattern[i:i+6]))
-                            i += 6
-                        elif next_c == 'x' and i+3 < length:
-                            tokens.append(RegexToken(type='ESCAPE', value=pattern[i:i+4]))
-                            i += 4
-                        elif next_c == 'N' and i+2 < length and pattern[i+2] == '{':
-                            j = i+3
-                            while j < length and pattern[j] != '}':
-                                j += 1
-                            if j < length and pattern[j] == '}':
-                                tokens.append(RegexToken(type='ESCAPE', value=pattern[i:j+1]))
-                                i = j+1
-                            else:
-                                tokens.append(RegexToken(type='ESCAPE', value=pattern[i:i+2]))
-                                i += 2
-                        else:
-                            tokens.append(RegexToken(type='ESCAPE', value=pattern[i:i+2]))
-                            i += 2
-                    else:
-                        tokens.append(RegexToken(type='ESCAPE', value=pattern[i:i+2]))
-                        i += 2
-                else:
-                    tokens.append(RegexToken(type='ESCAPE', value=c))
-                    i += 1
-            # Specials (other than quantifiers)
-            elif c in special_chars:
-                tokens.append(RegexToken(type='SPECIAL', value=c))
-                i += 1
-            # Literals
-            else:
-                tokens.append(RegexToken(type='LITERAL', value=c))
-                i += 1
+        tokens = TokenStream(pattern)
+        _scan_tokens(tokens, 0, len(pattern))
         return tokens
-
-@dataclass
-class RegexToken:
-    """
-    Represents a single regex component (token) in the pattern.
-    """
-    type: str
-    value: str
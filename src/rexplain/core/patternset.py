@@ -0,0 +1,206 @@
+r"""
+Matching one string against thousands of patterns at once.
+
+Testing a log line against every rule of a large rule set means one ``re`` call
+per rule. :class:`PatternSet` indexes the rules by a literal every match must
+contain (see :mod:`rexplain.core.literals`), finds all indexed literals in a
+string with one Aho-Corasick scan (or one ``in`` check per literal for small
+sets), and calls ``re`` only for the rules whose literal occurs. Rules without
+a required literal, including all rules under ``re.IGNORECASE``, are tried on
+every string.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from .compiled import CompiledPattern
+
+# Up to this many literals, one ``in`` check each beats an Aho-Corasick scan in Python
+MAX_SUBSTRING_CHECKS = 48
+
+class SetMatch(NamedTuple):
+    """
+    One pattern of a :class:`PatternSet` that matched.
+
+    Attributes:
+        index (int): Position of the pattern in the set.
+        pattern (str): The pattern.
+        span (Tuple[int, int]): Start and end of its first match in the string.
+    """
+    index: int
+    pattern: str
+    span: Tuple[int, int]
+
+class _AhoCorasick:
+    # Trie of the keywords with failure links; ``outputs[state]`` lists the
+    # keywords ending at ``state``, including those reached through failure links
+    def __init__(self, keywords: List[str]):
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[int, ...]] = [()]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = goto[state][char] = len(goto)
+                    goto.append({})
+                    outputs.append(())
+                state = nxt
+            outputs[state] += (index,)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[nxt] = goto[link].get(char, 0)
+                if outputs[fail[nxt]]:
+                    outputs[nxt] += outputs[fail[nxt]]
+        self.goto = goto
+        self.fail = fail
+        self.outputs = outputs
+
+    def __len__(self) -> int:
+        return len(self.goto)
+
+    def find(self, text: str) -> set:
+        # Indexes of the keywords that occur in ``text``
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set()
+        state = 0
+        for char in text:
+            nxt = goto[state].get(char)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(char)
+            state = nxt or 0
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+class PatternSet:
+    """
+    A fixed collection of patterns tested together against each string.
+
+    Instances hold no per-call state and can be shared between threads.
+
+    Attributes:
+        patterns (Tuple[str, ...]): The patterns, in the order given.
+        flags (int): Regex flags every pattern is compiled with.
+    """
+    def __init__(self, patterns: Iterable[str], flags: int = 0):
+        r"""
+        Compile the patterns and index them by their required literals.
+
+        Args:
+            patterns (Iterable[str]): The regex patterns.
+            flags (int, optional): Regex flags (e.g., re.IGNORECASE) for every
+                pattern. Defaults to 0.
+
+        Raises:
+            re.error: If a pattern is invalid.
+        """
+        self.patterns = tuple(patterns)
+        self.flags = int(flags)
+        # Compiled here rather than through compile_pattern, and with private
+        # ASTs, so a large set evicts nothing from the shared caches
+        self._compiled = [CompiledPattern(pattern, self.flags, shared_ast=False)
+                          for pattern in self.patterns]
+        keys: Dict[str, int] = {}
+        owners: List[List[int]] = []  # keyword -> patterns indexed by it
+        always = []
+        for index, compiled in enumerate(self._compiled):
+            compiled.regex  # report an invalid pattern now
+            key = _index_key(compiled)
+            if not key:
+                always.append(index)
+                continue
+            k = keys.get(key)
+            if k is None:
+                k = keys[key] = len(owners)
+                owners.append([])
+            owners[k].append(index)
+        self._owners = [tuple(o) for o in owners]
+        self._always = tuple(always)
+        keywords = list(keys)
+        if len(keywords) <= MAX_SUBSTRING_CHECKS:
+            self._keywords, self._automaton = tuple(keywords), None
+        else:
+            self._keywords, self._automaton = None, _AhoCorasick(keywords)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    @property
+    def unindexed(self) -> Tuple[int, ...]:
+        """Indexes of the patterns without a required literal, which are tried on every string."""
+        return self._always
+
+    def candidates(self, text: str) -> List[int]:
+        r"""
+        Indexes of the patterns that may match somewhere in ``text``.
+
+        Args:
+            text (str): The string to check.
+
+        Returns:
+            List[int]: Sorted pattern indexes; every pattern not listed certainly
+            does not match.
+        """
+        owners = self._owners
+        found = list(self._always)
+        if self._keywords is not None:
+            hits = [k for k, keyword in enumerate(self._keywords) if keyword in text]
+        else:
+            hits = self._automaton.find(text)
+        for k in hits:
+            found.extend(owners[k])
+        found.sort()
+        return found
+
+    def search(self, text: str) -> List[SetMatch]:
+        r"""
+        Find the patterns that match somewhere in ``text``, as ``re.search`` does.
+
+        Args:
+            text (str): The string to search.
+
+        Returns:
+            List[SetMatch]: One entry per matching pattern, in pattern order,
+            with the span of its first match.
+        """
+        compiled = self._compiled
+        matches = []
+        for index in self.candidates(text):
+            match = compiled[index].regex.search(text)
+            if match is not None:
+                matches.append(SetMatch(index, self.patterns[index], match.span()))
+        return matches
+
+    def fullmatch(self, text: str) -> List[SetMatch]:
+        r"""
+        Find the patterns that match all of ``text``, as ``re.fullmatch`` does.
+
+        Args:
+            text (str): The string to test.
+
+        Returns:
+            List[SetMatch]: One entry per matching pattern, in pattern order,
+            each with the span ``(0, len(text))``.
+        """
+        compiled = self._compiled
+        span = (0, len(text))
+        return [SetMatch(index, self.patterns[index], span)
+                for index in self.candidates(text) if compiled[index].matcher(text)]
+
+    def __repr__(self) -> str:
+        return f"PatternSet({len(self)} patterns, {len(self._always)} unindexed)"
+
+def _index_key(compiled: CompiledPattern) -> str:
+    # The longest literal every match contains, or '' if there is none
+    literals = compiled.literals
+    if literals.literal is not None:
+        return literals.literal
+    return max((literals.prefix, literals.suffix) + literals.infixes, key=len)
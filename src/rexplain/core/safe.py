@@ -0,0 +1,228 @@
+r"""
+Testing strings with a time budget.
+
+``re`` backtracks, so a pattern such as ``(a+)+$`` can take exponential time on
+an input like ``'a' * 40 + '!'``. :func:`safe_test` never lets a single test
+run past its budget:
+
+* Regular patterns (no backreferences, lookarounds and the like) are matched by
+  the pattern's :class:`~rexplain.core.automaton.NFA`, which runs in time linear
+  in the length of the string and does not backtrack.
+* Other patterns are tested in a worker process that is killed when the budget
+  runs out. Workers are started once and kept for later tests; one is only
+  replaced after it has been killed, and the budget does not include waiting
+  for a new worker to start. Workers are spawned, not forked, so a threaded
+  caller cannot hand them a lock held by another thread; as with any spawned
+  process, a script calling :func:`safe_test` at import time needs an
+  ``if __name__ == '__main__':`` guard.
+
+A test that runs out of time returns a MatchResult with ``timed_out`` set
+instead of hanging. :data:`safe_stats` counts how often each engine is used and
+how often budgets are hit.
+"""
+import multiprocessing
+import threading
+from time import perf_counter
+from typing import List, NamedTuple
+
+from .tester import MatchResult, _failure_from_trace
+
+# Forking a threaded process can deadlock the child and warns on Python 3.12+
+_context = multiprocessing.get_context('spawn')
+# Idle workers kept for later tests; more are started when tests run concurrently
+MAX_IDLE_WORKERS = 4
+
+class SafeTestInfo(NamedTuple):
+    """
+    Snapshot of the safe tester's counters.
+
+    Attributes:
+        calls (int): Tests run with a time budget.
+        automaton (int): Tests answered by the automaton.
+        subprocess (int): Tests run in a worker process.
+        timeouts (int): Tests that ran out of time.
+    """
+    calls: int
+    automaton: int
+    subprocess: int
+    timeouts: int
+
+class SafeTestStats:
+    """
+    Thread-safe counters for :func:`safe_test`.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def record(self, engine: str, timed_out: bool) -> None:
+        """
+        Count one test.
+
+        Args:
+            engine (str): ``'automaton'`` or ``'subprocess'``.
+            timed_out (bool): Whether the test ran out of time.
+        """
+        with self._lock:
+            self._calls += 1
+            if engine == 'automaton':
+                self._automaton += 1
+            else:
+                self._subprocess += 1
+            if timed_out:
+                self._timeouts += 1
+
+    def info(self) -> SafeTestInfo:
+        """
+        Return a snapshot of the counters.
+
+        Returns:
+            SafeTestInfo: Calls, tests per engine and timeouts.
+        """
+        with self._lock:
+            return SafeTestInfo(self._calls, self._automaton, self._subprocess, self._timeouts)
+
+    def clear(self) -> None:
+        """Reset every counter to zero."""
+        with self._lock:
+            self._calls = 0
+            self._automaton = 0
+            self._subprocess = 0
+            self._timeouts = 0
+
+# Process-wide counters for every test run with a time budget.
+safe_stats = SafeTestStats()
+
+def timed_out_result(timeout: float) -> MatchResult:
+    r"""
+    The result reported for a test that ran out of time.
+
+    Args:
+        timeout (float): The budget, in seconds.
+
+    Returns:
+        MatchResult: A non-matching result with ``timed_out`` set.
+    """
+    return MatchResult(
+        matches=False,
+        reason=f"Timed out after {timeout:g}s: the pattern may backtrack catastrophically on this input",
+        timed_out=True,
+    )
+
+def safe_test(compiled, test_string: str, timeout: float) -> MatchResult:
+    r"""
+    Test a string against a compiled pattern within a time budget.
+
+    Args:
+        compiled (CompiledPattern): The compiled pattern.
+        test_string (str): The string to test.
+        timeout (float): The budget, in seconds.
+
+    Returns:
+        MatchResult: The same result as ``compiled.test(test_string)`` for
+        regular patterns and tests that finish in time, else a timed-out result.
+
+    Raises:
+        ValueError: If ``timeout`` is not positive.
+    """
+    if timeout <= 0:
+        raise ValueError("timeout must be positive")
+    deadline = perf_counter() + timeout
+    compiled.regex  # report an invalid pattern here, not from a worker
+    automaton = compiled.automaton
+    if automaton is not None:
+        try:
+            trace = automaton.trace(test_string, deadline)
+        except TimeoutError:
+            safe_stats.record('automaton', True)
+            return timed_out_result(timeout)
+        safe_stats.record('automaton', False)
+        if trace.failed_at is None:
+            return MatchResult(matches=True, reason="Full match.")
+        return _failure_from_trace(trace, test_string)
+    result = _test_in_subprocess(compiled.pattern, compiled.flags, test_string, deadline)
+    if result is None:
+        safe_stats.record('subprocess', True)
+        return timed_out_result(timeout)
+    safe_stats.record('subprocess', False)
+    return result
+
+class _Worker:
+    # A spawned process answering (pattern, flags, string) requests over a pipe
+    def __init__(self):
+        self.connection, child = _context.Pipe()
+        self.process = _context.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self) -> bool:
+        # Block until the worker has imported the tester; False if it died first
+        if not self.ready:
+            try:
+                self.ready = self.connection.recv() == 'ready'
+            except EOFError:
+                return False
+        return self.ready
+
+    def close(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+_idle: List[_Worker] = []
+_idle_lock = threading.Lock()
+
+def _serve(connection) -> None:
+    from .compiled import compile_pattern
+    connection.send('ready')
+    while True:
+        try:
+            pattern, flags, test_string = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((True, compile_pattern(pattern, flags).test(test_string)))
+        except Exception as e:  # pragma: no cover - re-raised in the parent
+            connection.send((False, e))
+
+def _acquire() -> _Worker:
+    # An idle worker, or a new one; either way ready to take a request
+    while True:
+        with _idle_lock:
+            worker = _idle.pop() if _idle else None
+        if worker is None:
+            worker = _Worker()
+        if worker.wait_ready():
+            return worker
+        worker.close()
+
+def _release(worker: _Worker) -> None:
+    with _idle_lock:
+        if len(_idle) < MAX_IDLE_WORKERS:
+            _idle.append(worker)
+            return
+    worker.close()
+
+def _test_in_subprocess(pattern: str, flags: int, test_string: str, deadline: float):
+    # The worker's result, or None if it was killed at the deadline. The clock
+    # stops while waiting for a worker to start.
+    remaining = deadline - perf_counter()
+    worker = _acquire()
+    deadline = perf_counter() + remaining
+    connection = worker.connection
+    try:
+        connection.send((pattern, flags, test_string))
+        if not connection.poll(max(0.0, deadline - perf_counter())):
+            worker.close()
+            _release(_Worker())  # start the replacement now, not on the next test
+            return None
+        ok, value = connection.recv()
+    except (EOFError, OSError):
+        worker.close()
+        return None  # the worker died without answering
+    _release(worker)
+    if not ok:
+        raise value
+    return value
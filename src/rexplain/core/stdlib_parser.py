@@ -0,0 +1,215 @@
+r"""
+Parser backend built on the regex parser of the standard library's ``re`` module.
+
+CPython parses every pattern into a tree of ``(opcode, argument)`` pairs before
+compiling it. This module converts that tree into the same :mod:`rexplain.core.parser`
+node types the hand-written parser builds, so the stdlib backend accepts exactly
+the syntax ``re`` accepts and honours flags such as ``re.VERBOSE``.
+
+The stdlib tree does not keep the source text, so some values are rebuilt from it:
+
+* Character classes are rendered back to a canonical ``[...]`` string, and a class
+  holding a single category (``\d`` or ``[\d]``) becomes an Escape.
+* ``re`` merges single-character alternatives into a class (``a|b`` becomes
+  ``[ab]``) and factors out common prefixes (``ab|ac`` becomes ``a[bc]``).
+* Escaped characters such as ``\x41`` become plain literals.
+* Node widths are those of the canonical text, so :func:`~rexplain.core.parser.iter_spans`
+  is only exact for trees from the native parser.
+
+Use it through ``RegexParser().parse(pattern, backend='stdlib')``.
+"""
+from typing import List, Optional
+import re
+
+try:
+    from re import _parser as _sre_parse, _constants as _sre  # Python 3.11+
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre
+
+from .parser import (
+    RegexAST, Sequence, Literal, AnyChar, CharClass, Group, Quantifier, Anchor, Escape,
+    Alternation, _coalesce_literals, _leaf, _METACHARS,
+)
+
+# Escapes for categories inside (or making up) a character class
+_CATEGORY_ESCAPES = {
+    _sre.CATEGORY_DIGIT: r'\d', _sre.CATEGORY_NOT_DIGIT: r'\D',
+    _sre.CATEGORY_SPACE: r'\s', _sre.CATEGORY_NOT_SPACE: r'\S',
+    _sre.CATEGORY_WORD: r'\w', _sre.CATEGORY_NOT_WORD: r'\W',
+}
+
+# Positions: '^' and '$' are anchors, the others are escapes as in the native parser
+_AT_NODES = {
+    _sre.AT_BEGINNING: (Anchor, '^'), _sre.AT_END: (Anchor, '$'),
+    _sre.AT_BEGINNING_STRING: (Escape, r'\A'), _sre.AT_END_STRING: (Escape, r'\Z'),
+    _sre.AT_BOUNDARY: (Escape, r'\b'), _sre.AT_NON_BOUNDARY: (Escape, r'\B'),
+}
+
+# Control characters the native parser keeps as escapes
+_CONTROL_ESCAPES = {'\n': r'\n', '\t': r'\t', '\r': r'\r'}
+
+_FLAG_LETTERS = (
+    (re.IGNORECASE, 'i'), (re.LOCALE, 'L'), (re.MULTILINE, 'm'),
+    (re.DOTALL, 's'), (re.VERBOSE, 'x'), (re.ASCII, 'a'),
+)
+
+_POSSESSIVE_REPEAT = getattr(_sre, 'POSSESSIVE_REPEAT', None)  # Python 3.11+
+_ATOMIC_GROUP = getattr(_sre, 'ATOMIC_GROUP', None)  # Python 3.11+
+
+def parse_stdlib(pattern: str, flags: int = 0, coalesce_literals: bool = False) -> RegexAST:
+    r"""
+    Parse a regex pattern with the standard library's parser and convert the result to an AST.
+
+    Args:
+        pattern (str): The regex pattern to parse.
+        flags (int, optional): Regex flags (e.g., re.VERBOSE). Defaults to 0.
+        coalesce_literals (bool, optional): Merge adjacent unquantified literals
+            into a single LiteralRun node. Defaults to False.
+
+    Returns:
+        RegexAST: The root node of the parsed regex AST.
+
+    Raises:
+        ValueError: If ``re`` rejects the pattern.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except re.error as e:
+        raise ValueError(str(e)) from e
+    state = parsed.state
+    names = {number: name for name, number in state.groupdict.items()}
+    # Recursion is bounded by the nesting the stdlib parser itself accepted
+    root = _convert_sequence(parsed, names, coalesce_literals)
+    global_flags = _flag_letters(state.flags & ~flags)
+    if global_flags:
+        # Inline global flags, e.g. (?i), are moved into the parser state; put them back
+        inline = Group('GROUP_FLAGS', (), None, flags=global_flags)
+        elements = root.elements if isinstance(root, Sequence) else (root,)
+        root = Sequence((inline,) + elements) if elements else inline
+    return root
+
+def _flag_letters(flags: int, removed: int = 0) -> str:
+    letters = ''.join(letter for flag, letter in _FLAG_LETTERS if flags & flag)
+    if removed:
+        letters += '-' + ''.join(letter for flag, letter in _FLAG_LETTERS if removed & flag)
+    return letters
+
+def _is_empty(node: RegexAST) -> bool:
+    return isinstance(node, Sequence) and not node.elements
+
+def _noncap(node: RegexAST) -> RegexAST:
+    # ``re`` drops plain (?:...) groups. One must have been there wherever a
+    # sequence or alternation is repeated or an alternation is not on its own.
+    if _is_empty(node):
+        return Group('GROUP_NONCAP', ())
+    if isinstance(node, (Sequence, Alternation)):
+        return Group('GROUP_NONCAP', (node,))
+    return node
+
+def _convert_sequence(items, names: dict, coalesce: bool) -> RegexAST:
+    elements = [_convert(op, av, names, coalesce) for op, av in items]
+    if len(elements) > 1:
+        elements = [_noncap(e) if isinstance(e, Alternation) else e for e in elements]
+    if coalesce and len(elements) > 1:
+        elements = _coalesce_literals(elements)
+    if len(elements) == 1:
+        return elements[0]
+    return Sequence(tuple(elements))
+
+def _body(items, names: dict, coalesce: bool) -> tuple:
+    # Children of a group: none for an empty body, else the body as one node
+    body = _convert_sequence(items, names, coalesce)
+    return () if _is_empty(body) else (body,)
+
+def _convert(op, av, names: dict, coalesce: bool) -> RegexAST:
+    if op is _sre.LITERAL:
+        char = chr(av)
+        if char in _CONTROL_ESCAPES:
+            return _leaf(Escape, _CONTROL_ESCAPES[char])
+        return _leaf(Literal, char, 2 if char in _METACHARS else 1)
+    if op is _sre.NOT_LITERAL:
+        return _leaf(CharClass, '[^' + _class_char(chr(av)) + ']')
+    if op is _sre.ANY:
+        return _leaf(AnyChar, '.')
+    if op is _sre.IN:
+        if len(av) == 1 and av[0][0] is _sre.CATEGORY and av[0][1] in _CATEGORY_ESCAPES:
+            return _leaf(Escape, _CATEGORY_ESCAPES[av[0][1]])
+        return _leaf(CharClass, _render_class(av))
+    if op is _sre.AT:
+        cls, value = _AT_NODES.get(av, (Anchor, str(av)))
+        return _leaf(cls, value)
+    if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT, _POSSESSIVE_REPEAT):
+        lo, hi, items = av
+        hi = None if hi == _sre.MAXREPEAT else hi
+        greedy = op is not _sre.MIN_REPEAT
+        child = _noncap(_convert_sequence(items, names, coalesce))
+        text = _quantifier_text(lo, hi, greedy)
+        if op is _POSSESSIVE_REPEAT:
+            text += '+'  # e.g. a*+, which never gives back what it matched
+        return Quantifier(child, text, lo, hi, greedy)
+    if op is _sre.SUBPATTERN:
+        group, add_flags, del_flags, items = av
+        children = _body(items, names, coalesce)
+        if add_flags or del_flags:
+            return Group('GROUP_FLAGS', children, None, flags=_flag_letters(add_flags, del_flags))
+        if group is None:
+            return Group('GROUP_NONCAP', children)
+        if group in names:
+            return Group('GROUP_NAMED', children, names[group])
+        return Group('GROUP_OPEN', children)
+    if op is _sre.BRANCH:
+        return Alternation(tuple(_convert_sequence(items, names, coalesce) for items in av[1]))
+    if op in (_sre.ASSERT, _sre.ASSERT_NOT):
+        direction, items = av
+        kind = 'LOOKAHEAD' if direction == 1 else 'LOOKBEHIND'
+        if op is _sre.ASSERT_NOT:
+            kind = 'NEG_' + kind
+        return Group('GROUP_' + kind, _body(items, names, coalesce))
+    if op is _ATOMIC_GROUP:
+        return Group('GROUP_ATOMIC', _body(av, names, coalesce))
+    if op is _sre.GROUPREF:
+        return _leaf(Escape, '\\' + str(av))
+    if op is _sre.GROUPREF_EXISTS:
+        group, yes, no = av
+        branches = [_convert_sequence(yes, names, coalesce)]
+        if no is not None:
+            branches.append(_convert_sequence(no, names, coalesce))
+        body = branches[0] if len(branches) == 1 else Alternation(tuple(branches))
+        return Group('GROUP_CONDITIONAL', (body,), condition=names.get(group, str(group)))
+    raise ValueError(f'Unsupported regex construct: {op}')
+
+def _quantifier_text(lo: int, hi: Optional[int], greedy: bool) -> str:
+    if (lo, hi) == (0, None):
+        text = '*'
+    elif (lo, hi) == (1, None):
+        text = '+'
+    elif (lo, hi) == (0, 1):
+        text = '?'
+    elif lo == hi:
+        text = f'{{{lo}}}'
+    elif hi is None:
+        text = f'{{{lo},}}'
+    else:
+        text = f'{{{lo},{hi}}}'
+    return text if greedy else text + '?'
+
+def _class_char(char: str) -> str:
+    if char in '\\]^-[':
+        return '\\' + char
+    return _CONTROL_ESCAPES.get(char, char)
+
+def _render_class(items: List[tuple]) -> str:
+    parts = ['[']
+    for i, (op, av) in enumerate(items):
+        if op is _sre.NEGATE:
+            parts.append('^')
+        elif op is _sre.LITERAL:
+            # A trailing '-' needs no escape, as in [\w-]
+            parts.append('-' if av == 45 and i == len(items) - 1 else _class_char(chr(av)))
+        elif op is _sre.RANGE:
+            parts.append(_class_char(chr(av[0])) + '-' + _class_char(chr(av[1])))
+        elif op is _sre.CATEGORY:
+            parts.append(_CATEGORY_ESCAPES.get(av, ''))
+    parts.append(']')
+    return ''.join(parts)
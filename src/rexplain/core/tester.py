@@ -1,7 +1,30 @@
 import re
-from typing import Optional, List
+from bisect import bisect_right
+from typing import Callable, Optional, List, NamedTuple, Tuple
 from dataclasses import dataclass
 
+from .automaton import Trace
+from .parser import RegexAST, Literal, LiteralRun, AnyChar, CharClass, Escape
+from .stdlib_parser import _sre, _sre_parse
+
+# Kinds of step in a stepwise plan
+_CHAR, _RUN, _COMPLEX, _INVALID = range(4)
+
+# Category escapes as str predicates; these agree with ``re`` on every code point
+_CATEGORY_TESTS = {
+    r'\d': str.isdecimal,
+    r'\D': lambda c: not c.isdecimal(),
+    r'\s': str.isspace,
+    r'\S': lambda c: not c.isspace(),
+    r'\w': lambda c: c.isalnum() or c == '_',
+    r'\W': lambda c: not (c.isalnum() or c == '_'),
+}
+_CLASS_CATEGORIES = {
+    _sre.CATEGORY_DIGIT: r'\d', _sre.CATEGORY_NOT_DIGIT: r'\D',
+    _sre.CATEGORY_SPACE: r'\s', _sre.CATEGORY_NOT_SPACE: r'\S',
+    _sre.CATEGORY_WORD: r'\w', _sre.CATEGORY_NOT_WORD: r'\W',
+}
+
 @dataclass
 class MatchResult:
     """
@@ -12,23 +35,45 @@ class MatchResult:
         reason (str): Explanation of the match or failure.
         failed_at (Optional[int]): Index where the match failed, if applicable.
         partial_matches (Optional[List[str]]): List of partial matches, if any.
+        timed_out (bool): Whether the test ran out of its time budget, in which
+            case nothing is known about the match.
     """
     matches: bool
     reason: str
     failed_at: Optional[int] = None
     partial_matches: Optional[List[str]] = None
+    timed_out: bool = False
 
     def __str__(self):
+        timed_out = ", timed_out=True" if self.timed_out else ""
         return (
             f"MatchResult(matches={self.matches}, reason=\"{self.reason}\", "
-            f"failed_at={self.failed_at}, partial_matches={self.partial_matches})"
+            f"failed_at={self.failed_at}, partial_matches={self.partial_matches}{timed_out})"
         )
 
+class Step(NamedTuple):
+    """
+    One top-level element of a pattern, ready for the stepwise tester.
+
+    Attributes:
+        kind (int): How the element is matched: one character, a literal run,
+            not at all (a complex node), or never (it cannot be tested on its own).
+        node (RegexAST): The element.
+        accepts (Optional[Callable[[str], bool]]): Predicate for one character.
+        expected (str): What the element expects, as shown in failure messages.
+    """
+    kind: int
+    node: RegexAST
+    accepts: Optional[Callable[[str], bool]]
+    expected: str
+
 class RegexTester:
     """
     Tests if a string matches a regex pattern and provides detailed feedback.
+
+    Instances hold no per-call state and can be shared between threads.
     """
-    def test(self, pattern: str, test_string: str, flags: int = 0) -> MatchResult:
+    def test(self, pattern: str, test_string: str, flags: int = 0, timeout: Optional[float] = None) -> MatchResult:
         r"""
         Test if a string matches a regex pattern and explain why/why not.
 
@@ -36,87 +81,114 @@ class RegexTester:
             pattern (str): The regex pattern.
             test_string (str): The string to test.
             flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+            timeout (Optional[float], optional): Time budget in seconds. When set,
+                the test runs in safe mode (see :mod:`rexplain.core.safe`) and a
+                test that runs out of time returns a result with ``timed_out``
+                set. Defaults to None.
 
         Returns:
             MatchResult: Result object with match status and explanation.
         """
-        prog = re.compile(pattern, flags)
-        m = prog.fullmatch(test_string)
-        if m:
+        from .compiled import compile_pattern
+        compiled = compile_pattern(pattern, flags)
+        if timeout is not None:
+            from .safe import safe_test
+            return safe_test(compiled, test_string, timeout)
+        return self.test_compiled(compiled, test_string)
+
+    def test_many(self, pattern: str, strings, flags: int = 0, processes: Optional[int] = 1, diagnose: bool = True):
+        r"""
+        Test a regex pattern against many strings, returning columnar results.
+
+        See :func:`rexplain.core.batch.test_many`.
+
+        Args:
+            pattern (str): The regex pattern.
+            strings (Iterable[str]): The strings to test.
+            flags (int, optional): Regex flags (e.g., re.IGNORECASE). Defaults to 0.
+            processes (Optional[int], optional): Worker processes; None uses one
+                per CPU. Defaults to 1.
+            diagnose (bool, optional): Record where non-matching strings fail.
+                Defaults to True.
+
+        Returns:
+            BatchResult: Match flags, failure offsets and partial match lengths.
+        """
+        from .batch import test_many
+        return test_many(pattern, strings, flags, processes, diagnose=diagnose)
+
+    def test_compiled(self, compiled, test_string: str) -> MatchResult:
+        r"""
+        Test a string against a pattern from :func:`~rexplain.core.compiled.compile_pattern`.
+
+        Args:
+            compiled (CompiledPattern): The compiled pattern.
+            test_string (str): The string to test.
+
+        Returns:
+            MatchResult: Result object with match status and explanation.
+        """
+        pattern = compiled.pattern
+        flags = compiled.flags
+        if compiled.matcher(test_string):
             return MatchResult(matches=True, reason="Full match.")
 
-        # Try to use the parser for step-by-step analysis
+        # Regular patterns: simulate the automaton, which sees through groups,
+        # quantifiers and alternation
+        automaton = compiled.automaton
+        if automaton is not None:
+            return _failure_from_trace(automaton.trace(test_string), test_string)
+
+        # Otherwise walk the precompiled step plan
         try:
-            from .parser import RegexParser, Literal, CharClass, Escape, Sequence
-            ast = RegexParser().parse(pattern, flags=flags)
             # Only handle simple sequences of literals/char classes for now
-            if isinstance(ast, Sequence):
-                elements = ast.elements
-            else:
-                elements = [ast]
+            steps = compiled.step_plan
+            n = len(test_string)
             i = 0
             j = 0
-            details = []
-            while i < len(elements) and j < len(test_string):
-                node = elements[i]
-                c = test_string[j]
-                if isinstance(node, Literal):
-                    if c == node.value:
-                        details.append(f"{c!r} matches literal '{node.value}' at position {j}")
-                        i += 1
-                        j += 1
-                    else:
-                        reason = (f"Failed at position {j}: expected literal '{node.value}', got '{c}'")
-                        return MatchResult(
-                            matches=False,
-                            reason=reason,
-                            failed_at=j,
-                            partial_matches=[test_string[:j]] if j > 0 else []
-                        )
-                elif isinstance(node, CharClass):
-                    import re as _re
-                    charclass = node.value
-                    # Remove brackets for eval
-                    pattern = charclass
-                    if pattern.startswith('[') and pattern.endswith(']'):
-                        pattern = pattern[1:-1]
-                    # Build a regex for the char class
-                    charclass_re = _re.compile(f"[{pattern}]")
-                    if charclass_re.fullmatch(c):
-                        details.append(f"{c!r} matches character class {node.value} at position {j}")
-                        i += 1
-                        j += 1
-                    else:
-                        reason = (f"Failed at position {j}: expected character in {node.value}, got '{c}'")
-                        return MatchResult(
-                            matches=False,
-                            reason=reason,
-                            failed_at=j,
-                            partial_matches=[test_string[:j]] if j > 0 else []
-                        )
-                elif isinstance(node, Escape):
-                    import re as _re
-                    esc = node.value
-                    esc_re = _re.compile(esc)
-                    display_esc = esc  # Always show as written (e.g., '\d')
-                    if esc_re.fullmatch(c):
-                        details.append(f"{c!r} matches escape {display_esc} at position {j}")
-                        i += 1
-                        j += 1
-                    else:
-                        reason = (f"Failed at position {j}: expected {display_esc}, got '{c}'")
-                        return MatchResult(
-                            matches=False,
-                            reason=reason,
-                            failed_at=j,
-                            partial_matches=[test_string[:j]] if j > 0 else []
-                        )
-                else:
+            while i < len(steps) and j < n:
+                kind, node, accepts, expected = steps[i]
+                if kind == _COMPLEX:
                     # For now, fallback to regex engine for complex nodes
                     break
+                if kind == _INVALID:
+                    raise ValueError(f"Cannot test {expected} on its own")
+                if kind == _RUN:
+                    run = node.value
+                    if test_string.startswith(run, j):
+                        i += 1
+                        j += len(run)
+                        continue
+                    # Locate the first character of the run that differs
+                    k = 0
+                    while j + k < n and test_string[j + k] == run[k]:
+                        k += 1
+                    j += k
+                    if j == n:
+                        reason = f"String too short: expected more input for pattern element {Literal(run[k])} at position {j}"
+                    else:
+                        reason = f"Failed at position {j}: expected literal '{run[k]}', got '{test_string[j]}'"
+                    return MatchResult(
+                        matches=False,
+                        reason=reason,
+                        failed_at=j,
+                        partial_matches=[test_string[:j]] if j > 0 else []
+                    )
+                c = test_string[j]
+                if accepts(c):
+                    i += 1
+                    j += 1
+                    continue
+                got = '\\n' if c == '\n' else c
+                return MatchResult(
+                    matches=False,
+                    reason=f"Failed at position {j}: expected {expected}, got '{got}'",
+                    failed_at=j,
+                    partial_matches=[test_string[:j]] if j > 0 else []
+                )
             # If we finished all pattern elements but string is too short
-            if i < len(elements):
-                reason = f"String too short: expected more input for pattern element {elements[i]} at position {j}"
+            if i < len(steps):
+                reason = f"String too short: expected more input for pattern element {steps[i].node} at position {j}"
                 return MatchResult(
                     matches=False,
                     reason=reason,
@@ -124,7 +196,7 @@ class RegexTester:
                     partial_matches=[test_string[:j]] if j > 0 else []
                 )
             # If we finished all pattern elements but string is too long
-            if j < len(test_string):
+            if j < n:
                 reason = f"String too long: extra input '{test_string[j:]}' at position {j}"
                 return MatchResult(
                     matches=False,
@@ -159,12 +231,8 @@ class RegexTester:
                 failed_at=failed_at,
                 partial_matches=partial_matches
             )
-        # Regex pattern: use current logic
-        longest = 0
-        for i in range(1, len(test_string) + 1):
-            m = prog.fullmatch(test_string[:i])
-            if m:
-                longest = i
+        # Not regular: re finds the longest matching prefix, longest first
+        longest = longest_matching_prefix(compiled, test_string)
         if longest > 0:
             failed_at = None
             for i, (c1, c2) in enumerate(zip(pattern, test_string)):
@@ -191,4 +259,171 @@ class RegexTester:
                 break
         else:
             failed_at = min(len(pattern), len(test_string))
-        return MatchResult(matches=False, reason="No match at all.", failed_at=failed_at, partial_matches=[])
\ No newline at end of file
+        return MatchResult(matches=False, reason="No match at all.", failed_at=failed_at, partial_matches=[])
+
+def longest_matching_prefix(compiled, text: str) -> int:
+    r"""
+    Length of the longest non-empty prefix of ``text`` that the pattern fully matches.
+
+    Patterns the :class:`~rexplain.core.automaton.NFA` supports are answered in
+    one pass over ``text``. :class:`RegexTester` diagnoses those from the
+    automaton's trace instead, so it only calls this for the others
+    (backreferences, lookarounds and the like). For those, ``fullmatch`` runs on
+    each prefix, longest first, until one matches. This is still quadratic in
+    the worst case. The required literals (see :mod:`rexplain.core.literals`)
+    only skip prefixes that cannot match: prefixes must start and end with them
+    and contain all the others.
+
+    Args:
+        compiled (CompiledPattern): The compiled pattern.
+        text (str): The string to scan.
+
+    Returns:
+        int: The prefix length, or 0 if no non-empty prefix matches.
+    """
+    automaton = compiled.automaton
+    if automaton is not None:
+        return automaton.prefix_match(text).longest or 0
+    literals = compiled.literals
+    if literals.literal is not None:
+        return len(literals.literal) if literals.literal and text.startswith(literals.literal) else 0
+    prefix, suffix = literals.prefix, literals.suffix
+    if not text.startswith(prefix):
+        return 0
+    # The shortest prefix that contains every required literal
+    shortest = max(len(prefix), 1)
+    for infix in literals.infixes:
+        at = text.find(infix)
+        if at < 0:
+            return 0
+        shortest = max(shortest, at + len(infix))
+    fullmatch = compiled.regex.fullmatch
+    for i in range(len(text), shortest - 1, -1):
+        # endpos limits the match without copying the prefix
+        if text.endswith(suffix, 0, i) and fullmatch(text, 0, i):
+            return i
+    return 0
+
+def _describe(node: RegexAST) -> str:
+    # What a node expects, in the words of the stepwise messages
+    if isinstance(node, (Literal, LiteralRun)):
+        return f"literal '{node.value}'"
+    if isinstance(node, CharClass):
+        return f"character in {node.value}"
+    if isinstance(node, AnyChar):
+        return "any character except a newline"
+    return node.value  # escapes and anchors, as written
+
+def _failure_from_trace(trace: Trace, test_string: str) -> MatchResult:
+    j = trace.failed_at
+    partial_matches = [test_string[:j]] if j > 0 else []
+    if j == len(test_string):
+        elements = ' or '.join(str(node) for node in trace.expected)
+        reason = f"String too short: expected more input for pattern element {elements} at position {j}"
+    elif trace.expected:
+        c = test_string[j]
+        got = '\\n' if c == '\n' else c
+        expected = ' or '.join(_describe(node) for node in trace.expected)
+        reason = f"Failed at position {j}: expected {expected}, got '{got}'"
+    else:
+        reason = f"String too long: extra input '{test_string[j:]}' at position {j}"
+    return MatchResult(matches=False, reason=reason, failed_at=j, partial_matches=partial_matches)
+
+def plan_steps(elements: Tuple[RegexAST, ...], flags: int = 0) -> Tuple[Step, ...]:
+    r"""
+    Compile top-level elements into the flat plan the stepwise tester walks.
+
+    Classes become set or interval lookups and category escapes such as ``\d``
+    become ``str`` predicates, so testing a string compiles nothing.
+
+    Args:
+        elements (Tuple[RegexAST, ...]): The top-level elements of the pattern.
+        flags (int, optional): Regex flags the pattern is compiled with. Defaults to 0.
+
+    Returns:
+        Tuple[Step, ...]: One step per element.
+    """
+    return tuple(_plan_step(node, flags) for node in elements)
+
+def _plan_step(node: RegexAST, flags: int) -> Step:
+    if isinstance(node, Literal):
+        return Step(_CHAR, node, node.value.__eq__, _describe(node))
+    if isinstance(node, LiteralRun):
+        return Step(_RUN, node, None, _describe(node))
+    if isinstance(node, AnyChar):
+        return Step(_CHAR, node, _any if flags & re.DOTALL else '\n'.__ne__, _describe(node))
+    if isinstance(node, (CharClass, Escape)):
+        try:
+            accepts = _char_predicate(node.value)
+        except re.error:
+            return Step(_INVALID, node, None, node.value)
+        return Step(_CHAR, node, accepts, _describe(node))
+    return Step(_COMPLEX, node, None, str(node))
+
+def _any(c: str) -> bool:
+    return True
+
+def _char_predicate(text: str) -> Callable[[str], bool]:
+    # A class or escape as a one-character predicate
+    if text in _CATEGORY_TESTS:
+        return _CATEGORY_TESTS[text]
+    parsed = list(_sre_parse.parse(text))
+    if len(parsed) == 1:
+        op, av = parsed[0]
+        if op is _sre.LITERAL:
+            return chr(av).__eq__
+        if op is _sre.NOT_LITERAL:
+            return chr(av).__ne__
+        if op is _sre.IN:
+            accepts = _class_predicate(av)
+            if accepts is not None:
+                return accepts
+    # Anything else (\b, \x41, ...) is tested by ``re`` once per distinct character
+    fullmatch = re.compile(text).fullmatch
+    memo = {}
+
+    def accepts(c: str) -> bool:
+        result = memo.get(c)
+        if result is None:
+            result = memo[c] = fullmatch(c) is not None
+        return result
+    return accepts
+
+def _class_predicate(items) -> Optional[Callable[[str], bool]]:
+    negate = False
+    chars = set()
+    ranges = []
+    categories = []
+    for op, av in items:
+        if op is _sre.NEGATE:
+            negate = True
+        elif op is _sre.LITERAL:
+            chars.add(chr(av))
+        elif op is _sre.RANGE:
+            ranges.append(av)
+        elif op is _sre.CATEGORY and av in _CLASS_CATEGORIES:
+            categories.append(_CATEGORY_TESTS[_CLASS_CATEGORIES[av]])
+        else:
+            return None
+    members = frozenset(chars)
+    if not ranges and not categories:
+        return members.__contains__ if not negate else (lambda c: c not in members)
+    # Merged, sorted intervals: a code point is inside if the last start at or
+    # before it belongs to an interval that reaches it
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    starts = [lo for lo, _ in merged]
+    ends = [hi for _, hi in merged]
+    categories = tuple(categories)
+
+    def accepts(c: str) -> bool:
+        code = ord(c)
+        k = bisect_right(starts, code) - 1
+        hit = (c in members or (k >= 0 and code <= ends[k])
+               or any(test(c) for test in categories))
+        return hit != negate
+    return accepts
@@ -0,0 +1,230 @@
+r"""
+Vectorized example generation with NumPy.
+
+:meth:`ExampleGenerator.generate_from_plan
+<rexplain.core.generator.ExampleGenerator.generate_from_plan>` hands large
+batches to :func:`generate_vectorized`, which evaluates the compiled plan once
+for all samples instead of once per sample. Every node produces the output of
+all the samples that reach it together, as one array of character codes and
+one array of lengths:
+
+* a run of leaves draws one column of codes per character class by indexing
+  its candidates with an array of random integers;
+* a quantifier samples every repetition count at once and generates its child
+  for all repetitions of all samples in one go;
+* an alternation picks the branch of every sample at once and generates each
+  branch for the samples that took it.
+
+The examples are assembled from a ``(count, width)`` matrix of codes at the
+end, which is what patterns of fixed shape such as ``[A-Z]{2}\d{6}`` produce
+directly.
+
+The random integers are scaled from 32-bit words drawn in bulk from a
+``random.Random`` seeded from the example generator's own stream, so a seeded
+generator, or ``random.seed`` for an unseeded one, makes batches reproducible
+too. Without NumPy the same pass runs over lists of strings and consumes the
+words in the same order, so a batch is identical with or without NumPy.
+"""
+import random
+import sys
+from array import array
+from typing import List, Tuple
+
+from .generator import _CHOICE, _DRAW, _REPEAT
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+def generate_vectorized(generator, root: tuple, count: int) -> List[str]:
+    r"""
+    Generate ``count`` examples from a compiled plan in one vectorized pass.
+
+    Without NumPy the pass runs in pure Python and returns the same examples.
+
+    Args:
+        generator (ExampleGenerator): The generator that compiled the plan; it
+            compiles alternation options on first use.
+        root (tuple): ``GenerationPlan.root``.
+        count (int): Number of examples.
+
+    Returns:
+        List[str]: The examples.
+    """
+    source = random.Random(generator._random.getrandbits(64))
+    if np is None:
+        return _ListBatch(generator, source).run(root, count)
+    codes, lengths = _Batch(generator, source).run(root, count)
+    codes = codes.astype('<u4', copy=False)
+    width = int(lengths.max()) if count else 0
+    if width and codes.all():
+        # One row per example, padded with NULs, which NumPy strips from each string
+        if lengths.min() < width:
+            matrix = np.zeros((count, width), dtype='<u4')
+            rows = np.repeat(np.arange(count), lengths)
+            matrix[rows, np.arange(len(codes)) - np.repeat(np.cumsum(lengths) - lengths, lengths)] = codes
+            codes = matrix
+        return codes.view(f'<U{width}').ravel().tolist()
+    text = codes.tobytes().decode('utf-32-le', 'surrogatepass')
+    ends = np.cumsum(lengths).tolist()
+    starts = [0] + ends[:-1]
+    return [text[start:end] for start, end in zip(starts, ends)]
+
+class _Batch:
+    # Evaluates plan nodes for many samples; each result is (codes, lengths)
+    # with the codes of all samples concatenated in sample order
+    def __init__(self, generator, source: random.Random):
+        self.generator = generator
+        self.source = source
+        self._arrays = {}  # id(candidates) -> (candidates, code array)
+
+    def run(self, node: tuple, count: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        if count == 0:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64)
+        kind = node[0]
+        if kind == _DRAW:
+            return self._draw(node[1], count)
+        if kind == _REPEAT:
+            return self._repeat(node, count)
+        if kind == _CHOICE:
+            return self._choice(node, count)
+        # A sequence, stored in reverse
+        return _concatenate([self.run(child, count) for child in reversed(node[1])], count)
+
+    def _codes(self, candidates) -> 'np.ndarray':
+        cached = self._arrays.get(id(candidates))
+        if cached is None or cached[0] is not candidates:
+            if isinstance(candidates, str):
+                array = np.frombuffer(candidates.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+            else:
+                array = None  # a literal, drawn whole
+            cached = self._arrays[id(candidates)] = (candidates, array)
+        return cached[1]
+
+    def _draw(self, items, count: int):
+        # One column per character class, the literal's codes for a literal
+        columns = []
+        for item in items:
+            array = self._codes(item)
+            if array is None:
+                literal = np.frombuffer(item[0].encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+                columns.extend(np.full(count, code, dtype=np.uint32) for code in literal.tolist())
+            else:
+                columns.append(array[self._integers(0, len(array) - 1, count)])
+        width = len(columns)
+        if not width:
+            return np.zeros(0, dtype=np.uint32), np.zeros(count, dtype=np.int64)
+        return np.stack(columns, axis=1).ravel(), np.full(count, width, dtype=np.int64)
+
+    def _repeat(self, node: tuple, count: int):
+        _, child, lo, hi = node
+        repeats = self._integers(lo, hi, count)
+        # All repetitions of all samples, in sample order
+        codes, lengths = self.run(child, int(repeats.sum()))
+        owners = np.repeat(np.arange(count), repeats)
+        return codes, np.bincount(owners, weights=lengths, minlength=count).astype(np.int64)
+
+    def _choice(self, node: tuple, count: int):
+        options = node[1]
+        picks = self._integers(0, len(options) - 1, count)
+        parts = []
+        lengths = np.zeros(count, dtype=np.int64)
+        for index in np.unique(picks).tolist():
+            rows = np.flatnonzero(picks == index)
+            codes, part_lengths = self.run(self.generator._option(node, index), len(rows))
+            lengths[rows] = part_lengths
+            parts.append((rows, codes, part_lengths))
+        starts = np.cumsum(lengths) - lengths
+        out = np.empty(int(lengths.sum()), dtype=np.uint32)
+        for rows, codes, part_lengths in parts:
+            _scatter(out, starts[rows], codes, part_lengths)
+        return out, lengths
+
+    def _integers(self, lo: int, hi: int, count: int) -> 'np.ndarray':
+        # Widened first: NumPy 1.x keeps uint32 * uint64 scalar in uint32
+        words = np.frombuffer(_random_bytes(self.source, count), dtype='<u4').astype(np.uint64)
+        return (words * (hi - lo + 1) >> 32).astype(np.int64) + lo
+
+class _ListBatch:
+    # The same pass without NumPy; each result is the list of sample strings,
+    # and random words are consumed exactly as _Batch consumes them
+    def __init__(self, generator, source: random.Random):
+        self.generator = generator
+        self.source = source
+
+    def run(self, node: tuple, count: int) -> List[str]:
+        if count == 0:
+            return []
+        kind = node[0]
+        if kind == _DRAW:
+            columns = []
+            for item in node[1]:
+                if isinstance(item, str):
+                    columns.append([item[i] for i in self._integers(0, len(item) - 1, count)])
+                else:
+                    columns.append([item[0]] * count)
+            return _join_columns(columns, count)
+        if kind == _REPEAT:
+            _, child, lo, hi = node
+            repeats = self._integers(lo, hi, count)
+            parts = self.run(child, sum(repeats))
+            out = []
+            end = 0
+            for n in repeats:
+                out.append(''.join(parts[end:end + n]))
+                end += n
+            return out
+        if kind == _CHOICE:
+            rows = {}
+            for row, index in enumerate(self._integers(0, len(node[1]) - 1, count)):
+                rows.setdefault(index, []).append(row)
+            out = [''] * count
+            for index in sorted(rows):
+                option_rows = rows[index]
+                for row, text in zip(option_rows, self.run(self.generator._option(node, index), len(option_rows))):
+                    out[row] = text
+            return out
+        return _join_columns([self.run(child, count) for child in reversed(node[1])], count)
+
+    def _integers(self, lo: int, hi: int, count: int) -> List[int]:
+        words = array('I')
+        words.frombytes(_random_bytes(self.source, count))
+        if sys.byteorder == 'big':
+            words.byteswap()
+        span = hi - lo + 1
+        return [lo + (word * span >> 32) for word in words]
+
+def _random_bytes(source: random.Random, count: int) -> bytes:
+    # ``count`` little-endian 32-bit words; a word w picks lo + w * span >> 32
+    return source.getrandbits(32 * count).to_bytes(4 * count, 'little')
+
+def _join_columns(columns: List[List[str]], count: int) -> List[str]:
+    # Sample i of the result is sample i of each column, joined in order
+    if not columns:
+        return [''] * count
+    if len(columns) == 1:
+        return columns[0]
+    return [''.join(parts) for parts in zip(*columns)]
+
+def _concatenate(parts, count: int):
+    # Sample i of the result is sample i of each part, joined in order
+    if len(parts) == 1:
+        return parts[0]
+    lengths = np.zeros(count, dtype=np.int64)
+    for _, part_lengths in parts:
+        lengths += part_lengths
+    offsets = np.cumsum(lengths) - lengths
+    out = np.empty(int(lengths.sum()), dtype=np.uint32)
+    for codes, part_lengths in parts:
+        _scatter(out, offsets, codes, part_lengths)
+        offsets = offsets + part_lengths
+    return out, lengths
+
+def _scatter(out, starts, codes, lengths) -> None:
+    # Copy segment i of ``codes`` (``lengths[i]`` long) to ``out[starts[i]:]``
+    if not len(codes):
+        return
+    segment_starts = np.cumsum(lengths) - lengths
+    within = np.arange(len(codes)) - np.repeat(segment_starts, lengths)
+    out[np.repeat(starts, lengths) + within] = codes
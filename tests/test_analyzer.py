@@ -0,0 +1,140 @@
+import sys
+import os
+import re
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import rexplain
+from rexplain.core.analyzer import analyze, EXPONENTIAL, POLYNOMIAL, LINEAR
+
+def test_exponential_patterns():
+    for pattern in [r'(a+)+$', r'(a|a)*b', r'(\w+\s?)*$', r'(x+x+)+y', r'(a*)*b',
+                    r'([a-z0-9]+[-.]?)+@', r'(\d|[^x])+$', r'^(([a-z])+.)+[A-Z]([a-z])+$']:
+        result = analyze(pattern)
+        assert result.complexity == EXPONENTIAL, pattern
+        assert result.degree is None and not result.safe
+
+def test_polynomial_patterns():
+    for pattern, degree in [(r'\d+\d+', 2), (r'.*=.*=.*', 3), (r'\w+\d+', 2),
+                            (r'a{1,100}a{1,100}', 2), (r'(\d+)-?(\d+)x', 2)]:
+        result = analyze(pattern)
+        assert result.complexity == POLYNOMIAL, pattern
+        assert result.degree == degree, pattern
+
+def test_linear_patterns():
+    for pattern in [r'^\d{3}-\d{4}$', r'(ab+)+', r'(a+b)+', r'[a-z]+@[a-z]+\.com', r'(a|ab)*c',
+                    r'(?:a|b|c)+', r'(\w|\d)+$', r'\s*#\s*', r'foo', r'(?>a+)+b']:
+        result = analyze(pattern)
+        assert result.complexity == LINEAR, pattern
+        assert result.degree == 1 and result.safe and result.findings == ()
+
+def test_findings_point_at_nodes():
+    finding = analyze(r'x(a+)+$').findings[0]
+    assert finding.kind == 'nested_quantifier'
+    assert finding.spans == ((1, 6), (2, 4))
+    finding = analyze(r'(a|a)*b').findings[0]
+    assert finding.kind == 'overlapping_alternation'
+    assert finding.spans == ((0, 6), (1, 2), (3, 4))
+    finding = analyze(r'k=\d+\d+').findings[0]
+    assert finding.kind == 'adjacent_quantifiers'
+    assert finding.spans == ((2, 5), (5, 8))
+    assert finding.prefix == 'k='
+
+def test_witness_is_slow():
+    for pattern in [r'(a+)+$', r'(\w+\s?)*$', r'([a-z0-9]+[-.]?)+@']:
+        finding = analyze(pattern).findings[0]
+        regex = re.compile(pattern)
+        times = []
+        for repeats in (10, 16):
+            start = time.perf_counter()
+            regex.search(finding.witness(repeats))
+            times.append(time.perf_counter() - start)
+        # Six more repetitions cost about 2**6 times as much
+        assert times[1] > 8 * times[0], pattern
+    finding = analyze(r'\d+\d+').findings[0]
+    assert finding.witness(3) == '000a'
+    assert len(finding.witness()) == 5001
+
+def test_chains_through_groups_and_bounded_repeats():
+    # The grouped and repeated forms have the degree of the unrolled one
+    for pattern, degree in [(r'.*a.*a.*a.*a.*a.*a', 6), (r'(.*a){6}', 6), (r'(.*a){10}', 10), (r'(.*a){4}', 4),
+                            (r'(?:.*a)(?:.*a)(?:.*a)(?:.*a)', 4), (r'(?:\d+,?){2,5}$', 5),
+                            (r'x(?:.*a.*a)', 2), (r'(.*a){2,3}b', 3)]:
+        result = analyze(pattern)
+        assert result.complexity == POLYNOMIAL, pattern
+        assert result.degree == degree, pattern
+        assert len(result.findings) == 1, pattern
+    finding = analyze(r'(.*a){6}').findings[0]
+    assert finding.spans == ((1, 3),)
+    assert finding.witness(3) == 'aaa\n'
+    assert analyze(r'\d{1,3}(\.\d{1,3}){3}').safe
+    # Doubling the pumped part costs about 2**degree as much
+    for pattern in [r'(.*a){4}', r'(?:.*a)(?:.*a)(?:.*a)(?:.*a)', r'(?:\d+,?){2,5}$']:
+        finding = analyze(pattern).findings[0]
+        regex = re.compile(pattern)
+        times = []
+        for repeats in (20, 40):
+            start = time.perf_counter()
+            regex.fullmatch(finding.witness(repeats))
+            times.append(time.perf_counter() - start)
+        assert times[1] > 4 * times[0], pattern
+
+def test_lookaround_tails():
+    # A lookaround succeeds without backtracking into what ends its body
+    for pattern in [r'(?=(a+)+)b', r'(?=\d+\d+)x', r'(?!(a|a)*)b']:
+        assert analyze(pattern).safe, pattern
+    assert analyze(r'(?=(a+)+c)b').complexity == EXPONENTIAL
+    assert analyze(r'(?=\d+\d+x)').degree == 2
+
+def test_linear_in_pattern_size():
+    pattern = '|'.join(f'(a{i}b+c*)' for i in range(2000))
+    start = time.perf_counter()
+    assert analyze(pattern).complexity == LINEAR
+    assert time.perf_counter() - start < 5
+
+def test_compiled_and_top_level_api():
+    compiled = rexplain.compile(r'(a+)+$')
+    assert compiled.analysis is compiled.analysis
+    assert rexplain.analyze(r'(a+)+$') is compiled.analysis
+    assert rexplain.analyze(r'A+A+', re.IGNORECASE).degree == 2
+
+def test_cli_analyze():
+    import subprocess
+    cli_path = os.path.join(os.path.dirname(__file__), '../src/rexplain/cli/main.py')
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), '../src'))
+    result = subprocess.run([sys.executable, cli_path, 'analyze', '(a+)+$'], capture_output=True, text=True, env=env)
+    assert result.returncode == 1
+    assert 'Complexity: exponential' in result.stdout
+    assert '  ^^^^^' in result.stdout
+    # The printed attack string is the one Finding.witness builds
+    finding = analyze('(a+)+$').findings[0]
+    assert f"attack string: {finding.prefix!r} + {finding.pump!r} * {finding.repeats} + {finding.suffix!r}" in result.stdout
+    assert finding.witness() == finding.prefix + finding.pump * finding.repeats + finding.suffix
+    result = subprocess.run([sys.executable, cli_path, 'analyze', r'\d{3}'], capture_output=True, text=True, env=env)
+    assert result.returncode == 0
+    assert result.stdout.strip() == 'Complexity: linear'
+
+def main():
+    test_exponential_patterns()
+    print("test_exponential_patterns passed")
+    test_polynomial_patterns()
+    print("test_polynomial_patterns passed")
+    test_linear_patterns()
+    print("test_linear_patterns passed")
+    test_findings_point_at_nodes()
+    print("test_findings_point_at_nodes passed")
+    test_witness_is_slow()
+    print("test_witness_is_slow passed")
+    test_chains_through_groups_and_bounded_repeats()
+    print("test_chains_through_groups_and_bounded_repeats passed")
+    test_lookaround_tails()
+    print("test_lookaround_tails passed")
+    test_linear_in_pattern_size()
+    print("test_linear_in_pattern_size passed")
+    test_compiled_and_top_level_api()
+    print("test_compiled_and_top_level_api passed")
+    test_cli_analyze()
+    print("test_cli_analyze passed")
+
+if __name__ == "__main__":
+    main()
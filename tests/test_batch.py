@@ -0,0 +1,81 @@
+import sys
+import os
+import re
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import rexplain
+from rexplain.core.batch import NO_OFFSET, test_many as batch_test
+from rexplain.core.tester import RegexTester
+
+PATTERNS = [r'\d{3}-[a-z]+', r'(foo|bar)+$', r'[a-c]\d(?=x)', r'abc', r'(a)\1b']
+STRINGS = ['123-ab', '12-ab', '123-', 'foobar', 'foobaz', 'a1', 'a1x', 'abc', 'abd', 'aab', 'aac', '']
+
+def check_against_test(batch, pattern, strings, flags=0):
+    tester = RegexTester()
+    assert len(batch) == len(strings)
+    for row, s in enumerate(strings):
+        expected = tester.test(pattern, s, flags)
+        assert batch.matches[row] == expected.matches
+        assert batch.result(row) == expected
+        if expected.matches:
+            assert batch.failed_at[row] == NO_OFFSET and batch.prefix_lengths[row] == NO_OFFSET
+        else:
+            assert batch.failed_at[row] == expected.failed_at, (pattern, s)
+            partial = expected.partial_matches[0] if expected.partial_matches else ''
+            assert s[:batch.prefix_lengths[row]] == partial
+
+def test_columns_agree_with_test():
+    for pattern in PATTERNS:
+        check_against_test(batch_test(pattern, STRINGS), pattern, STRINGS)
+    batch = batch_test('abc', STRINGS, re.IGNORECASE)
+    check_against_test(batch, 'abc', STRINGS, re.IGNORECASE)
+
+def test_streams_in_chunks():
+    consumed = []
+
+    def source():
+        for i in range(25):
+            consumed.append(i)
+            yield f'{i:03d}-x'
+    batch = batch_test(r'\d{3}-x', source(), chunk_size=4)
+    assert consumed == list(range(25))
+    assert batch.match_count == 25 and list(batch.failures()) == []
+    assert rexplain.compile(r'\d{3}-x').test_many(['001-x', '01-x']).match_count == 1
+
+def test_process_pool_keeps_order():
+    strings = [s for s in STRINGS for _ in range(7)]
+    for pattern in PATTERNS[:3]:
+        serial = batch_test(pattern, strings)
+        pooled = batch_test(pattern, iter(strings), processes=2, chunk_size=5)
+        assert pooled.matches == serial.matches
+        assert pooled.failed_at == serial.failed_at
+        assert pooled.prefix_lengths == serial.prefix_lengths
+        assert list(pooled.failures()) == list(serial.failures())
+    check_against_test(pooled, PATTERNS[2], strings)
+
+def test_invalid_arguments():
+    for kwargs in ({'chunk_size': 0}, {'processes': 0}):
+        try:
+            batch_test('a', ['a'], **kwargs)
+            assert False, 'Expected ValueError'
+        except ValueError:
+            pass
+    try:
+        batch_test('(a', ['a'])
+        assert False, 'Expected re.error for invalid pattern'
+    except re.error:
+        pass
+
+def main():
+    test_columns_agree_with_test()
+    print('test_columns_agree_with_test passed')
+    test_streams_in_chunks()
+    print('test_streams_in_chunks passed')
+    test_process_pool_keeps_order()
+    print('test_process_pool_keeps_order passed')
+    test_invalid_arguments()
+    print('test_invalid_arguments passed')
+    print('All batch tests passed!')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import re
+import itertools
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.bitparallel import BitMatcher
+from rexplain.core.batch import test_many as run_batch
+
+STRINGS = [''.join(t) for n in range(5) for t in itertools.product('ab\n1 中', repeat=n)]
+
+def test_agrees_with_the_tester():
+    for pattern, flags in [(r'(a|b)*abb', 0), (r'^a+$', re.MULTILINE), (r'a.b', re.DOTALL), (r'[^a]+1?', 0),
+                           (r'(?i:A)b*', 0), (r'\w+', re.ASCII), (r'\s|\d{2}', 0), (r'\Aa?b{1,3}\Z', 0),
+                           (r'(a|ab)(1|b 1)*', 0), (r'', 0)]:
+        compiled = compile_pattern(pattern, flags)
+        matcher = compiled.bit_matcher
+        assert matcher is not None, pattern
+        for s in STRINGS:
+            assert matcher.fullmatch(s) == bool(compiled.regex.fullmatch(s)), (pattern, s)
+            assert matcher.failure_offset(s) == compiled.test(s).failed_at, (pattern, s)
+
+def test_unsupported_patterns():
+    # Assertions that can fail under a full match, and too many positions
+    for pattern in [r'a\bb', r'a^b', r'(^a)+', r'a$b', r'a\b', r'a{65}']:
+        assert compile_pattern(pattern).bit_matcher is None, pattern
+    assert compile_pattern(r'(a)\1').bit_matcher is None
+    assert compile_pattern(r'a{64}').bit_matcher.position_count == 64
+
+def test_shift_and_without_tables():
+    # Each position is entered only from the one before it
+    matcher = BitMatcher.from_nfa(compile_pattern(r'[A-Z]{2}\d{4}').automaton)
+    assert matcher._blocks == ()
+    assert matcher.fullmatch('AB1234') and not matcher.fullmatch('AB123')
+    assert matcher.failure_offset('A11234') == 1
+    assert matcher.failure_offset('AB123') == 5
+
+def test_batch_failure_offsets():
+    strings = ['2024-01-15', '2024-1-15', '2024-01-1', 'x']
+    batch = run_batch(r'\d{4}-\d{2}-\d{2}', strings)
+    assert list(batch.matches) == [1, 0, 0, 0]
+    assert list(batch.failed_at) == [-1, 6, 9, 0]
+    assert list(batch.prefix_lengths) == [-1, 6, 9, 0]
+
+def main():
+    test_agrees_with_the_tester()
+    print("test_agrees_with_the_tester passed")
+    test_unsupported_patterns()
+    print("test_unsupported_patterns passed")
+    test_shift_and_without_tables()
+    print("test_shift_and_without_tables passed")
+    test_batch_failure_offsets()
+    print("test_batch_failure_offsets passed")
+
+if __name__ == "__main__":
+    main()
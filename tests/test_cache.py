@@ -0,0 +1,108 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.cache import LRUCache, ParseCache, parse_cache
+from rexplain.core.parser import RegexParser
+
+def test_hits_and_misses():
+    cache = ParseCache(maxsize=4)
+    first = cache.parse(r'\d+')
+    second = cache.parse(r'\d+')
+    assert first is second
+    info = cache.info()
+    assert info.hits == 1 and info.misses == 1 and info.currsize == 1
+
+def test_flags_are_part_of_key():
+    import re
+    cache = ParseCache(maxsize=4)
+    cache.parse('abc')
+    cache.parse('abc', re.IGNORECASE)
+    assert cache.info().misses == 2
+    assert len(cache) == 2
+
+def test_eviction_is_lru():
+    cache = ParseCache(maxsize=2)
+    cache.parse('a')
+    cache.parse('b')
+    cache.parse('a')  # 'a' is now most recently used
+    cache.parse('c')  # evicts 'b'
+    assert ('a', 0) in cache and ('c', 0) in cache
+    assert ('b', 0) not in cache
+    assert cache.info().evictions == 1
+
+def test_clear_resets_counters():
+    cache = ParseCache(maxsize=2)
+    cache.parse('a')
+    cache.parse('a')
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 2, 0)
+
+def test_zero_maxsize_disables_storage():
+    cache = LRUCache(maxsize=0)
+    assert cache.get_or_create('k', lambda: 1) == 1
+    assert len(cache) == 0
+
+def test_parse_errors_are_not_cached():
+    cache = ParseCache(maxsize=2)
+    for _ in range(2):
+        try:
+            cache.parse('(abc')
+            assert False, 'Expected ValueError for unclosed group'
+        except ValueError:
+            pass
+    assert len(cache) == 0 and cache.info().misses == 2
+
+def test_front_ends_share_cache():
+    from rexplain import explain, examples, test
+    from rexplain.core.compiled import compiled_cache
+    parse_cache.clear()
+    compiled_cache.clear()
+    pattern = r'[a-c]{2}x'
+    explain(pattern)
+    examples(pattern, 2)
+    test(pattern, 'abz')
+    # All three share one CompiledPattern, which parsed the pattern once
+    info = parse_cache.info()
+    assert info.misses == 1
+    assert info.hits == 0
+    assert compiled_cache.info().hits == 2
+
+def test_threaded_access():
+    cache = ParseCache(maxsize=8)
+    patterns = [f'a{{{i}}}b' for i in range(16)]
+    expected = {p: RegexParser().parse(p) for p in patterns}
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(50):
+                for p in patterns:
+                    assert cache.parse(p) == expected[p]
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    info = cache.info()
+    assert info.currsize <= 8
+    assert info.hits + info.misses == 8 * 50 * len(patterns)
+
+def main():
+    test_hits_and_misses()
+    test_flags_are_part_of_key()
+    test_eviction_is_lru()
+    test_clear_resets_counters()
+    test_zero_maxsize_disables_storage()
+    test_parse_errors_are_not_cached()
+    test_front_ends_share_cache()
+    test_threaded_access()
+    print('All cache tests passed!')
+
+if __name__ == '__main__':
+    main()
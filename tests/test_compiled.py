@@ -0,0 +1,59 @@
+import sys
+import os
+import re
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import rexplain
+from rexplain.core.cache import parse_cache
+from rexplain.core.compiled import CompiledPattern, compiled_cache
+from rexplain.core.explainer import RegexExplainer
+from rexplain.core.tester import RegexTester
+
+def test_compile_returns_shared_object():
+    compiled = rexplain.compile(r'\d+-[a-z]{2}')
+    assert isinstance(compiled, CompiledPattern)
+    assert rexplain.compile(r'\d+-[a-z]{2}') is compiled
+    assert rexplain.compile(r'\d+-[a-z]{2}', re.IGNORECASE) is not compiled
+
+def test_parses_once_and_keeps_results():
+    parse_cache.clear()
+    compiled_cache.clear()
+    compiled = rexplain.compile(r'(?P<id>\d{3})-x')
+    text = compiled.explain()
+    assert compiled.explain() is text
+    assert compiled.explain(group_literals=True) is compiled.explain(group_literals=True) != text
+    assert compiled.regex is compiled.regex
+    assert compiled.generation_plan is compiled.generation_plan
+    assert compiled.steps is compiled.steps
+    for example in compiled.examples(5):
+        assert compiled.regex.fullmatch(example)
+    assert compiled.test('123-x').matches
+    assert not compiled.test('12a-x').matches
+    assert parse_cache.info().misses == 1
+
+def test_same_results_as_front_end_classes():
+    for pattern, string in [(r'abc', 'abd'), (r'[a-c]{2}x', 'abz'), (r'a.c', 'a\nc'), (r'(foo|bar)+', 'foobaz')]:
+        compiled = rexplain.compile(pattern)
+        assert compiled.explain() == RegexExplainer().explain(pattern)
+        assert compiled.test(string) == RegexTester().test(pattern, string)
+
+def test_invalid_pattern():
+    compiled = rexplain.compile('(a')
+    try:
+        compiled.test('a')
+        assert False, 'Expected re.error for invalid pattern'
+    except re.error:
+        pass
+
+def main():
+    test_compile_returns_shared_object()
+    print('test_compile_returns_shared_object passed')
+    test_parses_once_and_keeps_results()
+    print('test_parses_once_and_keeps_results passed')
+    test_same_results_as_front_end_classes()
+    print('test_same_results_as_front_end_classes passed')
+    test_invalid_pattern()
+    print('test_invalid_pattern passed')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import sys
+import os
+import re
+import time
+import itertools
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import CompiledPattern, compile_pattern
+from rexplain.core.dfa import DFA
+
+STRINGS = [''.join(t) for n in range(5) for t in itertools.product('ab\n1 中', repeat=n)]
+
+def test_agrees_with_re():
+    for pattern, flags in [(r'(a|b)*abb', 0), (r'^a+$', re.MULTILINE), (r'\ba\w*\b', 0), (r'a.b', re.DOTALL),
+                           (r'[^a]+1?', 0), (r'(?i:A)b*', 0), (r'\w+', re.ASCII), (r'\s|\d{2}', 0), (r'a$', 0)]:
+        dfa = DFA.from_nfa(compile_pattern(pattern, flags).automaton)
+        regex = re.compile(pattern, flags)
+        for s in STRINGS:
+            assert dfa.fullmatch(s) == bool(regex.fullmatch(s)), (pattern, s)
+
+def test_minimized():
+    dfa = DFA.from_nfa(compile_pattern(r'(a|b)*abb').automaton)
+    # The textbook four states plus a dead state for characters other than a and b
+    assert dfa.class_count == 3
+    assert dfa.state_count == 5
+    assert DFA.from_nfa(compile_pattern(r'(?:a|a)(?:b|b)').automaton).state_count == 4
+
+def test_new_classes_rebuild_the_tables():
+    dfa = DFA.from_nfa(compile_pattern(r'\w+').automaton)
+    classes = dfa.class_count
+    assert dfa.fullmatch('中文abc') and not dfa.fullmatch('中 文')
+    assert dfa.fullmatch('ж')
+    assert dfa.class_count == classes  # non-Latin letters share the class of 'a'
+    dfa = DFA.from_nfa(compile_pattern(r'[^中]+').automaton)
+    assert not dfa.fullmatch('a中') and dfa.fullmatch('aж')
+
+def test_state_explosion_guard():
+    automaton = compile_pattern(r'(a|b)*a(a|b){9}').automaton
+    assert DFA.from_nfa(automaton, max_states=1000) is None
+    assert DFA.from_nfa(automaton) is not None
+
+def test_catastrophic_patterns_run_in_linear_time():
+    compiled = compile_pattern(r'(a+)+$')
+    assert compiled.uses_dfa
+    assert not compile_pattern(r'\d{3}-\d{4}').uses_dfa
+    # Not only what the ReDoS screen flags
+    for pattern in [r'(.*a){6}', r'(?:\d+,?){2,5}$', r'[a-z]+@x', r'(a|ab){3}']:
+        assert compile_pattern(pattern).uses_dfa, pattern
+    start = time.perf_counter()
+    assert not compile_pattern(r'(.*a){10}').test('a' * 40 + '\n').matches
+    assert time.perf_counter() - start < 2
+    start = time.perf_counter()
+    result = compiled.test('a' * 5000 + '!')
+    assert time.perf_counter() - start < 2
+    assert not result.matches
+    batch = compiled.test_many(['a' * 40 + '!', 'aaa', ''], diagnose=False)
+    assert list(batch.matches) == [0, 1, 0]
+
+def test_construction_is_bounded():
+    # Single tests of unflagged patterns never build the DFA
+    words = '|'.join(f'w{i}x' for i in range(5000))
+    for pattern in [r'\w{1,5000}', r'.{0,2000}x', r'(?:[a-z]+,){1,500}', words]:
+        start = time.perf_counter()
+        assert not CompiledPattern(pattern).test('ab!').matches
+        assert time.perf_counter() - start < 2, pattern[:20]
+    # Building one gives up on large subsets and many transitions early
+    for pattern in [words, r'(a|b)*a(a|b){25}']:
+        automaton = CompiledPattern(pattern).automaton
+        start = time.perf_counter()
+        assert DFA.from_nfa(automaton) is None
+        assert time.perf_counter() - start < 1, pattern[:20]
+    # Long chains minimize quickly
+    start = time.perf_counter()
+    assert DFA.from_nfa(CompiledPattern(r'\w{1,5000}').automaton).state_count == 5002
+    assert time.perf_counter() - start < 2
+
+def test_match_many():
+    dfa = DFA.from_nfa(compile_pattern(r'\w+\d').automaton)
+    strings = ['ab1', 'a', '', 'x中9', 'abc', '中', '__7', 'ab 1'] * 3
+    assert dfa.match_many(strings) == [dfa.fullmatch(s) for s in strings]
+
+def test_lockstep_with_numpy():
+    pytest.importorskip("numpy")
+    dfa = DFA.from_nfa(compile_pattern(r'[a-c]+\d{2}|x\n?').automaton)
+    strings = [''.join(t) for n in range(5) for t in itertools.product('ac1x\n', repeat=n)] + ['中12', 'a中1']
+    assert dfa.match_many(strings) == [dfa.fullmatch(s) for s in strings]
+
+def main():
+    test_agrees_with_re()
+    print("test_agrees_with_re passed")
+    test_minimized()
+    print("test_minimized passed")
+    test_new_classes_rebuild_the_tables()
+    print("test_new_classes_rebuild_the_tables passed")
+    test_state_explosion_guard()
+    print("test_state_explosion_guard passed")
+    test_catastrophic_patterns_run_in_linear_time()
+    print("test_catastrophic_patterns_run_in_linear_time passed")
+    test_construction_is_bounded()
+    print("test_construction_is_bounded passed")
+    test_match_many()
+    print("test_match_many passed")
+    test_lockstep_with_numpy()
+    print("test_lockstep_with_numpy passed")
+
+if __name__ == "__main__":
+    main()
@@ -64,12 +64,47 @@ def test_explain_quantifiers():
     # Accept both the new and fallback output
     assert r"\d{2,4} - matches a digit character 2 to 4 times" in result or r"\d{2,4}" in result or "digit character" in result
 
+def test_explain_quantifier_bounds():
+    parser = RegexParser()
+    result = explain(parser.parse(r'\w+x{2,}?(ab){3}'))
+    print('Explanation:', result)
+    assert r"\w+ - matches a word character one or more times (greedy)" in result
+    assert "x{2,}? - matches the character 'x' (ASCII 120) literally (case sensitive) at least 2 times (non-greedy)" in result
+    assert "a capturing group repeated exactly 3 times (greedy) containing:" in result
+
+def test_explain_literal_runs():
+    parser = RegexParser()
+    ast = parser.parse(r'GET /api.', coalesce_literals=True)
+    result = explain(ast)
+    assert result.startswith("G - matches the character 'G'")
+    assert len(result.splitlines()) == 9
+    grouped = explain(ast, group_literals=True)
+    print('Explanation:', grouped)
+    assert grouped.splitlines() == [
+        "GET /api - matches the text 'GET /api' literally (case sensitive)",
+        ". - matches any character except a newline",
+    ]
+
+def test_explain_deep_nesting():
+    depth = 3000
+    result = explain(RegexParser().parse('(a' * depth + ')' * depth))
+    assert result.count('a capturing group containing:') == depth
+    assert result.count("a - matches the character 'a'") == depth
+
+def test_explain_empty_alternative():
+    result = explain(RegexParser().parse('a|'))
+    assert result == "a - matches the character 'a' (ASCII 97) literally (case sensitive)"
+
 def main():
     test_explain_basic()
     test_explain_named_group()
     test_explain_lookahead()
     test_explain_inline_flags()
     test_explain_quantifiers()
+    test_explain_quantifier_bounds()
+    test_explain_literal_runs()
+    test_explain_deep_nesting()
+    test_explain_empty_alternative()
     print('All explainer tests passed!')
 
 if __name__ == '__main__':
@@ -1,9 +1,10 @@
 import sys
 import os
 import re
+import random
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from rexplain.core.generator import ExampleGenerator
+from rexplain.core.generator import ExampleGenerator, generate_parallel
 
 def assert_examples_match(pattern, examples):
     prog = re.compile(pattern)
@@ -100,6 +101,68 @@ def test_edge_cases():
     examples = gen.generate(pattern, 3)
     assert_examples_match(pattern, examples)
 
+def test_literal_run_and_dot():
+    gen = ExampleGenerator()
+    pattern = r'GET /api/v1\.json.'
+    examples = gen.generate(pattern, 10)
+    assert_examples_match(pattern, examples)
+    assert all(ex.startswith('GET /api/v1.json') for ex in examples)
+
+def test_deep_nesting():
+    gen = ExampleGenerator()
+    depth = 3000
+    examples = gen.generate('(?:a' * depth + ')' * depth, 2)
+    assert examples == ['a' * depth] * 2
+
+def test_huge_alternation_is_parsed_lazily():
+    from rexplain.core.cache import cached_parse
+    gen = ExampleGenerator()
+    pattern = '|'.join(f'word{i}' for i in range(5000))
+    examples = gen.generate(pattern, 5)
+    assert_examples_match(pattern, examples)
+    examples = gen.generate(pattern, 5000 + 1)
+    assert_examples_match(pattern, examples[:20])
+    assert cached_parse(pattern).options.parsed_count < 5000
+
+def test_plan_is_compiled_once():
+    gen = ExampleGenerator()
+    plan = gen.plan(gen.parser.parse(r'[a-c]{2}\d[^a-y]+'))
+    # Sampling only draws from the prebuilt candidates (alternation options
+    # aside, which are compiled when first picked)
+    gen._parse_char_class = None
+    gen._quant_bounds = None
+    examples = gen.generate_from_plan(plan, 20)
+    assert_examples_match(r'[a-c]{2}\d[^a-y]+', examples)
+
+def test_seed():
+    # Seeded generators repeat themselves and leave the global stream alone
+    pattern = r'(ab|c)+\d{2,4}'
+    random.seed(1)
+    before = random.random()
+    random.seed(1)
+    first = ExampleGenerator(seed=5).generate(pattern, 300)
+    assert random.random() == before
+    assert ExampleGenerator(seed=5).generate(pattern, 300) == first
+    assert ExampleGenerator(seed=6).generate(pattern, 300) != first
+    assert_examples_match(pattern, first)
+
+def test_parallel_is_independent_of_processes():
+    pattern = r'[a-f]{2,6}-(x|y\d)'
+    serial = list(generate_parallel(pattern, 2500, seed=9, block_size=300))
+    assert len(serial) == 2500
+    assert_examples_match(pattern, serial)
+    assert list(generate_parallel(pattern, 2500, processes=3, seed=9, block_size=300)) == serial
+    # Blocks draw from separate streams
+    assert serial[:300] != serial[300:600]
+    assert list(generate_parallel(pattern, 0, seed=9)) == []
+    for kwargs in ({'block_size': 0}, {'processes': 0}):
+        try:
+            generate_parallel(pattern, 10, **kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(kwargs)
+
 def main():
     test_literal()
     print('test_literal passed')
@@ -119,6 +182,18 @@ def main():
     print('test_unicode_hex passed')
     test_edge_cases()
     print('test_edge_cases passed')
+    test_literal_run_and_dot()
+    print('test_literal_run_and_dot passed')
+    test_deep_nesting()
+    print('test_deep_nesting passed')
+    test_huge_alternation_is_parsed_lazily()
+    print('test_huge_alternation_is_parsed_lazily passed')
+    test_plan_is_compiled_once()
+    print('test_plan_is_compiled_once passed')
+    test_seed()
+    print('test_seed passed')
+    test_parallel_is_independent_of_processes()
+    print('test_parallel_is_independent_of_processes passed')
     print('All generator tests passed!')
 
 if __name__ == '__main__':
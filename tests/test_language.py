@@ -0,0 +1,140 @@
+import sys
+import os
+import re
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.generator import ExampleGenerator, generate_parallel
+from rexplain.core.language import Language
+
+def test_counts_distinct_strings():
+    # Ambiguous patterns count each string once
+    for pattern, size in [(r'abc', 1), (r'', 1), (r'a*a*', 9), (r'(a|a)b?', 2), (r'[A-C]{2}\d', 90),
+                          (r'(ab|a)(b|)c?', 6), (r'\d{0,3}', 1111), (r'(a{0,2}){0,2}', 5), (r'[aab]{1,2}', 6)]:
+        assert compile_pattern(pattern).language.size == size, pattern
+    assert compile_pattern(r'[A-Z]{2}\d{6}').language.size == 26 ** 2 * 10 ** 6
+    assert compile_pattern(r'\w{8}').language.size == 63 ** 8
+
+def test_rank_and_unrank():
+    gen = ExampleGenerator()
+    for pattern in [r'(cat|dog)s?|bird', r'x[^a-y]?', r'a*a*', r'^x+$', r'(ab|a)(b|)c?']:
+        language = compile_pattern(pattern).language
+        strings = [language.unrank(i) for i in range(language.size)]
+        assert strings == sorted(set(strings)), pattern
+        assert [language.rank(s) for s in strings] == list(range(language.size))
+        assert set(gen.generate(pattern, 500)) <= set(strings)
+    language = compile_pattern(r'[A-Z]{2}\d{6}').language
+    assert language.unrank(0) == 'AA000000'
+    assert language.unrank(language.size - 1) == 'ZZ999999'
+    assert language.rank('AB000001') == 1000001
+    assert 'AB12' not in language
+    for bad in ['AB12', 'ab000000', 'AB0000001']:
+        try:
+            language.rank(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(bad)
+    try:
+        language.unrank(language.size)
+    except IndexError:
+        pass
+    else:
+        raise AssertionError('unrank past the end')
+
+def test_unique_examples():
+    examples = ExampleGenerator(seed=3).generate(r'[a-c]\d', 30, unique=True)
+    assert len(set(examples)) == 30
+    assert all(re.fullmatch(r'[a-c]\d', ex) for ex in examples)
+    assert ExampleGenerator(seed=3).generate(r'[a-c]\d', 30, unique=True) == examples
+    # Anchored patterns used to repeat one example
+    assert sorted(compile_pattern(r'^x{1,3}$').examples(3, unique=True)) == ['x', 'xx', 'xxx']
+    keys = compile_pattern(r'[A-Z]{2}\d{6}').examples(20000, seed=1, unique=True)
+    assert len(set(keys)) == 20000
+    try:
+        compile_pattern(r'[ab]{2}').examples(5, unique=True)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('more unique examples than the language has')
+
+def test_unique_parallel_blocks_do_not_overlap():
+    pattern = r'[a-d]{4}'
+    serial = list(generate_parallel(pattern, 256, seed=4, block_size=50, unique=True))
+    assert len(set(serial)) == 256 == compile_pattern(pattern).language.size
+    assert list(generate_parallel(pattern, 256, processes=2, seed=4, block_size=50, unique=True)) == serial
+    try:
+        generate_parallel(pattern, 257, unique=True)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('more unique examples than the language has')
+
+def test_counts_by_length():
+    language = compile_pattern(r'\d{0,3}x?').language
+    assert language.length_counts == (1, 11, 110, 1100, 1000)
+    assert language.count(2) == 110
+    assert language.count((1, 3)) == 1221
+    assert language.count(9) == 0
+    # Every string of a length range, each once
+    for pattern in [r'(cat|dog)s?|bird', r'a*a*', r'(ab|a)(b|)c?', r'[a-c]{1,4}|z+']:
+        language = compile_pattern(pattern).language
+        strings = [language.unrank(i) for i in range(language.size)]
+        for lo, hi in [(0, 0), (1, 2), (2, 5), (3, 3)]:
+            wanted = sorted(s for s in strings if lo <= len(s) <= hi)
+            assert sorted(language.sample(language.count((lo, hi)), length=(lo, hi))) == wanted
+    for bad in [-1, (3, 2)]:
+        try:
+            language.count(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(bad)
+
+def test_uniform_by_length():
+    # The generator favours the short branch; length-targeted draws do not
+    examples = compile_pattern(r'(a|bcdefgh)+').examples(4000, seed=1, length=8)
+    assert set(examples) == {'abcdefgh', 'bcdefgha'}
+    assert 1800 < examples.count('abcdefgh') < 2200
+    examples = ExampleGenerator(seed=2).generate(r'[a-z]{1,6}\d?', 500, length=(6, 7))
+    assert all(6 <= len(ex) <= 7 and re.fullmatch(r'[a-z]{1,6}\d?', ex) for ex in examples)
+    serial = list(generate_parallel(r'\w{2,9}', 300, seed=5, block_size=70, length=4))
+    assert all(len(ex) == 4 for ex in serial)
+    assert list(generate_parallel(r'\w{2,9}', 300, processes=2, seed=5, block_size=70, length=4)) == serial
+    for call in [lambda: compile_pattern(r'ab').examples(3, length=5),
+                 lambda: generate_parallel(r'ab', 3, length=5),
+                 lambda: compile_pattern(r'a{1,3}').examples(4, unique=True, length=(1, 3))]:
+        try:
+            call()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('impossible length accepted')
+
+def test_state_limit():
+    try:
+        Language(compile_pattern(r'.{0,8}x.{8}').generation_plan, max_states=50)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('state limit not enforced')
+
+def main():
+    test_counts_distinct_strings()
+    print("test_counts_distinct_strings passed")
+    test_rank_and_unrank()
+    print("test_rank_and_unrank passed")
+    test_unique_examples()
+    print("test_unique_examples passed")
+    test_unique_parallel_blocks_do_not_overlap()
+    print("test_unique_parallel_blocks_do_not_overlap passed")
+    test_counts_by_length()
+    print("test_counts_by_length passed")
+    test_uniform_by_length()
+    print("test_uniform_by_length passed")
+    test_state_limit()
+    print("test_state_limit passed")
+
+if __name__ == "__main__":
+    main()
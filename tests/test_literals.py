@@ -0,0 +1,67 @@
+import sys
+import os
+import re
+import itertools
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.literals import RequiredLiterals, NO_LITERALS
+from rexplain.core.tester import longest_matching_prefix
+
+def test_required_literals():
+    cases = [
+        (r'^\d+ ERROR .*timeout', RequiredLiterals(None, '', 'timeout', (' ERROR ',))),
+        (r'foo\.bar', RequiredLiterals('foo.bar', 'foo.bar', 'foo.bar', ())),
+        (r'GET /api/(users|items)/\d+', RequiredLiterals(None, 'GET /api/', '', ('s/',))),
+        (r'(foo|bar)baz', RequiredLiterals(None, '', 'baz', ())),
+        (r'(ab)+c', RequiredLiterals(None, 'ab', 'abc', ())),
+        (r'a{3,5}b', RequiredLiterals(None, 'aaa', 'aaab', ())),
+        (r'[a-z]+@example\.com', RequiredLiterals(None, '', '@example.com', ())),
+        (r'\d+', NO_LITERALS),
+        (r'x(?i:abc)y', RequiredLiterals(None, 'x', 'y', ())),
+    ]
+    for pattern, expected in cases:
+        assert compile_pattern(pattern).literals == expected, pattern
+
+def test_flags():
+    assert compile_pattern(r'foo', re.IGNORECASE).literals == NO_LITERALS
+    assert compile_pattern(r'(?i)foo').literals == NO_LITERALS
+    # The stdlib backend drops whitespace under re.VERBOSE, as re does
+    assert compile_pattern(r'a b  c', re.VERBOSE).literals.literal == 'abc'
+    assert compile_pattern(r'^foo$', re.MULTILINE).literals.literal is None
+
+def test_matcher_agrees_with_re():
+    strings = [''.join(t) for n in range(6) for t in itertools.product('ab\n', repeat=n)]
+    for pattern in [r'ab', r'a(?=b)b', r'(a|ab)b+', r'^a.*b$', r'(?:ab){2}', r'(a)\1b', r'a\b', r'(?<=a)b|ab',
+                    r'(a|b)a\nb?', r'a{0}b', r'(a)?(?(1)b|a)b']:
+        compiled = compile_pattern(pattern)
+        for s in strings:
+            assert compiled.matcher(s) == bool(compiled.regex.fullmatch(s)), (pattern, s)
+
+def test_test_uses_the_prefilter():
+    compiled = compile_pattern(r'\d+ ERROR .*')
+    result = compiled.test('12 INFO ok')
+    assert not result.matches and result.failed_at == 3
+    assert compiled.test('12 ERROR boom').matches
+
+def test_longest_matching_prefix_is_bounded_by_literals():
+    compiled = compile_pattern(r'(\w+)\1:')
+    assert compiled.automaton is None
+    assert longest_matching_prefix(compiled, 'abab:x') == 5
+    assert longest_matching_prefix(compiled, 'abab' * 5000) == 0
+    assert longest_matching_prefix(compile_pattern('abc'), 'abcd') == 3
+
+def main():
+    test_required_literals()
+    print("test_required_literals passed")
+    test_flags()
+    print("test_flags passed")
+    test_matcher_agrees_with_re()
+    print("test_matcher_agrees_with_re passed")
+    test_test_uses_the_prefilter()
+    print("test_test_uses_the_prefilter passed")
+    test_longest_matching_prefix_is_bounded_by_literals()
+    print("test_longest_matching_prefix_is_bounded_by_literals passed")
+
+if __name__ == "__main__":
+    main()
@@ -242,6 +242,198 @@ def test_parse_nested_groups_and_alternation():
     assert isinstance(ast.children[0], Alternation)
     print('test_parse_nested_groups_and_alternation passed')
 
+def test_tokenize_negative_lookarounds():
+    parser = RegexParser()
+    tokens = parser.tokenize(r'(?!a)(?<!b)')
+    expected = [
+        RegexToken(type='GROUP_NEG_LOOKAHEAD', value='(?!'),
+        RegexToken(type='LITERAL', value='a'),
+        RegexToken(type='GROUP_CLOSE', value=')'),
+        RegexToken(type='GROUP_NEG_LOOKBEHIND', value='(?<!'),
+        RegexToken(type='LITERAL', value='b'),
+        RegexToken(type='GROUP_CLOSE', value=')'),
+    ]
+    assert tokens == expected, f"Expected {expected}, got {tokens}"
+
+def test_token_stream_arrays():
+    from rexplain.core.parser import TOKEN_TYPES, TOK_LITERAL, TOK_QUANTIFIER, TOK_CHAR_CLASS
+    parser = RegexParser()
+    pattern = r'ab[cd]{2}'
+    tokens = parser.tokenize(pattern)
+    assert list(tokens.kinds) == [TOK_LITERAL, TOK_LITERAL, TOK_CHAR_CLASS, TOK_QUANTIFIER]
+    assert list(tokens.starts) == [0, 1, 2, 6]
+    assert list(tokens.ends) == [1, 2, 6, 9]
+    assert len(tokens) == 4
+    assert tokens[2] == RegexToken(type='CHAR_CLASS', value='[cd]')
+    assert tokens[-1].type == TOKEN_TYPES[TOK_QUANTIFIER] and tokens[-1].value == '{2}'
+
+def test_nodes_are_frozen_and_hashable():
+    import dataclasses
+    parser = RegexParser()
+    ast = parser.parse(r'(a|b)+\d')
+    assert hash(ast) == hash(parser.parse(r'(a|b)+\d'))
+    assert not hasattr(ast, '__dict__')
+    try:
+        ast.elements = ()
+        assert False, 'Expected nodes to be immutable'
+    except dataclasses.FrozenInstanceError:
+        pass
+    assert {ast: 1}[parser.parse(r'(a|b)+\d')] == 1
+
+def test_leaves_are_interned():
+    parser = RegexParser()
+    first = parser.parse(r'a\d')
+    second = parser.parse(r'\da')
+    assert first.elements[0] is second.elements[1]
+    assert first.elements[1] is second.elements[0]
+
+def test_quantifier_bounds():
+    from rexplain.core.parser import Quantifier, parse_quantifier
+    parser = RegexParser()
+    cases = {
+        'a*': (0, None, True),
+        'a+?': (1, None, False),
+        'a?': (0, 1, True),
+        'a??': (0, 1, False),
+        'a{3}': (3, 3, True),
+        'a{2,}': (2, None, True),
+        'a{,4}': (0, 4, True),
+        'a{2,5}?': (2, 5, False),
+    }
+    for pattern, bounds in cases.items():
+        node = parser.parse(pattern)
+        assert isinstance(node, Quantifier), f"Expected Quantifier for {pattern}, got {node}"
+        assert (node.min, node.max, node.greedy) == bounds, f"{pattern}: {node}"
+    assert Quantifier(parser.parse('a'), '{1,2}') == parser.parse('a{1,2}')
+    assert parse_quantifier('{x}') == (1, 1, True)
+
+def test_parse_coalesce_literals():
+    from rexplain.core.parser import Sequence, Literal, LiteralRun, AnyChar, Quantifier
+    parser = RegexParser()
+    ast = parser.parse(r'GET /api\.v1.x*(ab)', coalesce_literals=True)
+    assert isinstance(ast, Sequence)
+    assert ast.elements[0] == LiteralRun('GET /api.v1')
+    assert isinstance(ast.elements[1], AnyChar)
+    assert isinstance(ast.elements[2], Quantifier) and ast.elements[2].child == Literal('x')
+    assert ast.elements[3].children[0] == LiteralRun('ab')
+    # A whole-literal pattern collapses to a single run
+    assert parser.parse('abc', coalesce_literals=True) == LiteralRun('abc')
+    # Without the option every character stays a separate Literal
+    assert parser.parse('abc') == Sequence([Literal('a'), Literal('b'), Literal('c')])
+
+def test_parse_deep_nesting():
+    from rexplain.core.parser import Group, Sequence
+    depth = 5000
+    parser = RegexParser()
+    ast = parser.parse('(?:a' * depth + 'b' + ')' * depth)
+    levels = 0
+    node = ast
+    while isinstance(node, Group):
+        levels += 1
+        node = node.children[0].elements[1] if isinstance(node.children[0], Sequence) else node.children[0]
+    assert levels == depth
+    try:
+        parser.parse('(' * depth)
+        assert False, 'Expected ValueError for unclosed group'
+    except ValueError as e:
+        assert 'Unclosed group' in str(e)
+
+def test_parse_lazy_alternation():
+    from rexplain.core.parser import Alternation, LazyOptions
+    parser = RegexParser()
+    pattern = r'foo|b(a|r)|[|]|\\|x'
+    ast = parser.parse(pattern, lazy_alternation=True)
+    assert isinstance(ast, Alternation) and isinstance(ast.options, LazyOptions)
+    assert len(ast.options) == 5 and ast.options.parsed_count == 0
+    assert ast.options[1] == parser.parse('b(a|r)')
+    assert ast.options.parsed_count == 1
+    # Iterating or comparing gives the same tree as an eager parse
+    assert ast == parser.parse(pattern)
+    assert ast.options.parsed_count == 5
+    # Patterns without a top-level '|' are parsed eagerly
+    assert parser.parse('(a|b)c', lazy_alternation=True) == parser.parse('(a|b)c')
+    # Syntax errors inside a branch surface on first access
+    ast = parser.parse('a|[b', lazy_alternation=True)
+    try:
+        ast.options[1]
+        assert False, 'Expected ValueError for unclosed character class'
+    except ValueError as e:
+        assert 'Unclosed character class' in str(e)
+
+def test_token_offsets():
+    tokens = RegexParser().tokenize(r'(?:a\d)+')
+    assert [(t.start, t.end) for t in tokens] == [(0, 3), (3, 4), (4, 6), (6, 7), (7, 8)]
+    assert tokens[2].start == 4 and tokens[2].end == 6
+    # Offsets do not take part in comparisons
+    assert tokens[1] == RegexToken(type='LITERAL', value='a')
+
+def test_iter_spans():
+    from rexplain.core.parser import iter_spans
+    pattern = r'^(?P<year>\d{4})-(a|\.b)*$'
+    ast = RegexParser().parse(pattern, coalesce_literals=True)
+    assert ast.width == len(pattern)
+    spans = [(type(node).__name__, pattern[start:end]) for node, start, end in iter_spans(ast)]
+    assert spans == [
+        ('Sequence', pattern),
+        ('Anchor', '^'),
+        ('Group', r'(?P<year>\d{4})'),
+        ('Quantifier', r'\d{4}'),
+        ('Escape', r'\d'),
+        ('Literal', '-'),
+        ('Quantifier', r'(a|\.b)*'),
+        ('Group', r'(a|\.b)'),
+        ('Alternation', r'a|\.b'),
+        ('Literal', 'a'),
+        ('LiteralRun', r'\.b'),
+        ('Anchor', '$'),
+    ]
+
+def test_reparse():
+    from rexplain.core.parser import iter_spans, TextEdit
+    parser = RegexParser()
+    def check(pattern, edit):
+        old = parser.parse(pattern)
+        new_pattern = pattern[:edit.start] + edit.text + pattern[edit.end:]
+        new = parser.reparse(old, edit, new_pattern)
+        expected = parser.parse(new_pattern)
+        assert new == expected
+        assert list(iter_spans(new)) == list(iter_spans(expected))
+        return old, new
+    # Typing inside a group rebuilds that group only; its siblings are reused
+    old, new = check(r'(ab)c(?:d|e)', TextEdit(2, 2, 'x'))
+    assert new.elements[1] is old.elements[1] and new.elements[2] is old.elements[2]
+    old, new = check(r'x(?:d|(e))y', TextEdit(7, 8, 'ee'))
+    assert new.elements[0] is old.elements[0]
+    # Edits that change the structure around the group fall back to a full parse
+    check(r'(ab)c', TextEdit(1, 1, '?:'))
+    check(r'(ab)c', TextEdit(2, 2, ')('))
+    check(r'(ab)c', TextEdit(2, 2, '\\'))
+    check(r'(ab)c])', TextEdit(2, 2, '['))
+    check(r'abc', TextEdit(1, 2, ''))
+    try:
+        parser.reparse(parser.parse('(ab)'), TextEdit(2, 2, '('), '(a(b)')
+        assert False, 'Expected ValueError for unclosed group'
+    except ValueError as e:
+        assert 'Unclosed group' in str(e)
+
+def test_stdlib_backend():
+    import re
+    parser = RegexParser()
+    for pattern in [r'^(?P<year>\d{4})-(?:a|bc)*?$', r'(?<!x)foo(?!bar)[^a-z\d]+', r'(?i)abc', r'(a)\1', r'\.\n']:
+        for coalesce in (False, True):
+            assert parser.parse(pattern, coalesce_literals=coalesce, backend='stdlib') == \
+                parser.parse(pattern, coalesce_literals=coalesce)
+    # The stdlib backend honours flags: whitespace and comments are ignored under re.VERBOSE
+    assert parser.parse('a b  # comment', re.VERBOSE, backend='stdlib') == parser.parse('ab')
+    # re's own rewrites are kept, e.g. single-character alternatives become a class
+    assert parser.parse('a|b', backend='stdlib') == parser.parse('[ab]')
+    for pattern, backend in (('(a', 'stdlib'), ('a', 'pcre')):
+        try:
+            parser.parse(pattern, backend=backend)
+            assert False, 'Expected ValueError'
+        except ValueError:
+            pass
+
 def main():
     test_tokenize_basic()
     print('test_tokenize_basic passed')
@@ -277,6 +469,30 @@ def main():
     test_parse_invalid_escape()
     print('test_parse_invalid_escape passed')
     test_parse_nested_groups_and_alternation()
+    test_tokenize_negative_lookarounds()
+    print('test_tokenize_negative_lookarounds passed')
+    test_token_stream_arrays()
+    print('test_token_stream_arrays passed')
+    test_nodes_are_frozen_and_hashable()
+    print('test_nodes_are_frozen_and_hashable passed')
+    test_leaves_are_interned()
+    print('test_leaves_are_interned passed')
+    test_quantifier_bounds()
+    print('test_quantifier_bounds passed')
+    test_parse_coalesce_literals()
+    print('test_parse_coalesce_literals passed')
+    test_parse_deep_nesting()
+    print('test_parse_deep_nesting passed')
+    test_parse_lazy_alternation()
+    print('test_parse_lazy_alternation passed')
+    test_token_offsets()
+    print('test_token_offsets passed')
+    test_iter_spans()
+    print('test_iter_spans passed')
+    test_reparse()
+    print('test_reparse passed')
+    test_stdlib_backend()
+    print('test_stdlib_backend passed')
     print('All tests passed!')
 
 if __name__ == '__main__':
@@ -0,0 +1,69 @@
+import sys
+import os
+import re
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import rexplain
+from rexplain.core.cache import parse_cache
+from rexplain.core.compiled import compiled_cache
+from rexplain.core.patternset import PatternSet, SetMatch, MAX_SUBSTRING_CHECKS
+
+PATTERNS = [r'ab+c', r'foo\d+', r'(x|y)z', r'\d+', r'^a.*b$', r'(?i)AB', r'a(?=bc)', r'(?<=q)r',
+            r'(cat|dog)s?', r'', r'\bend\b', r'x{3}', r'[a-c]+q']
+
+def test_agrees_with_re():
+    rng = random.Random(0)
+    small = PatternSet(PATTERNS, re.MULTILINE)
+    # Enough literals for the Aho-Corasick index
+    words = [f"w{i}x" for i in range(MAX_SUBSTRING_CHECKS + 10)]
+    large = PatternSet(PATTERNS + [rf'{w}\d?' for w in words], re.MULTILINE)
+    assert large._automaton is not None and small._automaton is None
+    for patterns in (small, large):
+        for _ in range(1000):
+            text = ''.join(rng.choice(['a', 'b', 'c', 'q', 'r', 'x', 'z', '1', ' ', '\n', 'end', 'dog', 'w5x', 'w51'])
+                           for _ in range(rng.randint(0, 8)))
+            expected = [(i, m.span()) for i, p in enumerate(patterns.patterns)
+                        for m in [re.search(p, text, re.MULTILINE)] if m]
+            assert [(m.index, m.span) for m in patterns.search(text)] == expected, text
+            expected = [i for i, p in enumerate(patterns.patterns) if re.fullmatch(p, text, re.MULTILINE)]
+            assert [m.index for m in patterns.fullmatch(text)] == expected, text
+
+def test_candidates():
+    patterns = PatternSet([r'\d+ ERROR .*timeout', r'GET /api/\w+', r'\d+ms', r'(?i)warn'])
+    # \d+ms is indexed by its suffix
+    assert patterns.unindexed == (3,)
+    assert patterns.candidates('12 INFO ok') == [3]
+    assert patterns.candidates('GET /api/users took 5ms') == [1, 2, 3]
+    assert patterns.search('GET /api/users took 5ms') == [
+        SetMatch(1, r'GET /api/\w+', (0, 14)), SetMatch(2, r'\d+ms', (20, 23)),
+    ]
+
+def test_leaves_shared_caches_alone():
+    before = (parse_cache.info(), compiled_cache.info())
+    patterns = PatternSet([rf'(\w+{i}x)+\d*' for i in range(2000)] + PATTERNS)
+    assert [m.index for m in patterns.fullmatch('ab7x12x3')] == [2, 12]
+    assert patterns.search('foo12')
+    assert (parse_cache.info(), compiled_cache.info()) == before
+
+def test_top_level_and_errors():
+    assert len(rexplain.PatternSet(['a', 'b'])) == 2
+    try:
+        PatternSet(['a', '(b'])
+    except re.error:
+        pass
+    else:
+        assert False, "expected re.error"
+
+def main():
+    test_agrees_with_re()
+    print("test_agrees_with_re passed")
+    test_candidates()
+    print("test_candidates passed")
+    test_leaves_shared_caches_alone()
+    print("test_leaves_shared_caches_alone passed")
+    test_top_level_and_errors()
+    print("test_top_level_and_errors passed")
+
+if __name__ == "__main__":
+    main()
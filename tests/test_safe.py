@@ -0,0 +1,83 @@
+import sys
+import os
+import re
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.compiled import compile_pattern
+from rexplain.core.safe import safe_stats
+from rexplain.core.tester import RegexTester
+
+def test_regular_patterns_use_the_automaton():
+    safe_stats.clear()
+    tester = RegexTester()
+    start = time.perf_counter()
+    # Exponential for re, linear for the automaton
+    result = tester.test(r'(a+)+$', 'a' * 40 + '!', timeout=1)
+    assert time.perf_counter() - start < 1
+    assert not result.timed_out and result.failed_at == 40
+    for pattern, string in [(r'\d{3}-[a-z]+', '123-ab'), (r'(foo|bar)+', 'foobaz'), (r'abc', 'ab')]:
+        assert tester.test(pattern, string, timeout=1) == tester.test(pattern, string)
+    assert safe_stats.info() == (4, 4, 0, 0)
+
+def test_other_patterns_run_in_a_killable_worker():
+    safe_stats.clear()
+    tester = RegexTester()
+    assert tester.test(r'(a)\1b', 'aab', timeout=5) == tester.test(r'(a)\1b', 'aab')
+    start = time.perf_counter()
+    # Ends with the required 'b', so only the regex engine can reject it
+    result = tester.test(r'(a+)+\1b', 'a' * 40 + '!b', timeout=0.3)
+    assert time.perf_counter() - start < 2
+    assert result.timed_out and not result.matches
+    assert 'catastrophic' in result.reason
+    assert safe_stats.info() == (2, 0, 2, 1)
+
+def test_workers_are_reused():
+    tester = RegexTester()
+    tester.test(r'(?=a)a', 'a', timeout=5)  # a worker is started at most once here
+    for _ in range(3):
+        start = time.perf_counter()
+        result = tester.test(r'(?=a)a', 'a', timeout=0.1)
+        assert not result.timed_out and result.matches
+        assert time.perf_counter() - start < 0.1
+    # A killed worker is replaced, and waiting for the replacement costs no budget
+    assert tester.test(r'(a+)+\1b', 'a' * 40 + '!b', timeout=0.1).timed_out
+    assert tester.test(r'(a)\1', 'aa', timeout=0.1).matches
+
+def test_automaton_deadline():
+    automaton = compile_pattern(r'(a|b)*c').automaton
+    try:
+        automaton.trace('ab' * 5000, deadline=time.perf_counter() - 1)
+        assert False, 'Expected TimeoutError'
+    except TimeoutError:
+        pass
+    result = compile_pattern(r'(a|b)*c').test('ab' * 5000 + 'c', timeout=0.000001)
+    assert result.timed_out
+
+def test_invalid_arguments():
+    try:
+        RegexTester().test('a', 'a', timeout=0)
+        assert False, 'Expected ValueError'
+    except ValueError:
+        pass
+    try:
+        RegexTester().test('(a', 'a', timeout=1)
+        assert False, 'Expected re.error for invalid pattern'
+    except re.error:
+        pass
+
+def main():
+    test_regular_patterns_use_the_automaton()
+    print('test_regular_patterns_use_the_automaton passed')
+    test_other_patterns_run_in_a_killable_worker()
+    print('test_other_patterns_run_in_a_killable_worker passed')
+    test_workers_are_reused()
+    print('test_workers_are_reused passed')
+    test_automaton_deadline()
+    print('test_automaton_deadline passed')
+    test_invalid_arguments()
+    print('test_invalid_arguments passed')
+    print('All safe mode tests passed!')
+
+if __name__ == '__main__':
+    main()
@@ -108,6 +108,98 @@ def test_flag_sensitive_match():
     assert result.matches is True
     print('test_flag_sensitive_match passed')
 
+def test_literal_run_failures():
+    tester = RegexTester()
+    pattern = 'GET /api/v1/'
+    result = tester.test(pattern, 'GET /api/v2/')
+    assert result.failed_at == 10
+    assert result.partial_matches == ['GET /api/v']
+    assert "expected literal '1', got '2'" in result.reason
+    result = tester.test(pattern, 'GET /ap')
+    assert result.failed_at == 7
+    assert 'too short' in result.reason
+    result = tester.test(pattern + '[0-9]', 'GET /api/v1/x')
+    assert result.failed_at == 12
+    assert 'expected character in [0-9]' in result.reason
+    print('test_literal_run_failures passed')
+
+def test_longest_matching_prefix():
+    import re
+    from rexplain.core.compiled import compile_pattern
+    from rexplain.core.tester import longest_matching_prefix
+    patterns = [r'[a-z]+\d', r'(ab|a)*c?', r'^\w+$', r'a$\n?', r'(?m)^a$\n^b', r'\bab\b ?',
+                r'(?i)x{1,3}y', r'.*\.py', r'(?s).*\.py', r'\d+(\.\d+)?\Z', r'(a)\1b']
+    strings = ['', 'a', 'ab', 'abab1', 'aaac', 'a\n', 'a\nb', 'ab ab', 'XXxy', 'x.py\n.py', '1.5.', 'aab']
+    for pattern in patterns:
+        compiled = compile_pattern(pattern)
+        for s in strings:
+            expected = 0
+            for i in range(1, len(s) + 1):
+                if re.fullmatch(pattern, s[:i]):
+                    expected = i
+            assert longest_matching_prefix(compiled, s) == expected, (pattern, s)
+    # Backreferences are not regular and take the fullmatch fallback
+    assert compile_pattern(r'(a)\1b').automaton is None
+    assert compile_pattern(r'[a-z]+\d').automaton is not None
+    print('test_longest_matching_prefix passed')
+
+def test_diagnostics_inside_groups():
+    tester = RegexTester()
+    result = tester.test(r'(\d+)-([a-z]{2})x', '123-a1')
+    assert result.failed_at == 5
+    assert result.partial_matches == ['123-a']
+    assert "expected character in [a-z], got '1'" in result.reason
+    result = tester.test(r'(foo|bar)+', 'foobaz')
+    assert result.failed_at == 5
+    assert "expected literal 'r', got 'z'" in result.reason
+    result = tester.test(r'ab|cd', 'x')
+    assert "expected literal 'a' or literal 'c'" in result.reason
+    result = tester.test(r'\d{3}-\d{4}', '555-12')
+    assert result.failed_at == 6 and 'too short' in result.reason
+    result = tester.test(r'(ab)+', 'ababc')
+    assert result.failed_at == 4 and "expected literal 'a', got 'c'" in result.reason
+    result = tester.test(r'(ab)+$', 'abab!')
+    assert result.failed_at == 4 and "expected literal 'a' or $, got '!'" in result.reason
+    result = tester.test(r'(ab)+', 'abab\n')
+    assert "String too long: extra input '\n'" not in result.reason
+    result = tester.test(r'a.c', 'a\nc')
+    assert result.failed_at == 1 and 'any character except a newline' in result.reason
+    print('test_diagnostics_inside_groups passed')
+
+def test_trace_spans():
+    from rexplain.core.compiled import compile_pattern
+    trace = compile_pattern(r'(\d+)-([a-z]{2})').trace('123-ab')
+    assert trace.failed_at is None and trace.expected == ()
+    spans = [(type(node).__name__, start, end) for node, start, end in trace.spans]
+    assert ('Group', 0, 3) in spans and ('Literal', 3, 4) in spans and ('Group', 4, 6) in spans
+    trace = compile_pattern(r'x(?:ab|ac)').trace('xad')
+    assert trace.failed_at == 2
+    assert [node.value for node in trace.expected] == ['[bc]']  # re factors out the 'a'
+    assert compile_pattern(r'(a)\1').trace('aa') is None
+    print('test_trace_spans passed')
+
+def test_step_plan():
+    import re
+    from rexplain.core.compiled import compile_pattern
+    from rexplain.core.tester import _char_predicate
+    classes = [r'[a-c]', r'[^a-c]', r'[a-cx-z_]', r'[\d\s]', r'[^\w.]', r'[\-\]]', r'[a]', r'[^a]',
+               r'\d', r'\W', r'\x41', r'\b', r'[\u00e0-\u00ff\d]']
+    chars = [chr(code) for code in range(0, 0x300)] + ['\u0663', '\u2003', '\uff21']
+    for text in classes:
+        accepts = _char_predicate(text)
+        regex = re.compile(text)
+        for c in chars:
+            assert accepts(c) == (regex.fullmatch(c) is not None), (text, c)
+    # A lookahead makes the pattern non-regular, so the stepwise plan is used
+    compiled = compile_pattern(r'[a-c]\d\s(?=x)')
+    assert compiled.automaton is None
+    assert compiled.step_plan is compiled.step_plan
+    result = compiled.test('b7z')
+    assert result.failed_at == 2 and "expected \\s, got 'z'" in result.reason
+    result = compiled.test('q')
+    assert result.failed_at == 0 and "expected character in [a-c], got 'q'" in result.reason
+    print('test_step_plan passed')
+
 def main():
     test_full_match()
     test_no_match()
@@ -117,6 +209,11 @@ def main():
     test_escape_fail()
     test_regex_features()
     test_flag_sensitive_match()
+    test_literal_run_failures()
+    test_longest_matching_prefix()
+    test_diagnostics_inside_groups()
+    test_trace_spans()
+    test_step_plan()
     print('All tester tests passed!')
 
 if __name__ == '__main__':
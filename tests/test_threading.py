@@ -0,0 +1,82 @@
+import sys
+import os
+import re
+import random
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rexplain.core.parser import RegexParser, TextEdit
+from rexplain.core.explainer import RegexExplainer
+from rexplain.core.generator import ExampleGenerator
+from rexplain.core.tester import RegexTester
+
+PATTERNS = [
+    r'^\d{3}-\d{4}$',
+    r'(?P<user>[a-z]+)@(?P<host>[a-z]+\.com)',
+    r'(foo|bar|baz)+?qux',
+    r'(?:a(?:b(?:c|d)*)+)?e',
+    r'[A-Z][a-z]*\s(?=\d)\d',
+    r'GET /api/v1/items/\d+',
+]
+
+def run_shared(work, threads=8, rounds=600):
+    # Run ``work(pattern)`` from many threads at once with frequent thread
+    # switches, and return the results grouped by pattern
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        jobs = [PATTERNS[i % len(PATTERNS)] for i in range(rounds)]
+        random.Random(0).shuffle(jobs)
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(work, jobs))
+    finally:
+        sys.setswitchinterval(old_interval)
+    grouped = {}
+    for pattern, result in zip(jobs, results):
+        grouped.setdefault(pattern, []).append(result)
+    return grouped
+
+def test_shared_parser():
+    parser = RegexParser()
+    expected = {p: RegexParser().parse(p, coalesce_literals=True) for p in PATTERNS}
+    for pattern, results in run_shared(lambda p: parser.parse(p, coalesce_literals=True)).items():
+        assert all(r == expected[pattern] for r in results)
+
+def test_shared_parser_reparse():
+    parser = RegexParser()
+    def work(pattern):
+        old = parser.parse(pattern)
+        at = pattern.index('(') + 2 if '(' in pattern else 0
+        new = pattern[:at] + 'x' + pattern[at:]
+        return parser.reparse(old, TextEdit(at, at, 'x'), new) == parser.parse(new)
+    for results in run_shared(work).values():
+        assert all(results)
+
+def test_shared_explainer_and_tester():
+    explainer = RegexExplainer()
+    tester = RegexTester()
+    expected = {p: RegexExplainer().explain(p) for p in PATTERNS}
+    for pattern, results in run_shared(explainer.explain).items():
+        assert all(r == expected[pattern] for r in results)
+    for pattern, results in run_shared(lambda p: tester.test(p, 'GET /api/v1/items/42').matches).items():
+        assert all(r == bool(re.fullmatch(pattern, 'GET /api/v1/items/42')) for r in results)
+
+def test_shared_generator():
+    generator = ExampleGenerator()
+    for pattern, results in run_shared(lambda p: generator.generate(p, 3)).items():
+        for examples in results:
+            for example in examples:
+                assert re.fullmatch(pattern, example), f"{example!r} does not match {pattern!r}"
+
+def main():
+    test_shared_parser()
+    print('test_shared_parser passed')
+    test_shared_parser_reparse()
+    print('test_shared_parser_reparse passed')
+    test_shared_explainer_and_tester()
+    print('test_shared_explainer_and_tester passed')
+    test_shared_generator()
+    print('test_shared_generator passed')
+
+if __name__ == '__main__':
+    main()
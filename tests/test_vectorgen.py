@@ -0,0 +1,70 @@
+import sys
+import os
+import re
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+
+from rexplain.core import vectorgen
+from rexplain.core.generator import ExampleGenerator, _VECTORIZE_MIN
+
+numpy = pytest.importorskip("numpy")
+
+def test_large_batches_match():
+    gen = ExampleGenerator()
+    for pattern in [r'[A-Z]{2}\d{6}', r'[0-9a-f]{8}-[0-9a-f]{4}', r'(cat|dog)s?', r'a*b+', r'x|',
+                    r'(\w+\.)+com', r'\d{4}-\d{2}-\d{2}', r'[^a-y]{1,3}', '\x00?a']:
+        examples = gen.generate(pattern, _VECTORIZE_MIN)
+        assert len(examples) == _VECTORIZE_MIN
+        for example in examples:
+            assert re.fullmatch(pattern, example), (pattern, example)
+
+def test_choices_are_all_taken():
+    examples = ExampleGenerator().generate(r'(cat|dog|bird)', 1000)
+    assert set(examples) == {'cat', 'dog', 'bird'}
+
+def test_seeded_batches_repeat():
+    gen = ExampleGenerator()
+    random.seed(7)
+    first = gen.generate(r'[a-z]+\d{2}', 500)
+    random.seed(7)
+    assert gen.generate(r'[a-z]+\d{2}', 500) == first
+
+def test_same_examples_without_numpy():
+    patterns = [r'[A-Z]{2}\d{6}', r'(cat|dog|bird)s?', r'(\w+\.)+com', r'x|', r'[^a-y]{1,3}', '\x00?a',
+                r'[a-z]+(-[a-z]+)*@[a-z]+\.(com|org|net)', r'(a|(b|c{2,4})+)?']
+    with_numpy = [ExampleGenerator(3).generate(pattern, 1000) for pattern in patterns]
+    try:
+        vectorgen.np = None
+        without_numpy = [ExampleGenerator(3).generate(pattern, 1000) for pattern in patterns]
+    finally:
+        vectorgen.np = numpy
+    for pattern, expected, examples in zip(patterns, with_numpy, without_numpy):
+        assert examples == expected, pattern
+        assert all(re.fullmatch(pattern, example) for example in examples), pattern
+
+def test_draws_spread_over_the_range():
+    for batch in (vectorgen._Batch, vectorgen._ListBatch):
+        draws = [int(x) for x in batch(ExampleGenerator(), random.Random(1))._integers(3, 28, 26000)]
+        counts = [draws.count(value) for value in range(3, 29)]
+        assert sum(counts) == 26000 and min(counts) > 800, batch
+        draws = [int(x) for x in batch(ExampleGenerator(), random.Random(1))._integers(0, 2**32 - 1, 1000)]
+        assert max(draws) > 2**31 and len(set(draws)) > 990, batch
+    examples = ExampleGenerator(5).generate(r'[A-Z]{2}\d{6}', 1000)
+    assert len(set(examples)) > 990
+
+def main():
+    test_large_batches_match()
+    print("test_large_batches_match passed")
+    test_choices_are_all_taken()
+    print("test_choices_are_all_taken passed")
+    test_seeded_batches_repeat()
+    print("test_seeded_batches_repeat passed")
+    test_same_examples_without_numpy()
+    print("test_same_examples_without_numpy passed")
+    test_draws_spread_over_the_range()
+    print("test_draws_spread_over_the_range passed")
+
+if __name__ == "__main__":
+    main()